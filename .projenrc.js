@@ -17,6 +17,8 @@ const project = new AwsCdkTypeScriptApp({
     '@aws-cdk/aws-secretsmanager',
     '@aws-cdk/aws-codebuild',
     '@aws-cdk/aws-dynamodb',
+    '@aws-cdk/aws-events',
+    '@aws-cdk/aws-events-targets',
     '@aws-cdk/aws-amplify',
     '@aws-cdk/aws-ssm',
     '@aws-cdk/aws-kms',
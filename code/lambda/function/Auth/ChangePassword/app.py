@@ -1,7 +1,5 @@
-import json
-import boto3
-
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 
@@ -9,19 +7,19 @@ from aws.helper import DeveloperMode
 def lambda_handler(event, context):
 
     if not "authorization" in event["headers"]:
-        return helper.build_response({"message": "Not authorized."}, 403)
+        return helper.static_response("Not authorized.", 403)
 
     # check input
     input_json = json.loads(event["body"])
 
     if not "old_password" in input_json:
-        return helper.build_response({"message": "Old Password is required."}, 403)
+        return helper.static_response("Old Password is required.", 403)
 
     if not "password" in input_json:
-        return helper.build_response({"message": "New Password is required."}, 403)
+        return helper.static_response("New Password is required.", 403)
 
     if not "password" in input_json:
-        return helper.build_response({"message": "New Password is required."}, 403)
+        return helper.static_response("New Password is required.", 403)
 
     previous_password = input_json["old_password"]
     proposed_password = input_json["password"]
@@ -29,11 +27,11 @@ def lambda_handler(event, context):
     access_token = access_token.replace("Bearer ", "")
 
     if len(proposed_password) < 6:
-        return helper.build_response(
-            {"message": "Password must be at least 6 characters in length."}, 403
+        return helper.static_response(
+            "Password must be at least 6 characters in length.", 403
         )
 
-    client = boto3.client("cognito-idp")
+    client = helper.get_client("cognito-idp")
 
     resp, msg = client.change_password(
         PreviousPassword=previous_password,
@@ -43,6 +41,6 @@ def lambda_handler(event, context):
 
     if msg != None:
         print(msg)
-        return helper.build_response({"message": "Error setting password."}, 403)
+        return helper.static_response("Error setting password.", 403)
 
-    return helper.build_response({"message": "Password has been updated."}, 200)
+    return helper.static_response("Password has been updated.", 200)
@@ -2,14 +2,14 @@ import os
 import logging
 
 from aws import helper
+from aws import email_index
 from aws.helper import DeveloperMode
 
-import boto3
-
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 USER_POOL_ID = os.environ["USER_POOL_ID"]
+EMAIL_MARKER_TABLE_NAME = os.environ["EMAIL_MARKER_TABLE_NAME"]
 
 
 @DeveloperMode(True)
@@ -21,11 +21,9 @@ def lambda_handler(event, context):
     if email is None:
         return helper.build_response(False)
 
-    client = boto3.client("cognito-idp")
-    try:
-        resp = client.admin_get_user(UserPoolId=USER_POOL_ID, Username=email)
-    except client.exceptions.UserNotFoundException as e:
-        return helper.build_response(True)
-    except Exception as e:
+    taken, msg = email_index.get_index(USER_POOL_ID,
+                                       EMAIL_MARKER_TABLE_NAME).is_taken(email)
+    if msg != None:
+        logging.info(msg)
         return helper.build_response(False)
-    return helper.build_response(False)
+    return helper.build_response(not taken)
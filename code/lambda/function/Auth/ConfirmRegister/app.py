@@ -1,7 +1,5 @@
-import json
-import boto3
-
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 
@@ -9,11 +7,11 @@ from aws.helper import DeveloperMode
 def lambda_handler(event, context):
     input_json = json.loads(event["body"])
     if not "code" in input_json:
-        return helper.build_response({"message": "Code is required."}, 403)
+        return helper.static_response("Code is required.", 403)
     if not "email" in input_json:
-        return helper.build_response({"message": "E-mail is required."}, 403)
+        return helper.static_response("E-mail is required.", 403)
     if not "client_id" in input_json:
-        return helper.build_response({"message": "Client ID is required."}, 403)
+        return helper.static_response("Client ID is required.", 403)
 
     # return helper.buildResponse(event)
 
@@ -26,7 +24,7 @@ def lambda_handler(event, context):
     email = input_json["email"]
     client_id = input_json["client_id"]
 
-    cognito_client = boto3.client("cognito-idp")
+    cognito_client = helper.get_client("cognito-idp")
 
     try:
         response = cognito_client.confirm_sign_up(
@@ -36,11 +34,11 @@ def lambda_handler(event, context):
             ForceAliasCreation=False,
         )
     except cognito_client.exceptions.UserNotFoundException:
-        return helper.build_response({"message": "User not found."}, 404)
+        return helper.static_response("User not found.", 404)
     except cognito_client.exceptions.CodeMismatchException:
-        return helper.build_response({"message": "Code mismatch."}, 403)
+        return helper.static_response("Code mismatch.", 403)
     except cognito_client.exceptions.NotAuthorizedException:
-        return helper.build_response({"message": "Not authorized."}, 403)
+        return helper.static_response("Not authorized.", 403)
     except Exception as e:
         print(e.__str__())
         return helper.build_response({"message": e.__str__()}, 403)
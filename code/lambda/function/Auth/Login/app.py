@@ -1,9 +1,11 @@
-import json
 import os
 import base64
 import logging
 
 from aws import helper
+from aws import json_backend as json
+from aws import auth_code_store
+from aws import call_graph
 from aws import federate
 from aws.helper import DeveloperMode
 
@@ -41,18 +43,18 @@ def lambda_handler(event, context):
     """
 
     if not "headers" in event:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."}, 403
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403
         )
 
     if not "authorization" in event["headers"]:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."}, 403
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403
         )
 
     if not "body" in event:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."}, 403
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403
         )
 
     input_json = dict()
@@ -63,9 +65,7 @@ def lambda_handler(event, context):
 
     # only support Basic auth
     if parts[0] != "Basic":
-        return helper.build_response(
-            {"message": "Unsupported authentication method."}, 403
-        )
+        return helper.static_response("Unsupported authentication method.", 403)
 
     auth = base64.b64decode(parts[1]).decode("UTF-8")
 
@@ -79,37 +79,41 @@ def lambda_handler(event, context):
 
     # verify the client_id and redirect_uri
     if not "client_id" in input_json or not "redirect_uri" in input_json:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."}, 403
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403
         )
 
     client_id = input_json["client_id"]
     redirect_uri = input_json["redirect_uri"]
 
-    _, msg = helper.verify_client_id_and_redirect_uri(
-        user_pool_id=USER_POOL_ID, client_id=client_id, redirect_uri=redirect_uri
+    graph = call_graph.CallGraph()
+
+    # verify the client_id and redirect_uri
+    graph.add(
+        "client",
+        helper.verify_client_id_and_redirect_uri,
+        user_pool_id=USER_POOL_ID,
+        client_id=client_id,
+        redirect_uri=redirect_uri,
     )
-    if msg != None:
-        logging.info(msg)
-        return helper.build_response({"message": msg}, 403)
 
     # login with email and password
-    resp, msg = helper.initiate_auth(
+    graph.add(
+        "auth",
+        helper.initiate_auth,
         user_pool_id=USER_POOL_ID,
         client_id=client_id,
         username=email,
         password=password,
+        depends=("client",),
     )
-    if msg != None:
-        logging.info(msg)
-        return helper.build_response({"message": msg}, 403)
 
     # get the user info
-    id_token = resp["AuthenticationResult"]["IdToken"]
-    user_cognito_id, msg = helper.get_cognito_username_from_id_token(id_token)
-    if msg != None:
-        logging.info(msg)
-        return helper.build_response({"message": msg}, 403)
+    def get_user_cognito_id():
+        id_token = graph.result("auth")["AuthenticationResult"]["IdToken"]
+        return helper.get_cognito_username_from_id_token(id_token)
+
+    graph.add("user_cognito_id", get_user_cognito_id, depends=("auth",))
 
     # register the federate record in the user table
     if "platform_id_token" in input_json or "platform_access_token" in input_json:
@@ -123,17 +127,34 @@ def lambda_handler(event, context):
         if "platform_access_token" in input_json:
             platform_login_data["access_token"] = input_json["platform_access_token"]
 
-        feder_resp, msg = federate.verify_federate_and_register_or_get_user(
-            user_table_name=USER_TABLE_NAME,
-            platform_login_data=platform_login_data,
-            user_cognito_id=user_cognito_id,
-            cognito_email=email,
-            mode="register",
+        # the provider token is verified once the user is authenticated, so
+        # unauthenticated callers cannot make the function call the providers
+        graph.add(
+            "platform",
+            federate.prefetch_platform_login,
+            platform_login_data,
+            returns_msg=False,
+            depends=("auth",),
         )
 
-        if msg != None:
-            logging.info(msg)
-            return helper.build_response({"message": msg}, 403)
+        def register_federated_user():
+            return federate.verify_federate_and_register_or_get_user(
+                user_table_name=USER_TABLE_NAME,
+                platform_login_data=platform_login_data,
+                user_cognito_id=graph.result("user_cognito_id"),
+                cognito_email=email,
+                mode="register",
+            )
+
+        graph.add(
+            "federate", register_federated_user, depends=("user_cognito_id", "platform")
+        )
+
+    results, msg = graph.run()
+    if msg != None:
+        logging.info(msg)
+        return helper.build_response({"message": msg}, 403)
+    resp = results["auth"]
 
     # return the JWT token
     if "AuthenticationResult" in resp:
@@ -141,8 +162,7 @@ def lambda_handler(event, context):
 
         if response_type == "code":
             # get the authorization code
-            auth_code, msg = helper.store_token_to_dynamodb_and_get_auth_code(
-                auth_code_table_name=AUTH_CODE_TABLE_NAME,
+            auth_code, msg = auth_code_store.get_store(AUTH_CODE_TABLE_NAME).put(
                 client_id=client_id,
                 redirect_uri=redirect_uri,
                 token_set=formatted_authentication_result,
@@ -158,6 +178,6 @@ def lambda_handler(event, context):
             return helper.build_response(formatted_authentication_result, 200)
 
         else:
-            return helper.build_response({"message": "Unsupported response type."}, 403)
+            return helper.static_response("Unsupported response type.", 403)
 
-    return helper.build_response({"message": "Invalid username or password."}, 403)
+    return helper.static_response("Invalid username or password.", 403)
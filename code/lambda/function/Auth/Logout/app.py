@@ -1,5 +1,4 @@
 import os
-import boto3
 import logging
 
 from aws import helper
@@ -12,7 +11,7 @@ USER_POOL_ID = os.environ["USER_POOL_ID"]
 
 
 def logout(user_pool_id, username):
-    client = boto3.client("cognito-idp")
+    client = helper.get_client("cognito-idp")
 
     try:
         resp = client.admin_user_global_sign_out(
@@ -35,7 +34,7 @@ def lambda_handler(event, context):
 
     if msg != None:
         logging.info(msg)
-        return helper.build_response({"message": "Error setting new password."}, 403)
+        return helper.static_response("Error setting new password.", 403)
 
     logging.info(resp)
-    return helper.build_response({"message": "Logged out."})
+    return helper.static_response("Logged out.")
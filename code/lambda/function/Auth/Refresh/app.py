@@ -1,7 +1,7 @@
-import json
 import logging
 
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 logger = logging.getLogger()
@@ -14,10 +14,10 @@ def lambda_handler(event, context):
     input_json = json.loads(event["body"])
 
     if not "refresh_token" in input_json:
-        return helper.build_response({"message": "Refesh token is required."}, 403)
+        return helper.static_response("Refesh token is required.", 403)
 
     if not "client_id" in input_json:
-        return helper.build_response({"message": "Client ID is required."}, 403)
+        return helper.static_response("Client ID is required.", 403)
 
     refreshToken = input_json["refresh_token"]
     client_id = input_json["client_id"]
@@ -1,8 +1,10 @@
-import json
 import os
 import logging
 
 from aws import helper
+from aws import json_backend as json
+from aws import call_graph
+from aws import email_index
 from aws import federate
 from aws.helper import DeveloperMode
 
@@ -11,6 +13,7 @@ logger.setLevel(logging.INFO)
 
 USER_POOL_ID = os.environ["USER_POOL_ID"]
 USER_TABLE_NAME = os.environ["USER_TABLE_NAME"]
+EMAIL_MARKER_TABLE_NAME = os.environ["EMAIL_MARKER_TABLE_NAME"]
 
 
 @DeveloperMode(True)
@@ -40,16 +43,14 @@ def lambda_handler(event, context):
 
     # Input data validation -----
     if not "email" in input_json:
-        return helper.build_response(
-            {"message": "E-mail address is required."}, 403)
+        return helper.static_response("E-mail address is required.", 403)
     if not "password" in input_json:
-        return helper.build_response({"message": "Password is required."}, 403)
+        return helper.static_response("Password is required.", 403)
     elif len(input_json["password"]) < 6:
-        return helper.build_response(
-            {"message": "Password must be at least 6 characters long."}, 403)
+        return helper.static_response(
+            "Password must be at least 6 characters long.", 403)
     if not "client_id" in input_json:
-        return helper.build_response({"message": "`client_id` is required"},
-                                     403)
+        return helper.static_response("`client_id` is required", 403)
 
     # data validated, assign to variables
     email = input_json["email"].lower()  # store all emails as lower case
@@ -57,20 +58,20 @@ def lambda_handler(event, context):
 
     # verify the client_id and redirect_uri
     if not "client_id" in input_json or not "redirect_uri" in input_json:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."},
-            403)
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403)
 
     client_id = input_json["client_id"]
     redirect_uri = input_json["redirect_uri"]
 
-    _, msg = helper.verify_client_id_and_redirect_uri(
-        user_pool_id=USER_POOL_ID,
-        client_id=client_id,
-        redirect_uri=redirect_uri)
-    if msg != None:
-        logging.info(msg)
-        return helper.build_response({"message": msg}, 403)
+    graph = call_graph.CallGraph()
+
+    # verify the client_id and redirect_uri
+    graph.add("client",
+              helper.verify_client_id_and_redirect_uri,
+              user_pool_id=USER_POOL_ID,
+              client_id=client_id,
+              redirect_uri=redirect_uri)
 
     # build client metadata for confirmation email -----
     client_metadata = dict()
@@ -81,19 +82,33 @@ def lambda_handler(event, context):
     if "redirect_uri" in input_json:
         client_metadata["redirect_uri"] = input_json["redirect_uri"]
 
-    # perform cognito register
-    resp, msg = helper.register(user_pool_id=USER_POOL_ID,
-                                username=email,
-                                email=email,
-                                password=password,
-                                client_id=client_id,
-                                client_metadata=client_metadata)
-    if msg != None:
-        logging.info(msg)
-        return helper.build_response({"message": msg}, 403)
+    index = email_index.get_index(USER_POOL_ID, EMAIL_MARKER_TABLE_NAME)
+
+    # the email is marked for every CheckEmailNotTaken while it is taken, a
+    # failed marker write does not fail the registration
+    graph.add("email_marker",
+              index.mark,
+              email,
+              returns_msg=False,
+              depends=("client", ))
 
-    # get user info
-    user_cognito_id = resp["UserSub"]
+    # perform cognito register
+    graph.add("register",
+              helper.register,
+              user_pool_id=USER_POOL_ID,
+              username=email,
+              email=email,
+              password=password,
+              client_id=client_id,
+              client_metadata=client_metadata,
+              depends=("client", ))
+
+    # the email is taken from now on
+    graph.add("email_index",
+              index.add,
+              email,
+              returns_msg=False,
+              depends=("register", ))
 
     # register the federate record in the user table
     if "platform_id_token" in input_json or "platform_access_token" in input_json:
@@ -108,15 +123,31 @@ def lambda_handler(event, context):
             platform_login_data["access_token"] = input_json[
                 "platform_access_token"]
 
-        feder_resp, msg = federate.verify_federate_and_register_or_get_user(
-            user_table_name=USER_TABLE_NAME,
-            platform_login_data=platform_login_data,
-            user_cognito_id=user_cognito_id,
-            cognito_email=email,
-            mode="register")
-
-        if msg != None:
-            logging.info(msg)
-            return helper.build_response({"message": msg}, 403)
+        # the provider token is verified while the user is signed up, once
+        # the client is known to be valid
+        graph.add("platform",
+                  federate.prefetch_platform_login,
+                  platform_login_data,
+                  returns_msg=False,
+                  depends=("client", ))
+
+        def register_federated_user():
+            # get user info
+            user_cognito_id = graph.result("register")["UserSub"]
+            return federate.verify_federate_and_register_or_get_user(
+                user_table_name=USER_TABLE_NAME,
+                platform_login_data=platform_login_data,
+                user_cognito_id=user_cognito_id,
+                cognito_email=email,
+                mode="register")
+
+        graph.add("federate",
+                  register_federated_user,
+                  depends=("register", "platform"))
+
+    _, msg = graph.run()
+    if msg != None:
+        logging.info(msg)
+        return helper.build_response({"message": msg}, 403)
 
     return helper.build_response({"message": msg}, 200)
@@ -1,7 +1,7 @@
-import json
 import logging
 
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 logger = logging.getLogger()
@@ -11,9 +11,8 @@ logger.setLevel(logging.INFO)
 @DeveloperMode(True)
 def lambda_handler(event, context):
     if event["body"] is None:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."},
-            403)
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403)
 
     username = None
     email = None
@@ -21,13 +20,12 @@ def lambda_handler(event, context):
     input_json = json.loads(event["body"])
 
     if not "email" in input_json:
-        return helper.build_response({"message": "E-mail is required."}, 403)
+        return helper.static_response("E-mail is required.", 403)
 
     email = input_json["email"].lower()
 
     if not "client_id" in input_json:
-        return helper.build_response({"message": "Client ID is required."},
-                                     403)
+        return helper.static_response("Client ID is required.", 403)
 
     username = email
 
@@ -50,8 +48,5 @@ def lambda_handler(event, context):
         logging.info(msg)
         return helper.build_response({"message": msg}, 403)
 
-    return helper.build_response(
-        {
-            "message":
-            "Please check your e-mail for password reset instructions."
-        }, 200)
+    return helper.static_response(
+        "Please check your e-mail for password reset instructions.", 200)
@@ -1,7 +1,7 @@
-import json
 import logging
 
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 logger = logging.getLogger()
@@ -17,13 +17,12 @@ def lambda_handler(event, context):
     input_json = json.loads(event["body"])
 
     if not "email" in input_json:
-        return helper.build_response({"message": "E-mail is required."}, 403)
+        return helper.static_response("E-mail is required.", 403)
 
     email = input_json["email"].lower()
 
     if not "client_id" in input_json:
-        return helper.build_response({"message": "Client ID is required."},
-                                     403)
+        return helper.static_response("Client ID is required.", 403)
 
     username = email
 
@@ -48,6 +47,5 @@ def lambda_handler(event, context):
         logging.info(msg)
         return helper.build_response({"message": msg}, 403)
 
-    return helper.build_response(
-        {"message": "Please check your e-mail for confirmation instructions."},
-        200)
+    return helper.static_response(
+        "Please check your e-mail for confirmation instructions.", 200)
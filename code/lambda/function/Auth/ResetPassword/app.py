@@ -1,7 +1,7 @@
-import json
 import logging
 
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 logger = logging.getLogger()
@@ -11,8 +11,8 @@ logger.setLevel(logging.INFO)
 @DeveloperMode(True)
 def lambda_handler(event, context):
     if event["body"] is None:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."}, 403
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403
         )
     # return helper.buildResponse(event)
 
@@ -25,16 +25,16 @@ def lambda_handler(event, context):
     input_json = json.loads(event["body"])
 
     if not "code" in input_json:
-        return helper.build_response({"message": "Code is required."}, 403)
+        return helper.static_response("Code is required.", 403)
 
     if not "email" in input_json:
-        return helper.build_response({"message": "E-mail is required."}, 403)
+        return helper.static_response("E-mail is required.", 403)
 
     if not "password" in input_json:
-        return helper.build_response({"message": "Password is required."}, 403)
+        return helper.static_response("Password is required.", 403)
 
     if not "client_id" in input_json:
-        return helper.build_response({"message": "Client ID is required."}, 403)
+        return helper.static_response("Client ID is required.", 403)
 
     code = input_json["code"]
     email = input_json["email"].lower()
@@ -44,8 +44,8 @@ def lambda_handler(event, context):
     username = email
 
     if len(password) < 6:
-        return helper.build_response(
-            {"message": "Password must be at least 6 characters in length."}, 403
+        return helper.static_response(
+            "Password must be at least 6 characters in length.", 403
         )
 
     # cognito confirm new password using code
@@ -62,4 +62,4 @@ def lambda_handler(event, context):
         logging.info(msg)
         return helper.build_response({"message": msg}, 403)
 
-    return helper.build_response({"message": "Password has been reset."}, 200)
+    return helper.static_response("Password has been reset.", 200)
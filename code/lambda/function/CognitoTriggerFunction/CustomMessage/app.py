@@ -1,8 +1,8 @@
-import json
 import base64
 import logging
 
 from aws import helper
+from aws import json_backend as json
 from aws.helper import DeveloperMode
 
 
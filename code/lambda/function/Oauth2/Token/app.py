@@ -1,10 +1,11 @@
 import base64
-import json
 import os
 import logging
 from urllib.parse import unquote
 
 from aws import helper
+from aws import json_backend as json
+from aws import auth_code_store
 from aws.helper import DeveloperMode
 
 logger = logging.getLogger()
@@ -23,7 +24,7 @@ def lambda_handler(event, context):
     """
 
     if not "body" in event:
-        return helper.build_response({"message": "invalid_request"}, 400)
+        return helper.static_response("invalid_request", 400)
 
     client_id = None
     client_secret = None
@@ -38,12 +39,12 @@ def lambda_handler(event, context):
         input_json[key] = value
 
     if "grant_type" not in input_json:
-        return helper.build_response({"message": "invalid_request"}, 400)
+        return helper.static_response("invalid_request", 400)
     if "code" not in input_json:
-        return helper.build_response({"message": "invalid_request"}, 400)
+        return helper.static_response("invalid_request", 400)
 
     if "redirect_uri" not in input_json:
-        return helper.build_response({"message": "invalid_request"}, 400)
+        return helper.static_response("invalid_request", 400)
 
     if "authorization" in event["headers"]:
         authorization = event["headers"]["authorization"]
@@ -52,7 +53,7 @@ def lambda_handler(event, context):
             return helper.build_response({"message": msg}, 400)
     else:
         if "client_id" not in input_json:
-            return helper.build_response({"message": "invalid_request"}, 400)
+            return helper.static_response("invalid_request", 400)
         client_id = input_json["client_id"]
 
     grant_type = input_json["grant_type"]
@@ -61,8 +62,8 @@ def lambda_handler(event, context):
 
     # verify the client_id and redirect_uri
     if not "client_id" in input_json or not "redirect_uri" in input_json:
-        return helper.build_response(
-            {"message": "You do not have permission to access this resource."}, 403
+        return helper.static_response(
+            "You do not have permission to access this resource.", 403
         )
 
     _, msg = helper.verify_client_id_and_redirect_uri(
@@ -82,11 +83,11 @@ def lambda_handler(event, context):
             return helper.build_response({"message": msg}, 403)
 
         # get the code
-        token_set, msg = helper.get_token_from_code(
-            auth_code_table_name=AUTH_CODE_TABLE_NAME, auth_code=code
+        token_set, msg = auth_code_store.get_store(AUTH_CODE_TABLE_NAME).redeem(
+            code, client_id=client_id, redirect_uri=redirect_uri
         )
         if msg != None:
             logging.info(msg)
             return helper.build_response({"message": msg}, 403)
         return helper.build_response(token_set, 200)
-    return helper.build_response({"message": "invalid_request"}, 400)
+    return helper.static_response("invalid_request", 400)
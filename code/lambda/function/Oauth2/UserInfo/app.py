@@ -1,11 +1,14 @@
-import boto3
+import os
 import logging
 from aws import helper
+from aws import verifier
 from aws.helper import DeveloperMode
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+USER_POOL_ID = os.environ["USER_POOL_ID"]
+
 
 @DeveloperMode(True)
 def lambda_handler(event, context):
@@ -15,28 +18,36 @@ def lambda_handler(event, context):
     description:
         This function is used to get the user information from the cognito user pool.
         The user information is used to create the user in the database.
+        The access token is verified locally against the user pool JWKS, so a
+        forged or expired token does not call Cognito. get_user is still called
+        for every valid token, since only Cognito knows if it was revoked.
     """
     if not "authorization" in event["headers"]:
-        return helper.build_response(
-            {"message": "Authorization header is missing"}, 401
-        )
+        return helper.static_response("Authorization header is missing", 401)
 
     authorization = event["headers"]["authorization"]
     access_token = authorization.replace("Bearer ", "")
 
-    cognito_client = boto3.client("cognito-idp")
+    claims, msg = verifier.get_verifier(USER_POOL_ID).verify(
+        access_token, token_use="access"
+    )
+    if msg != None:
+        logging.info(msg)
+        return helper.static_response("Invalid access token", 401)
+
+    cognito_client = helper.get_client("cognito-idp")
     try:
         resp = cognito_client.get_user(AccessToken=access_token)
     except cognito_client.exceptions.NotAuthorizedException:
-        return helper.build_response({"message": "Invalid access token"}, 401)
+        return helper.static_response("Invalid access token", 401)
     except cognito_client.exceptions.UserNotFoundException:
-        return helper.build_response({"message": "User not found"}, 404)
+        return helper.static_response("User not found", 404)
     except cognito_client.exceptions.PasswordResetRequiredException:
-        return helper.build_response({"message": "Password reset required"}, 403)
+        return helper.static_response("Password reset required", 403)
     except cognito_client.exceptions.UserNotConfirmedException:
-        return helper.build_response({"message": "User not confirmed"}, 403)
+        return helper.static_response("User not confirmed", 403)
     except cognito_client.exceptions.UserNotFoundException:
-        return helper.build_response({"message": "User not found"}, 404)
+        return helper.static_response("User not found", 404)
     except Exception as e:
         return helper.build_response({"message": str(e)}, 500)
 
@@ -0,0 +1,312 @@
+import base64
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+from aws import json_backend as json
+from aws import helper
+from aws import sealing
+from aws import secrets_provider
+
+# Backend used by get_store(): "dynamodb" (default), "memory", "sqlite" or "sealed".
+AUTH_CODE_STORE = os.environ.get("AUTH_CODE_STORE", "dynamodb")
+AUTH_CODE_STORE_PATH = os.environ.get("AUTH_CODE_STORE_PATH", "/tmp/auth_code.db")
+AUTH_CODE_SEALING_SECRET_ARN = os.environ.get("AUTH_CODE_SEALING_SECRET_ARN")
+AUTH_CODE_SEALED_TTL = int(os.environ.get("AUTH_CODE_SEALED_TTL", 300))
+
+
+class AuthCodeStore(object):
+    """
+    Persistence of authorization codes.
+
+    A code maps to the token set issued at login. It can be redeemed once,
+    before it expires.
+    """
+
+    def put(self, client_id, redirect_uri, token_set):
+        """
+        Store the token set and get a new auth code.
+
+        Args:
+            client_id (str): The client ID.
+            redirect_uri (str): The callback URL.
+            token_set (dict): The token set.
+
+        Returns:
+            str: The auth code.
+            str: The error message.
+        """
+        raise NotImplementedError
+
+    def redeem(self, auth_code, client_id=None, redirect_uri=None):
+        """
+        Consume the auth code and get its token set.
+
+        When `client_id` and `redirect_uri` are given, the code must also
+        have been issued to them. A mismatch consumes nothing.
+
+        Args:
+            auth_code (str): The auth code.
+            client_id (str): The client ID redeeming the code.
+            redirect_uri (str): The callback URL of the redemption.
+
+        Returns:
+            dict: The token set.
+            str: The error message.
+        """
+        raise NotImplementedError
+
+
+class DynamoDBAuthCodeStore(AuthCodeStore):
+    def __init__(self, table_name):
+        self.table_name = table_name
+
+    def put(self, client_id, redirect_uri, token_set):
+        return helper.store_token_to_dynamodb_and_get_auth_code(
+            auth_code_table_name=self.table_name,
+            client_id=client_id,
+            redirect_uri=redirect_uri,
+            token_set=token_set,
+        )
+
+    def redeem(self, auth_code, client_id=None, redirect_uri=None):
+        return helper.get_token_from_code(
+            auth_code_table_name=self.table_name,
+            auth_code=auth_code,
+            client_id=client_id,
+            redirect_uri=redirect_uri,
+        )
+
+
+class InMemoryAuthCodeStore(AuthCodeStore):
+    """
+    Process-local store, for offline benchmarks and tests.
+    """
+
+    def __init__(self, ttl=helper.AUTH_CODE_TTL):
+        self.ttl = ttl
+        self._records = dict()
+        self._lock = threading.Lock()
+
+    def put(self, client_id, redirect_uri, token_set):
+        auth_code = str(uuid.uuid4())
+        record = (
+            client_id,
+            redirect_uri,
+            json.dumps(token_set),
+            time.time() + self.ttl,
+        )
+        with self._lock:
+            self._records[auth_code] = record
+        return auth_code, None
+
+    def redeem(self, auth_code, client_id=None, redirect_uri=None):
+        with self._lock:
+            record = self._records.get(auth_code)
+            if (
+                record is None
+                or record[3] < time.time()
+                or (client_id is not None and record[0] != client_id)
+                or (redirect_uri is not None and record[1] != redirect_uri)
+            ):
+                return None, "Invalid auth code."
+            del self._records[auth_code]
+        return json.loads(record[2]), None
+
+
+class SQLiteAuthCodeStore(AuthCodeStore):
+    """
+    Store backed by a local SQLite file, for offline benchmarks.
+    """
+
+    def __init__(self, path=AUTH_CODE_STORE_PATH, ttl=helper.AUTH_CODE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS auth_code ("
+            "auth_code TEXT PRIMARY KEY, client_id TEXT, redirect_uri TEXT, "
+            "token_set TEXT, ttl INTEGER)"
+        )
+
+    def put(self, client_id, redirect_uri, token_set):
+        auth_code = str(uuid.uuid4())
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT INTO auth_code VALUES (?, ?, ?, ?, ?)",
+                    (
+                        auth_code,
+                        client_id,
+                        redirect_uri,
+                        json.dumps(token_set),
+                        int(time.time()) + self.ttl,
+                    ),
+                )
+        except Exception as e:
+            return None, e.__str__()
+        return auth_code, None
+
+    def redeem(self, auth_code, client_id=None, redirect_uri=None):
+        query = "SELECT token_set FROM auth_code WHERE auth_code = ? AND ttl >= ?"
+        parameters = [auth_code, int(time.time())]
+        if client_id is not None:
+            query += " AND client_id = ?"
+            parameters.append(client_id)
+        if redirect_uri is not None:
+            query += " AND redirect_uri = ?"
+            parameters.append(redirect_uri)
+        try:
+            with self._lock:
+                # the write lock makes the read and delete atomic across processes
+                self._connection.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._connection.execute(query, parameters).fetchone()
+                    if row is not None:
+                        self._connection.execute(
+                            "DELETE FROM auth_code WHERE auth_code = ?", (auth_code,)
+                        )
+                    self._connection.execute("COMMIT")
+                except Exception:
+                    self._connection.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            return None, e.__str__()
+        if row is None:
+            return None, "Invalid auth code."
+        return json.loads(row[0]), None
+
+
+class SealedAuthCodeStore(AuthCodeStore):
+    """
+    Stateless codes: the code itself is a sealed, short-lived envelope that
+    carries the token set, client_id and redirect_uri, so Login writes
+    nothing. Single use is enforced at redemption by a small conditional
+    put of a "used#<sha256(code)>" record in the auth code table.
+
+    The sealing secret is a JSON document of the form
+    {"current": "<key id>", "keys": {"<key id>": "<base64 key>"}}; older keys
+    stay listed until codes sealed with them have expired.
+    """
+
+    def __init__(
+        self,
+        table_name,
+        secret_id=AUTH_CODE_SEALING_SECRET_ARN,
+        ttl=AUTH_CODE_SEALED_TTL,
+    ):
+        self.table_name = table_name
+        self.secret_id = secret_id
+        self.ttl = ttl
+        self._secret = None
+        self._keys = None
+        self._current = None
+        self._lock = threading.Lock()
+
+    def _keyring(self):
+        secret = secrets_provider.get_secret(self.secret_id)
+        # decode once per secret version, and never mix two versions
+        with self._lock:
+            if secret is not self._secret:
+                self._keys = dict(
+                    (key_id, base64.b64decode(key))
+                    for key_id, key in secret["keys"].items()
+                )
+                self._current = secret["current"]
+                self._secret = secret
+            return self._current, self._keys
+
+    def put(self, client_id, redirect_uri, token_set):
+        try:
+            key_id, keys = self._keyring()
+            key = keys[key_id]
+        except KeyError:
+            return None, "Unknown sealing key."
+        except Exception as e:
+            return None, e.__str__()
+        payload = json.dumps(
+            {
+                "c": client_id,
+                "r": redirect_uri,
+                "e": int(time.time()) + self.ttl,
+                "t": token_set,
+            },
+            separators=(",", ":"),
+        )
+        auth_code = sealing.seal(key_id, key, zlib.compress(payload.encode("utf-8")))
+        return auth_code, None
+
+    def redeem(self, auth_code, client_id=None, redirect_uri=None):
+        try:
+            _, keys = self._keyring()
+        except Exception as e:
+            return None, e.__str__()
+        try:
+            payload = json.loads(zlib.decompress(sealing.unseal(keys, auth_code)))
+        except (sealing.SealError, zlib.error, ValueError):
+            return None, "Invalid auth code."
+
+        if payload["e"] < int(time.time()):
+            return None, "Invalid auth code."
+        if client_id is not None and payload["c"] != client_id:
+            return None, "Invalid auth code."
+        if redirect_uri is not None and payload["r"] != redirect_uri:
+            return None, "Invalid auth code."
+
+        dynamodb_client = helper.get_client("dynamodb")
+        used_key = "used#" + hashlib.sha256(auth_code.encode("utf-8")).hexdigest()
+        try:
+            dynamodb_client.put_item(
+                TableName=self.table_name,
+                Item={
+                    "auth_code": {"S": used_key},
+                    "ttl": {"N": str(payload["e"])},
+                },
+                ConditionExpression="attribute_not_exists(auth_code)",
+            )
+        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+            return None, "Invalid auth code."
+        except Exception as e:
+            return None, e.__str__()
+        return payload["t"], None
+
+
+_stores = dict()
+
+
+def get_store(auth_code_table_name, backend=None):
+    """
+    Get the container-wide auth code store selected by AUTH_CODE_STORE.
+
+    Args:
+        auth_code_table_name (str): The DynamoDB auth code table name.
+        backend (str): Override the configured backend.
+
+    Returns:
+        AuthCodeStore: The store.
+    """
+    backend = backend or AUTH_CODE_STORE
+    key = (backend, auth_code_table_name)
+    store = _stores.get(key)
+    if store is None:
+        if backend == "dynamodb":
+            store = DynamoDBAuthCodeStore(auth_code_table_name)
+        elif backend == "memory":
+            store = InMemoryAuthCodeStore()
+        elif backend == "sqlite":
+            store = SQLiteAuthCodeStore()
+        elif backend == "sealed":
+            store = SealedAuthCodeStore(auth_code_table_name)
+        else:
+            raise ValueError("Unknown auth code store: " + backend)
+        _stores[key] = store
+    return store
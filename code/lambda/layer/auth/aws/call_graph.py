@@ -0,0 +1,165 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Calls of a handler that do not depend on each other run at the same time on
+# one container-wide thread pool. boto3 clients and the provider sessions are
+# shared by the pool threads, see helper.get_client and federate.get_session.
+CALL_GRAPH_WORKERS = int(os.environ.get("CALL_GRAPH_WORKERS", 8))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Get the container-wide thread pool of the call graphs.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: The pool.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=CALL_GRAPH_WORKERS, thread_name_prefix="call-graph"
+                )
+    return _executor
+
+
+class _Call(object):
+    __slots__ = ("name", "func", "args", "kwargs", "depends", "returns_msg")
+
+    def __init__(self, name, func, args, kwargs, depends, returns_msg):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.depends = depends
+        self.returns_msg = returns_msg
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+class CallGraph(object):
+    """
+    The downstream calls of one request and the order they depend on.
+
+    Usage:
+        graph = CallGraph()
+        graph.add("client", helper.verify_client_id_and_redirect_uri, ...)
+        graph.add("auth", helper.initiate_auth, ..., depends=("client",))
+        graph.add("profile", federate.prefetch_platform_login, data, returns_msg=False)
+        results, msg = graph.run()
+
+    A call starts once every call it depends on succeeded. A call fails if it
+    raises or, like most functions of the layer, returns a (value, msg) pair
+    with a message. After the first failure no other call is started. Calls
+    already running can not be interrupted, so they finish and their results
+    are dropped. The failure reported is that of the earliest added call that
+    failed, which is what running the calls one by one would have reported.
+
+    A call that needs the result of another one reads it with result() from a
+    function that depends on it.
+    """
+
+    def __init__(self, executor=None):
+        self._executor = executor
+        self._calls = []
+        self._names = set()
+        self._results = dict()
+
+    def add(self, name, func, *args, depends=(), returns_msg=True, **kwargs):
+        """
+        Add a call.
+
+        Args:
+            name (str): The name of the call, unique in the graph.
+            func (callable): The function.
+            *args: The positional arguments of the function.
+            depends (tuple): The names of the calls that must succeed first, added before this one.
+            returns_msg (bool): If the function returns a (value, msg) pair.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            CallGraph: The graph.
+        """
+        if name in self._names:
+            raise ValueError("Duplicate call: " + name)
+        for dependency in depends:
+            if dependency not in self._names:
+                raise ValueError("Unknown dependency of " + name + ": " + dependency)
+        self._calls.append(_Call(name, func, args, kwargs, tuple(depends), returns_msg))
+        self._names.add(name)
+        return self
+
+    def result(self, name):
+        """
+        Get the value of a call that succeeded.
+        """
+        return self._results[name]
+
+    def run(self):
+        """
+        Run the calls.
+
+        Returns:
+            dict: The values of the calls, by name.
+            str: The error message of the first failed call, None if successful.
+
+        Raises:
+            Exception: What the first failed call raised.
+        """
+        pending = list(self._calls)
+        running = dict()
+        failures = dict()
+        while pending or running:
+            if not failures:
+                ready = [
+                    call
+                    for call in pending
+                    if all(name in self._results for name in call.depends)
+                ]
+                for call in ready:
+                    pending.remove(call)
+                if len(ready) == 1 and not running:
+                    # a call with nothing to overlap runs on the request thread
+                    self._complete(ready[0], failures, self._execute, ready[0])
+                    continue
+                executor = self._executor or get_executor()
+                for call in ready:
+                    running[executor.submit(call)] = call
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                call = running.pop(future)
+                self._complete(call, failures, future.result)
+
+        for call in self._calls:
+            if call.name in failures:
+                error = failures[call.name]
+                if isinstance(error, BaseException):
+                    raise error
+                return None, error
+        return self._results, None
+
+    @staticmethod
+    def _execute(call):
+        return call()
+
+    def _complete(self, call, failures, get_result, *args):
+        try:
+            value = get_result(*args)
+            if call.returns_msg:
+                # a malformed result is this call's failure, not the graph's
+                value, msg = value
+                if msg is not None:
+                    failures[call.name] = msg
+                    return
+        except Exception as e:
+            failures[call.name] = e
+            return
+        self._results[call.name] = value
@@ -0,0 +1,152 @@
+import builtins
+import os
+import sys
+import time
+
+# Imported first by aws.helper, so this is as close to the start of the
+# handler module as the layer gets. With COLD_START_PROFILE=true every module
+# imported after this point is timed until the first invocation.
+_init_start = time.perf_counter()
+
+COLD_START_PROFILE = os.environ.get("COLD_START_PROFILE", "false").lower() == "true"
+COLD_START_NAMESPACE = os.environ.get("COLD_START_NAMESPACE", "AuthLayer")
+# number of top-level packages reported as separate metrics
+COLD_START_TOP_PACKAGES = int(os.environ.get("COLD_START_TOP_PACKAGES", 20))
+
+_original_import = builtins.__import__
+# module name -> [inclusive ms, self ms]
+_imports = dict()
+# time spent in nested imports, one accumulator per import in progress
+_stack = []
+_first_invocation = True
+
+
+def _resolve(name, globals, level):
+    if level == 0:
+        return name
+    package = (globals or {}).get("__package__") or ""
+    parts = package.rsplit(".", level - 1)
+    return parts[0] + ("." + name if name else "")
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    key = _resolve(name, globals, level)
+    if key in sys.modules:
+        # `from package import submodule` loads the submodule in the fromlist
+        for item in fromlist or ():
+            if item != "*" and key + "." + item not in sys.modules:
+                key = key + "." + item
+                break
+        else:
+            return _original_import(name, globals, locals, fromlist, level)
+
+    start = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        nested = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        if key in sys.modules and key not in _imports:
+            _imports[key] = [elapsed, elapsed - nested]
+
+
+def install():
+    """
+    Start timing imports.
+    """
+    builtins.__import__ = _timed_import
+
+
+def uninstall():
+    """
+    Stop timing imports, later imports go through the original __import__.
+    """
+    if builtins.__import__ is _timed_import:
+        builtins.__import__ = _original_import
+
+
+def build_report(init_duration_ms):
+    """
+    Build the EMF document of the cold start.
+
+    The self time of every timed module is summed per top-level package, so
+    "Import.boto3" and "Import.botocore" do not count the same time twice.
+
+    Args:
+        init_duration_ms (float): The time from the layer import to the first invocation.
+
+    Returns:
+        dict: The EMF document.
+    """
+    packages = dict()
+    for module, (_, self_ms) in _imports.items():
+        package = module.split(".", 1)[0]
+        packages[package] = packages.get(package, 0.0) + self_ms
+    top = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+    doc = dict()
+    metrics = [
+        {"Name": "ColdStart", "Unit": "Count"},
+        {"Name": "InitDuration", "Unit": "Milliseconds"},
+        {"Name": "ImportDuration", "Unit": "Milliseconds"},
+    ]
+    doc["ColdStart"] = 1
+    doc["InitDuration"] = round(init_duration_ms, 3)
+    doc["ImportDuration"] = round(sum(packages.values()), 3)
+    for package, self_ms in top[:COLD_START_TOP_PACKAGES]:
+        name = "Import." + package
+        doc[name] = round(self_ms, 3)
+        metrics.append({"Name": name, "Unit": "Milliseconds"})
+
+    doc["_aws"] = {
+        "Timestamp": int(time.time() * 1000),
+        "CloudWatchMetrics": [
+            {
+                "Namespace": COLD_START_NAMESPACE,
+                "Dimensions": [["FunctionName"]],
+                "Metrics": metrics,
+            }
+        ],
+    }
+    doc["FunctionName"] = os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+    doc["imports"] = dict(
+        (module, {"inclusive_ms": round(times[0], 3), "self_ms": round(times[1], 3)})
+        for module, times in sorted(
+            _imports.items(), key=lambda item: item[1][0], reverse=True
+        )
+    )
+    return doc
+
+
+def on_invoke():
+    """
+    Mark an invocation. The first one of the container writes the cold
+    start report as one EMF line and stops the import timing.
+
+    Returns:
+        dict: The report on the first invocation, None afterwards.
+    """
+    global _first_invocation
+    if not _first_invocation:
+        return None
+    _first_invocation = False
+    init_duration_ms = (time.perf_counter() - _init_start) * 1000
+    uninstall()
+
+    # aws.json_backend is imported here, after the timed window
+    from aws import json_backend as json
+
+    doc = build_report(init_duration_ms)
+    print(json.dumps(doc, separators=(",", ":")))
+    return doc
+
+
+def is_first_invocation():
+    return _first_invocation
+
+
+if COLD_START_PROFILE:
+    install()
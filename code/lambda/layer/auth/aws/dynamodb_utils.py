@@ -4,7 +4,7 @@ from decimal import Decimal
 import six
 import sys
 from datetime import datetime
-import simplejson as json
+from aws import json_backend as json
 from boto3.dynamodb.types import TypeSerializer
 
 
@@ -0,0 +1,333 @@
+import hashlib
+import math
+import os
+import threading
+import time
+
+from aws import helper
+from aws import tracing
+from aws.token_cache import TokenCache
+
+# The emails of the user pool are loaded with ListUsers every
+# EMAIL_INDEX_REFRESH seconds into a Bloom filter. Register writes a marker
+# for each new email to the marker table, kept for EMAIL_MARKER_TTL seconds.
+# An email the filter has never seen and that has no marker is not taken,
+# without a Cognito call. Filter hits and marked emails are checked with
+# AdminGetUser, and "taken" answers are kept for EMAIL_ANSWER_TTL seconds.
+EMAIL_INDEX_REFRESH = int(os.environ.get("EMAIL_INDEX_REFRESH", 3600))
+EMAIL_INDEX_RETRY = int(os.environ.get("EMAIL_INDEX_RETRY", 60))
+EMAIL_INDEX_FALSE_POSITIVE_RATE = float(
+    os.environ.get("EMAIL_INDEX_FALSE_POSITIVE_RATE", 0.01)
+)
+# the filter is sized for this many times the emails it was built with, so
+# that registrations added afterwards do not raise the false positive rate
+EMAIL_INDEX_HEADROOM = float(os.environ.get("EMAIL_INDEX_HEADROOM", 2))
+EMAIL_INDEX_MIN_CAPACITY = int(os.environ.get("EMAIL_INDEX_MIN_CAPACITY", 1024))
+EMAIL_MARKER_TTL = int(os.environ.get("EMAIL_MARKER_TTL", 2 * EMAIL_INDEX_REFRESH))
+# a filter is only trusted while every registration since its build still
+# has a marker, less this margin for the marker write and clock skew
+EMAIL_MARKER_MARGIN = int(os.environ.get("EMAIL_MARKER_MARGIN", 60))
+EMAIL_ANSWER_TTL = int(os.environ.get("EMAIL_ANSWER_TTL", 60))
+EMAIL_ANSWER_CACHE_MAXSIZE = int(os.environ.get("EMAIL_ANSWER_CACHE_MAXSIZE", 4096))
+
+
+class BloomFilter(object):
+    """
+    A set of strings that can answer "maybe present" for an absent string,
+    at most with the given false positive rate, but never "absent" for a
+    present one.
+    """
+
+    def __init__(self, capacity, false_positive_rate):
+        capacity = max(capacity, 1)
+        self.num_bits = max(
+            int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8
+        )
+        self.num_hashes = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, value):
+        # double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class EmailIndex(object):
+    """
+    Answers whether an email is taken in a user pool.
+
+    The filter is rebuilt in a background thread, so no request waits for
+    ListUsers. A filter miss is only an answer together with the markers of
+    `marker_table_name`: Register marks an email while it signs the user up,
+    so a registration after the build, in any container, is found there. A
+    filter older than the markers is not used, nor one built before a failed
+    marker write of this container. Without a marker table, or until the first
+    build completes, every email is checked with AdminGetUser.
+
+    Note that the answers are advisory, SignUp still rejects a taken email: a
+    registration whose marker write failed, or has not landed yet, may be
+    reported free by other containers until their next rebuild.
+
+    Note that Lambda freezes background threads between invocations, so a
+    rebuild started in one invocation may complete in a later one.
+    """
+
+    def __init__(
+        self,
+        user_pool_id,
+        marker_table_name=None,
+        refresh=EMAIL_INDEX_REFRESH,
+        retry=EMAIL_INDEX_RETRY,
+        false_positive_rate=EMAIL_INDEX_FALSE_POSITIVE_RATE,
+        marker_ttl=EMAIL_MARKER_TTL,
+        answer_ttl=EMAIL_ANSWER_TTL,
+    ):
+        self.user_pool_id = user_pool_id
+        self.marker_table_name = marker_table_name
+        self.refresh = refresh
+        self.retry = retry
+        self.false_positive_rate = false_positive_rate
+        self.marker_ttl = marker_ttl
+        self.answer_ttl = answer_ttl
+        self.filter_answers = 0
+        self.marker_reads = 0
+        self.cognito_calls = 0
+        self.builds = 0
+        self._filter = None
+        # epoch time the ListUsers of the current filter started
+        self._built_at = 0.0
+        # epoch time of the last failed marker write of this container
+        self._marker_failed_at = 0.0
+        self._next_build_at = 0.0
+        self._building = False
+        # registrations seen while a rebuild runs, added to the new filter
+        self._added = []
+        self._answers = TokenCache(
+            "EmailAnswer", EMAIL_ANSWER_CACHE_MAXSIZE, max_ttl=answer_ttl
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(email):
+        return email.strip().lower()
+
+    @staticmethod
+    def _marker_key(email):
+        return {"email_hash": {"S": hashlib.sha256(email.encode("utf-8")).hexdigest()}}
+
+    def is_taken(self, email):
+        """
+        Check if an email is taken.
+
+        Args:
+            email (str): The email.
+
+        Returns:
+            bool: True if a user has the email.
+            str: The error message, None if successful.
+        """
+        email = self._normalize(email)
+        if self.marker_table_name is not None:
+            self._refresh_if_stale()
+
+        with self._lock:
+            bloom = self._filter
+            built_at = self._built_at
+            marker_failed_at = self._marker_failed_at
+        if (
+            bloom is not None
+            and email not in bloom
+            and time.time() - built_at < self.marker_ttl - EMAIL_MARKER_MARGIN
+            and built_at - EMAIL_MARKER_MARGIN > marker_failed_at
+        ):
+            marked, msg = self._is_marked(email)
+            if msg is None and not marked:
+                self.filter_answers += 1
+                tracing.count("EmailIndexFilterAnswers")
+                return False, None
+
+        if self._answers.get(email):
+            return True, None
+
+        self.cognito_calls += 1
+        tracing.count("EmailIndexCognitoCalls")
+        cognito_client = helper.get_client("cognito-idp")
+        try:
+            cognito_client.admin_get_user(UserPoolId=self.user_pool_id, Username=email)
+            taken = True
+        except cognito_client.exceptions.UserNotFoundException:
+            taken = False
+        except Exception as e:
+            return None, e.__str__()
+        if taken:
+            # a free email may be registered any moment, so only "taken" is kept
+            self._answers.put(email, True, time.time() + self.answer_ttl)
+        return taken, None
+
+    def mark(self, email):
+        """
+        Mark the email of a registration in the marker table, so every
+        container checks it with Cognito. A failed write is not retried, the
+        filter of this container is no longer used until its next rebuild.
+
+        Args:
+            email (str): The email.
+
+        Returns:
+            bool: True if marked, False if there is no marker table.
+            str: The error message, None if successful.
+        """
+        if self.marker_table_name is None:
+            return False, None
+        item = self._marker_key(self._normalize(email))
+        item["ttl"] = {"N": str(int(time.time()) + self.marker_ttl)}
+        dynamodb_client = helper.get_client("dynamodb")
+        try:
+            dynamodb_client.put_item(TableName=self.marker_table_name, Item=item)
+        except Exception as e:
+            with self._lock:
+                self._marker_failed_at = time.time()
+            tracing.count("EmailMarkerFailures")
+            print("Email marker write failed: " + e.__str__())
+            return None, e.__str__()
+        return True, None
+
+    def add(self, email):
+        """
+        Add the email of a new user, e.g. after a successful registration.
+        """
+        email = self._normalize(email)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(email)
+            if self._building:
+                self._added.append(email)
+        self._answers.put(email, True, time.time() + self.answer_ttl)
+
+    def build(self):
+        """
+        Load every email of the user pool into a new filter.
+
+        Returns:
+            int: The number of emails.
+        """
+        built_at = time.time()
+        emails = []
+        paginator = helper.get_client("cognito-idp").get_paginator("list_users")
+        for page in paginator.paginate(
+            UserPoolId=self.user_pool_id, AttributesToGet=["email"]
+        ):
+            for user in page["Users"]:
+                for attribute in user.get("Attributes", ()):
+                    if attribute["Name"] == "email":
+                        emails.append(self._normalize(attribute["Value"]))
+
+        bloom = BloomFilter(
+            max(int(len(emails) * EMAIL_INDEX_HEADROOM), EMAIL_INDEX_MIN_CAPACITY),
+            self.false_positive_rate,
+        )
+        for email in emails:
+            bloom.add(email)
+        with self._lock:
+            for email in self._added:
+                bloom.add(email)
+            self._added = []
+            self._filter = bloom
+            self._built_at = built_at
+            self._next_build_at = time.monotonic() + self.refresh
+        self.builds += 1
+        return len(emails)
+
+    def stats(self):
+        """
+        Get the index counters.
+
+        Returns:
+            dict: emails answered by the filter, marker reads, AdminGetUser calls, builds and the filter size.
+        """
+        bloom = self._filter
+        return {
+            "filter_answers": self.filter_answers,
+            "marker_reads": self.marker_reads,
+            "cognito_calls": self.cognito_calls,
+            "builds": self.builds,
+            "emails": bloom.count if bloom is not None else None,
+            "bits": bloom.num_bits if bloom is not None else None,
+        }
+
+    def _is_marked(self, email):
+        self.marker_reads += 1
+        dynamodb_client = helper.get_client("dynamodb")
+        try:
+            resp = dynamodb_client.get_item(
+                TableName=self.marker_table_name,
+                Key=self._marker_key(email),
+                ProjectionExpression="email_hash",
+                ConsistentRead=True,
+            )
+        except Exception as e:
+            return None, e.__str__()
+        return "Item" in resp, None
+
+    def _refresh_if_stale(self):
+        if time.monotonic() < self._next_build_at:
+            return
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        thread = threading.Thread(target=self._rebuild)
+        thread.daemon = True
+        thread.start()
+
+    def _rebuild(self):
+        try:
+            with tracing.span("cognito-idp", "EmailIndexBuild"):
+                self.build()
+        except Exception as e:
+            # keep the current filter, if any
+            print("Email index build failed: " + e.__str__())
+            self._next_build_at = time.monotonic() + self.retry
+        finally:
+            with self._lock:
+                self._building = False
+
+
+_indexes = dict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(user_pool_id, marker_table_name=None):
+    """
+    Get the container-wide email index of a user pool.
+
+    Args:
+        user_pool_id (str): The user pool ID.
+        marker_table_name (str): The table of the registration markers.
+
+    Returns:
+        EmailIndex: The index.
+    """
+    key = (user_pool_id, marker_table_name)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = EmailIndex(user_pool_id, marker_table_name)
+    return index
@@ -1,22 +1,176 @@
-import json
-import requests
 import os
 import base64
-import boto3
+import functools
+import threading
+import time
+from urllib.parse import urlsplit
 
 from aws import helper
-from aws import dynamodb_utils
+from aws import secrets_provider
+from aws import tracing
+from aws.google_certs import google_cert_cache
+from aws.token_cache import TokenCache
+from aws.models import FederatedUserRecord
 from aws.helper import DeveloperMode
 
-from google.oauth2 import id_token as gid_token
-from google.auth.transport import requests as grequests
+# The provider libraries (requests, google-auth and what they pull in:
+# urllib3, idna, charset_normalizer, rsa, pyasn1) are imported on the first
+# federated call, so email and password logins never load them.
+_requests = None
+_google = None
+
+
+def _get_requests():
+    global _requests
+    if _requests is None:
+        import requests
+
+        _requests = requests
+    return _requests
+
+
+def _get_google():
+    """
+    Get the google.auth.jwt and google.auth.transport.requests modules.
+    """
+    global _google
+    if _google is None:
+        from google.auth import jwt as gjwt
+        from google.auth.transport import requests as grequests
+
+        _google = (gjwt, grequests)
+    return _google
+
+
+# One keep-alive session per provider host is shared by every call in the
+# container, including the google-auth transport.
+PROVIDER_CONNECT_TIMEOUT = float(os.environ.get("PROVIDER_CONNECT_TIMEOUT", 2))
+PROVIDER_READ_TIMEOUT = float(os.environ.get("PROVIDER_READ_TIMEOUT", 5))
+PROVIDER_POOL_MAXSIZE = int(os.environ.get("PROVIDER_POOL_MAXSIZE", 10))
+PROVIDER_TIMEOUT = (PROVIDER_CONNECT_TIMEOUT, PROVIDER_READ_TIMEOUT)
+GOOGLE_HOST = "www.googleapis.com"
+
+_sessions = dict()
+_sessions_lock = threading.Lock()
+_adapter_class = None
+_google_request = None
+
+
+def _get_adapter_class():
+    """
+    Get the HTTPAdapter subclass that applies the default timeouts and counts
+    new and reused connections in the tracing metrics.
+    """
+    global _adapter_class
+    if _adapter_class is None:
+        from requests.adapters import HTTPAdapter
+
+        class PooledAdapter(HTTPAdapter):
+            def send(self, request, **kwargs):
+                if kwargs.get("timeout") is None:
+                    kwargs["timeout"] = PROVIDER_TIMEOUT
+                pool = self.get_connection(request.url, kwargs.get("proxies"))
+                opened = pool.num_connections
+                resp = super(PooledAdapter, self).send(request, **kwargs)
+                if pool.num_connections > opened:
+                    tracing.count("ProviderConnectionsOpened")
+                else:
+                    tracing.count("ProviderConnectionsReused")
+                return resp
+
+        _adapter_class = PooledAdapter
+    return _adapter_class
+
+
+def get_session(host):
+    """
+    Get the container-wide session for a provider host.
+
+    Args:
+        host (str): The provider host, e.g. "graph.facebook.com".
+
+    Returns:
+        requests.Session: The pooled session.
+    """
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _get_requests().Session()
+            session.mount(
+                "https://",
+                _get_adapter_class()(
+                    pool_connections=1,
+                    pool_maxsize=PROVIDER_POOL_MAXSIZE,
+                    max_retries=0,
+                ),
+            )
+            _sessions[host] = session
+    return session
+
+
+def session_stats():
+    """
+    Get the connection reuse counters of every provider session.
+
+    Returns:
+        dict: requests and connections opened since the container started, by host.
+    """
+    stats = dict()
+    for host, session in list(_sessions.items()):
+        pool = session.get_adapter("https://").poolmanager.connection_from_host(
+            host, 443, "https"
+        )
+        stats[host] = {
+            "requests": pool.num_requests,
+            "connections": pool.num_connections,
+        }
+    return stats
+
+
+def get_google_request():
+    """
+    Get the google-auth transport bound to the pooled googleapis.com session.
+    """
+    global _google_request
+    if _google_request is None:
+        _, grequests = _get_google()
+        _google_request = functools.partial(
+            grequests.Request(session=get_session(GOOGLE_HOST)),
+            timeout=PROVIDER_TIMEOUT,
+        )
+    return _google_request
+
+
+@helper.register_warmer
+def warm_identity_providers():
+    """
+    Import the provider libraries and prefetch the Google certificates.
+    """
+    google_cert_cache.get(get_google_request())
+
+
+def _http(method, url, **kwargs):
+    """
+    Send an identity provider request on the host's pooled session, timed as
+    a tracing span.
+    """
+    host = urlsplit(url).netloc
+    with tracing.span("http", method + " " + host) as span:
+        resp = get_session(host).request(method, url, **kwargs)
+        if resp.status_code >= 300:
+            span.status = str(resp.status_code)
+    return resp
 
 
 def google_code_to_access_token(
     google_client_id, google_client_secret, google_redirect_uri, code
 ):
     try:
-        resp = requests.post(
+        resp = _http(
+            "POST",
             "https://www.googleapis.com/oauth2/v4/token",
             data={
                 "code": code,
@@ -34,19 +188,59 @@ def google_code_to_access_token(
         return None, "Invalid code."
 
 
+# Verified Google ID tokens, until their `exp`. Clients retry with the same
+# token, and a retry skips the signature, issuer and audience checks.
+GOOGLE_TOKEN_CACHE_MAXSIZE = int(os.environ.get("GOOGLE_TOKEN_CACHE_MAXSIZE", 1024))
+google_token_cache = TokenCache("GoogleIdToken", GOOGLE_TOKEN_CACHE_MAXSIZE)
+# The audience of Google ID tokens, when the caller has no Google secret.
+GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
+# the secret of the Google app, its "client_id" is used without GOOGLE_CLIENT_ID
+GOOGLE_SECRET_ARN = os.environ.get("GOOGLE_SECRET_ARN")
+
+
+def get_google_client_id():
+    """
+    Get the client ID Google ID tokens must be issued to.
+
+    Returns:
+        str: GOOGLE_CLIENT_ID, else the client_id of the GOOGLE_SECRET_ARN secret, None if neither is set.
+        str: The error message.
+    """
+    if GOOGLE_CLIENT_ID is not None or GOOGLE_SECRET_ARN is None:
+        return GOOGLE_CLIENT_ID, None
+    try:
+        return secrets_provider.get_secret(GOOGLE_SECRET_ARN)["client_id"], None
+    except Exception as e:
+        return None, e.__str__()
+
+
 def verify_google_id_token(google_client_id, token):
     """
     Verify the Google ID token.
     """
+    if google_client_id is None:
+        # without an audience any app's token would be accepted
+        return None, "Invalid ID token."
+    google_id_info = google_token_cache.get(token, scope=google_client_id)
+    if google_id_info is not None:
+        return google_id_info, None
+
+    gjwt, _ = _get_google()
     try:
-        google_id_info = gid_token.verify_oauth2_token(
-            token, grequests.Request(), google_client_id
-        )
+        # the same checks as google.oauth2.id_token.verify_oauth2_token, with
+        # the certificates from the container-wide cache
+        kid = gjwt.decode_header(token).get("kid")
+        certs = google_cert_cache.get(get_google_request(), kid)
+        with tracing.span("google", "verify_id_token"):
+            google_id_info = gjwt.decode(token, certs=certs, audience=google_client_id)
         if google_id_info["iss"] not in [
             "accounts.google.com",
             "https://accounts.google.com",
         ]:
             raise ValueError("Wrong issuer.")
+        google_token_cache.put(
+            token, google_id_info, google_id_info["exp"], scope=google_client_id
+        )
         return google_id_info, None
     except ValueError:
         return None, "Invalid ID token."
@@ -56,22 +250,23 @@ def mapping_google_id_info_to_sso_user_info(cognito_id, cognito_email, google_id
     """
     Map the Google ID token info to the user info.
     """
-    sso_user_info = dict()
-    sso_user_info["cognito_id"] = cognito_id
-    sso_user_info["cognito_email"] = cognito_email
-    sso_user_info["federated_id"] = "google" + "_" + google_id_info["sub"]
-    sso_user_info["first_name"] = google_id_info["given_name"]
-    sso_user_info["last_name"] = google_id_info["family_name"]
-    sso_user_info["email"] = google_id_info["email"]
-    sso_user_info["picture"] = google_id_info["picture"]
-    return sso_user_info
+    return FederatedUserRecord(
+        cognito_id=cognito_id,
+        cognito_email=cognito_email,
+        federated_id="google" + "_" + google_id_info["sub"],
+        first_name=google_id_info["given_name"],
+        last_name=google_id_info["family_name"],
+        email=google_id_info["email"],
+        picture=google_id_info["picture"],
+    )
 
 
 def facebook_code_to_access_token(
     facebook_client_id, facebook_client_secret, facebook_redirect_uri, code
 ):
     try:
-        resp = requests.post(
+        resp = _http(
+            "POST",
             "https://graph.facebook.com/v3.3/oauth/access_token",
             data={
                 "client_id": facebook_client_id,
@@ -88,17 +283,40 @@ def facebook_code_to_access_token(
         return None, "Invalid code."
 
 
+# Provider profiles of recently verified access tokens. The TTL is far below
+# the provider token lifetimes (hours for Facebook, days for LinkedIn), so a
+# revoked token is rejected again within PROVIDER_PROFILE_TTL seconds.
+PROVIDER_PROFILE_TTL = int(os.environ.get("PROVIDER_PROFILE_TTL", 60))
+PROVIDER_PROFILE_CACHE_MAXSIZE = int(
+    os.environ.get("PROVIDER_PROFILE_CACHE_MAXSIZE", 1024)
+)
+facebook_profile_cache = TokenCache(
+    "FacebookProfile", PROVIDER_PROFILE_CACHE_MAXSIZE, max_ttl=PROVIDER_PROFILE_TTL
+)
+linkedin_profile_cache = TokenCache(
+    "LinkedInProfile", PROVIDER_PROFILE_CACHE_MAXSIZE, max_ttl=PROVIDER_PROFILE_TTL
+)
+
+
 def verify_facebook_access_token(access_token):
     """
     Verify the Facebook access token.
     """
+    facebook_user_info = facebook_profile_cache.get(access_token)
+    if facebook_user_info is not None:
+        return facebook_user_info, None
     try:
-        resp = requests.get(
+        resp = _http(
+            "GET",
             "https://graph.facebook.com/me?fields=id,name,first_name,last_name,email,picture&access_token="
-            + access_token
+            + access_token,
         )
         if resp.status_code == 200:
-            return resp.json(), None
+            facebook_user_info = resp.json()
+            facebook_profile_cache.put(
+                access_token, facebook_user_info, time.time() + PROVIDER_PROFILE_TTL
+            )
+            return facebook_user_info, None
         else:
             return None, "Invalid access token."
     except Exception as e:
@@ -111,22 +329,23 @@ def mapping_facebook_user_info_to_sso_user_info(
     """
     Map the Facebook ID token info to the user info.
     """
-    sso_user_info = dict()
-    sso_user_info["cognito_id"] = cognito_id
-    sso_user_info["cognito_email"] = cognito_email
-    sso_user_info["federated_id"] = "facebook" + "_" + facebook_user_info["id"]
-    sso_user_info["first_name"] = facebook_user_info["first_name"]
-    sso_user_info["last_name"] = facebook_user_info["last_name"]
-    sso_user_info["email"] = facebook_user_info["email"]
-    sso_user_info["picture"] = facebook_user_info["picture"]["data"]["url"]
-    return sso_user_info
+    return FederatedUserRecord(
+        cognito_id=cognito_id,
+        cognito_email=cognito_email,
+        federated_id="facebook" + "_" + facebook_user_info["id"],
+        first_name=facebook_user_info["first_name"],
+        last_name=facebook_user_info["last_name"],
+        email=facebook_user_info["email"],
+        picture=facebook_user_info["picture"]["data"]["url"],
+    )
 
 
 def linkedin_code_to_access_token(
     linkedin_client_id, linkedin_client_secret, linkedin_redirect_uri, code
 ):
     try:
-        resp = requests.post(
+        resp = _http(
+            "POST",
             "https://www.linkedin.com/oauth/v2/accessToken",
             data={
                 "grant_type": "authorization_code",
@@ -150,15 +369,23 @@ def verify_linkedin_access_token(access_token):
     """
     Verify the LinkedIn access token.
     """
+    linkedin_user_info = linkedin_profile_cache.get(access_token)
+    if linkedin_user_info is not None:
+        return linkedin_user_info, None
     try:
 
         headers = {"Authorization": "Bearer " + access_token}
-        resp = requests.get(
+        resp = _http(
+            "GET",
             "https://api.linkedin.com/v2/me?projection=(id,localizedFirstName,localizedLastName,vanityName,firstName,lastName,emailAddress,headline,profilePicture(displayImage~:playableStreams))",
             headers=headers,
         )
         if resp.status_code == 200:
-            return resp.json(), None
+            linkedin_user_info = resp.json()
+            linkedin_profile_cache.put(
+                access_token, linkedin_user_info, time.time() + PROVIDER_PROFILE_TTL
+            )
+            return linkedin_user_info, None
         else:
             return None, "Invalid access token."
     except Exception as e:
@@ -171,27 +398,53 @@ def mapping_linkedin_user_info_to_sso_user_info(
     """
     Map the LinkedIn ID token info to the user info.
     """
-    sso_user_info = dict()
-    sso_user_info["cognito_id"] = cognito_id
-    sso_user_info["cognito_email"] = cognito_email
-    sso_user_info["federated_id"] = "linkedin" + "_" + linkedin_user_info["id"]
-    sso_user_info["first_name"] = linkedin_user_info["localizedFirstName"]
-    sso_user_info["last_name"] = linkedin_user_info["localizedLastName"]
+    sso_user_info = FederatedUserRecord(
+        cognito_id=cognito_id,
+        cognito_email=cognito_email,
+        federated_id="linkedin" + "_" + linkedin_user_info["id"],
+        first_name=linkedin_user_info["localizedFirstName"],
+        last_name=linkedin_user_info["localizedLastName"],
+    )
     try:
-        sso_user_info["picture"] = linkedin_user_info["profilePicture"][
-            "displayImage~"
-        ]["elements"][0]["identifiers"][0]["identifier"]
+        sso_user_info.picture = linkedin_user_info["profilePicture"]["displayImage~"][
+            "elements"
+        ][0]["identifiers"][0]["identifier"]
     except Exception as e:
-        sso_user_info["picture"] = ""
+        sso_user_info.picture = ""
     return sso_user_info
 
 
+def prefetch_platform_login(platform_login_data):
+    """
+    Verify the provider token of a login ahead of
+    verify_federate_and_register_or_get_user, which then reads the profile
+    (or the Google certificates) from the caches. It can run alongside other
+    calls, errors are left to verify_federate_and_register_or_get_user to report.
+
+    Args:
+        platform_login_data (dict): The platform and the provider tokens.
+    """
+    platform = platform_login_data.get("platform", "").lower()
+    try:
+        if platform == "facebook" and "access_token" in platform_login_data:
+            verify_facebook_access_token(platform_login_data["access_token"])
+        elif platform == "linkedin" and "access_token" in platform_login_data:
+            verify_linkedin_access_token(platform_login_data["access_token"])
+        elif platform == "google" and "id_token" in platform_login_data:
+            gjwt, _ = _get_google()
+            kid = gjwt.decode_header(platform_login_data["id_token"]).get("kid")
+            google_cert_cache.get(get_google_request(), kid)
+    except Exception as e:
+        print("Provider prefetch failed: " + e.__str__())
+
+
 def verify_federate_and_register_or_get_user(
     user_table_name,
     platform_login_data,
     mode="register",
     user_cognito_id=None,
     cognito_email=None,
+    google_client_id=None,
 ):
     platform = None
     platform_id_token = None
@@ -207,7 +460,14 @@ def verify_federate_and_register_or_get_user(
         if platform == "google":
             if platform_id_token is not None:
                 # Specify the CLIENT_ID of the app that accesses the backend:
-                google_id_info, msg = verify_google_id_token(token=platform_id_token)
+                if google_client_id is None:
+                    google_client_id, msg = get_google_client_id()
+                    if msg != None:
+                        return None, msg
+                google_id_info, msg = verify_google_id_token(
+                    google_client_id=google_client_id,
+                    token=platform_id_token,
+                )
                 if msg != None:
                     return None, msg
 
@@ -217,7 +477,7 @@ def verify_federate_and_register_or_get_user(
                     cognito_email=cognito_email,
                     google_id_info=google_id_info,
                 )
-                if sso_user_info["federated_id"] is not None:
+                if sso_user_info.federated_id is not None:
 
                     # Check if the user already exists.
                     exist_accounts, msg = query_federated_id(
@@ -260,7 +520,7 @@ def verify_federate_and_register_or_get_user(
                     cognito_email=cognito_email,
                     facebook_user_info=facebook_user_info,
                 )
-                if sso_user_info["federated_id"] is not None:
+                if sso_user_info.federated_id is not None:
 
                     # Check if the user already exists.
                     exist_accounts, msg = query_federated_id(
@@ -300,7 +560,7 @@ def verify_federate_and_register_or_get_user(
                     cognito_email=cognito_email,
                     linkedin_user_info=linkedin_user_info,
                 )
-                if sso_user_info["federated_id"] is not None:
+                if sso_user_info.federated_id is not None:
 
                     exist_accounts, msg = query_federated_id(
                         user_table_name=user_table_name, sso_user_info=sso_user_info
@@ -332,7 +592,7 @@ def verify_federate_and_register_or_get_user(
 
 
 def query_federated_id(user_table_name, sso_user_info):
-    dynamodb_client = boto3.client("dynamodb")
+    dynamodb_client = helper.get_client("dynamodb")
     try:
         resp = dynamodb_client.query(
             TableName=user_table_name,
@@ -340,22 +600,22 @@ def query_federated_id(user_table_name, sso_user_info):
             KeyConditionExpression="federated_id = :id",
             ExpressionAttributeValues={
                 ":id": {
-                    "S": str(sso_user_info["federated_id"]),
+                    "S": str(sso_user_info.federated_id),
                 },
             },
         )
-        exist_accounts = dynamodb_utils.loads(resp["Items"])
+        exist_accounts = [FederatedUserRecord.from_item(item) for item in resp["Items"]]
         return exist_accounts, None
     except Exception as e:
         return None, "Failed to query federated id."
 
 
 def put_user_info(user_table_name, sso_user_info):
-    dynamodb_client = boto3.client("dynamodb")
+    dynamodb_client = helper.get_client("dynamodb")
     try:
         resp = dynamodb_client.put_item(
             TableName=user_table_name,
-            Item=dynamodb_utils.dumps(sso_user_info, as_dict=True),
+            Item=sso_user_info.to_item(),
             ConditionExpression="attribute_not_exists(federated_id)",
         )
         return sso_user_info, None
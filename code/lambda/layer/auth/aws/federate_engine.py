@@ -0,0 +1,220 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from aws import federate
+from aws import helper
+from aws import secrets_provider
+from aws.google_certs import google_cert_cache
+
+# The steps of a federated login run as asyncio tasks. The layer has no async
+# HTTP client, so every task runs its blocking call (requests on the pooled
+# provider sessions, boto3) on a container-wide thread pool, and the event
+# loop only orders the steps.
+FEDERATION_WORKERS = int(os.environ.get("FEDERATION_WORKERS", 8))
+
+PERMISSION_DENIED = "You do not have permission to access this resource."
+
+_executor = None
+_loop = None
+_lock = threading.Lock()
+
+
+def _get_loop():
+    global _executor, _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=FEDERATION_WORKERS,
+                    thread_name_prefix="federation",
+                )
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(_executor)
+                _loop = loop
+    return _loop
+
+
+async def _run(func, *args, **kwargs):
+    return await asyncio.get_event_loop().run_in_executor(
+        None, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def _prefetch_google_certs():
+    try:
+        await _run(google_cert_cache.get, federate.get_google_request())
+    except Exception as e:
+        # verify_google_id_token fetches them again and reports the error
+        print("Google certificates prefetch failed: " + e.__str__())
+
+
+async def _verify(user_table_name, platform_login_data, secret_arn):
+    google_client_id = None
+    if platform_login_data["platform"] == "google" and secret_arn is not None:
+        # Google ID tokens are issued to the client ID of the Google app
+        secret_dict = await _run(secrets_provider.get_secret, secret_arn)
+        google_client_id = secret_dict["client_id"]
+    return await _run(
+        federate.verify_federate_and_register_or_get_user,
+        user_table_name=user_table_name,
+        platform_login_data=platform_login_data,
+        mode="get",
+        google_client_id=google_client_id,
+    )
+
+
+async def _code_to_access_token(platform, secret_arn, platform_redirect_uri, code):
+    if platform not in ("linkedin", "facebook", "google"):
+        return None, "Invalid platform."
+    secret_dict = await _run(secrets_provider.get_secret, secret_arn)
+    if platform == "linkedin":
+        return await _run(
+            federate.linkedin_code_to_access_token,
+            linkedin_client_id=secret_dict["client_id"],
+            linkedin_client_secret=secret_dict["client_secret"],
+            linkedin_redirect_uri=platform_redirect_uri,
+            code=code,
+        )
+    elif platform == "facebook":
+        return await _run(
+            federate.facebook_code_to_access_token,
+            facebook_client_id=secret_dict["client_id"],
+            facebook_client_secret=secret_dict["client_secret"],
+            facebook_redirect_uri=platform_redirect_uri,
+            code=code,
+        )
+    elif platform == "google":
+        return await _run(
+            federate.google_code_to_access_token,
+            google_client_id=secret_dict["client_id"],
+            google_client_secret=secret_dict["client_secret"],
+            google_redirect_uri=platform_redirect_uri,
+            code=code,
+        )
+
+
+async def _cancel(*tasks):
+    for task in tasks:
+        task.cancel()
+    # a step already running on the pool finishes, only its result is dropped
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _exchange(
+    user_pool_id,
+    user_table_name,
+    client_id,
+    redirect_uri,
+    platform_login_data,
+    platform_code,
+    platform_redirect_uri,
+    secret_arn,
+):
+    platform = platform_login_data["platform"]
+    validate = asyncio.ensure_future(
+        _run(
+            helper.verify_client_id_and_redirect_uri,
+            user_pool_id=user_pool_id,
+            client_id=client_id,
+            redirect_uri=redirect_uri,
+        )
+    )
+    prefetches = []
+    if platform_code is not None and secret_arn is not None:
+        prefetches.append(
+            asyncio.ensure_future(_run(secrets_provider.get_secret, secret_arn))
+        )
+    if platform == "google":
+        prefetches.append(asyncio.ensure_future(_prefetch_google_certs()))
+
+    verify = None
+    if platform_code is None and (
+        "id_token" in platform_login_data or "access_token" in platform_login_data
+    ):
+        # a provider token is only read, so it is verified with the client
+        verify = asyncio.ensure_future(
+            _verify(user_table_name, platform_login_data, secret_arn)
+        )
+
+    pending = prefetches + ([verify] if verify is not None else [])
+    try:
+        _, msg = await validate
+    except BaseException:
+        await _cancel(*pending)
+        raise
+    if msg != None:
+        await _cancel(*pending)
+        return None, msg
+    # the prefetches only warm caches, the steps below read them again
+    await asyncio.gather(*prefetches, return_exceptions=True)
+
+    if platform_code is not None:
+        # the provider code is single use, so it is redeemed for a valid client only
+        if platform == "linkedin" and platform_redirect_uri is None:
+            return None, PERMISSION_DENIED
+        resp, msg = await _code_to_access_token(
+            platform, secret_arn, platform_redirect_uri, platform_code
+        )
+        if msg != None:
+            return None, msg
+        # an access token sent with the code takes precedence, as before
+        platform_login_data.setdefault("access_token", resp["access_token"])
+        verify = asyncio.ensure_future(
+            _verify(user_table_name, platform_login_data, secret_arn)
+        )
+
+    federate_account = None
+    if verify is not None:
+        federate_account, msg = await verify
+        if msg != None:
+            return None, msg
+    return federate_account, None
+
+
+def exchange_platform_login(
+    user_pool_id,
+    user_table_name,
+    client_id,
+    redirect_uri,
+    platform_login_data,
+    platform_code=None,
+    platform_redirect_uri=None,
+    secret_arn=None,
+):
+    """
+    Validate the client and get the user of a federated login.
+
+    The client validation runs concurrently with the prefetch of the provider
+    secret and, for Google, the signing certificates. A provider token sent
+    by the client is verified at the same time. A provider code is redeemed
+    once the client is valid, and its access token verified.
+
+    Args:
+        user_pool_id (str): The user pool ID.
+        user_table_name (str): The user table name.
+        client_id (str): The app client ID.
+        redirect_uri (str): The redirect URI of the app client.
+        platform_login_data (dict): The platform and the provider tokens, gets the access token of a code.
+        platform_code (str): The provider authorization code, if any.
+        platform_redirect_uri (str): The redirect URI the code was issued to.
+        secret_arn (str): The ARN of the provider app secret, for Google its client_id is the ID token audience.
+
+    Returns:
+        FederatedUserRecord: The user, None if the login has no provider token or the user does not exist.
+        str: The error message, None if successful.
+    """
+    return _get_loop().run_until_complete(
+        _exchange(
+            user_pool_id,
+            user_table_name,
+            client_id,
+            redirect_uri,
+            platform_login_data,
+            platform_code,
+            platform_redirect_uri,
+            secret_arn,
+        )
+    )
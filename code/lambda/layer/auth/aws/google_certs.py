@@ -0,0 +1,168 @@
+import os
+import re
+import threading
+import time
+
+from aws import json_backend as json
+from aws import tracing
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+# used when the response has no Cache-Control max-age
+GOOGLE_CERTS_DEFAULT_MAX_AGE = int(os.environ.get("GOOGLE_CERTS_DEFAULT_MAX_AGE", 300))
+# certificates this close to expiry are refreshed in the background, at most
+# a tenth of their lifetime ahead
+GOOGLE_CERTS_REFRESH_AHEAD = int(os.environ.get("GOOGLE_CERTS_REFRESH_AHEAD", 300))
+GOOGLE_CERTS_MIN_REFETCH_INTERVAL = int(
+    os.environ.get("GOOGLE_CERTS_MIN_REFETCH_INTERVAL", 60)
+)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def _max_age(headers, default):
+    """
+    Get the freshness lifetime of a response from Cache-Control and Age.
+    """
+    match = _MAX_AGE.search(headers.get("cache-control", ""))
+    if match is None:
+        return default
+    try:
+        age = int(headers.get("age", 0))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleCertCache(object):
+    """
+    The certificates Google signs ID tokens with.
+
+    The certificates are kept for the max-age Google sends (hours, usually),
+    so a Google login does no certificate fetch. Within `refresh_ahead`
+    seconds of expiry, or the last tenth of the lifetime if that is shorter,
+    a single background refresh replaces them. A failed refresh is retried
+    after `min_refetch_interval` seconds. An unknown `kid` triggers one
+    synchronous refetch, at most once per `min_refetch_interval` seconds.
+
+    Note that Lambda freezes background threads between invocations, so a
+    refresh started at the end of an invocation completes in the next one.
+    """
+
+    def __init__(
+        self,
+        certs_url=GOOGLE_CERTS_URL,
+        default_max_age=GOOGLE_CERTS_DEFAULT_MAX_AGE,
+        refresh_ahead=GOOGLE_CERTS_REFRESH_AHEAD,
+        min_refetch_interval=GOOGLE_CERTS_MIN_REFETCH_INTERVAL,
+    ):
+        self.certs_url = certs_url
+        self.default_max_age = default_max_age
+        self.refresh_ahead = refresh_ahead
+        self.min_refetch_interval = min_refetch_interval
+        self.hits = 0
+        self.fetches = 0
+        self._certs = None
+        self._expires_at = None
+        self._refresh_at = None
+        self._attempted_at = None
+        # no background refresh before this time, after a failed one
+        self._retry_after = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get(self, request, kid=None):
+        """
+        Get the certificates.
+
+        Args:
+            request (google.auth.transport.Request): The transport for fetches.
+            kid (str): The key ID the token needs, if known.
+
+        Returns:
+            dict: The x509 certificates by key ID.
+
+        Raises:
+            google.auth.exceptions.TransportError: If a needed fetch failed.
+        """
+        now = time.monotonic()
+        certs = self._certs
+        if certs is not None and now < self._expires_at:
+            if kid is None or kid in certs:
+                self.hits += 1
+                if now >= self._refresh_at and now >= self._retry_after:
+                    self._refresh_in_background(request)
+                return certs
+
+        with self._lock:
+            certs = self._certs
+            now = time.monotonic()
+            if certs is None or now >= self._expires_at:
+                return self._fetch(request)
+            if kid is not None and kid not in certs:
+                # every unknown kid refetch, including a failed one, is rate limited
+                if now - self._attempted_at >= self.min_refetch_interval:
+                    return self._fetch(request)
+            return certs
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: hits, fetches and the seconds left before expiry.
+        """
+        expires_in = None
+        if self._expires_at is not None:
+            expires_in = round(self._expires_at - time.monotonic(), 3)
+        return {"hits": self.hits, "fetches": self.fetches, "expires_in": expires_in}
+
+    def invalidate(self):
+        with self._lock:
+            self._certs = None
+            self._expires_at = None
+            self._refresh_at = None
+            self._retry_after = 0.0
+
+    def _refresh_in_background(self, request):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        thread = threading.Thread(target=self._refresh, args=(request,))
+        thread.daemon = True
+        thread.start()
+
+    def _refresh(self, request):
+        try:
+            with self._lock:
+                self._fetch(request)
+        except Exception as e:
+            # keep serving the current certificates until they expire
+            self._retry_after = time.monotonic() + self.min_refetch_interval
+            print("Google certificates refresh failed: " + e.__str__())
+        finally:
+            self._refreshing = False
+
+    def _fetch(self, request):
+        # called with the lock held
+        self._attempted_at = time.monotonic()
+        self.fetches += 1
+        with tracing.span("http", "GET www.googleapis.com certs") as span:
+            response = request(self.certs_url, method="GET")
+            if response.status != 200:
+                span.status = str(response.status)
+        if response.status != 200:
+            from google.auth import exceptions
+
+            raise exceptions.TransportError(
+                "Could not fetch certificates at {}".format(self.certs_url)
+            )
+        certs = json.loads(response.data.decode("utf-8"))
+        max_age = _max_age(response.headers, self.default_max_age)
+        self._certs = certs
+        self._expires_at = self._attempted_at + max_age
+        self._refresh_at = self._expires_at - min(self.refresh_ahead, max_age // 10)
+        return certs
+
+
+google_cert_cache = GoogleCertCache()
@@ -1,22 +1,78 @@
+# first, so that COLD_START_PROFILE times every import below
+from aws import coldstart
 import boto3
 import botocore.exceptions
+from botocore.config import Config
 import base64
-import json
 import hmac
 import hashlib
+import os
+import threading
 import traceback
 import uuid
 import time
 
 import re
 
-from aws import dynamodb_utils
+from cachetools.func import swr_cache
+
+from aws import json_backend as json
+from aws import tracing
+from aws.models import AuthCodeRecord
 
 
 class Helper:
     EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
 
+# boto3 clients are built once per container and reused across warm invocations.
+# Pool size and timeouts can be tuned per function through environment variables.
+CLIENT_MAX_POOL_CONNECTIONS = int(os.environ.get("CLIENT_MAX_POOL_CONNECTIONS", 10))
+CLIENT_CONNECT_TIMEOUT = float(os.environ.get("CLIENT_CONNECT_TIMEOUT", 2))
+CLIENT_READ_TIMEOUT = float(os.environ.get("CLIENT_READ_TIMEOUT", 5))
+CLIENT_MAX_ATTEMPTS = int(os.environ.get("CLIENT_MAX_ATTEMPTS", 3))
+
+_clients = dict()
+_clients_lock = threading.Lock()
+
+
+def get_client(service_name, region_name=None):
+    """
+    Get the container-wide boto3 client for a service.
+
+    The client (and its keep-alive connection pool) is created on first use
+    and shared by every later call in the same container.
+
+    Args:
+        service_name (str): The AWS service name, e.g. "cognito-idp".
+        region_name (str): The region, defaults to the Lambda region.
+
+    Returns:
+        botocore.client.BaseClient: The shared client.
+    """
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    # boto3's default session is not thread safe, so build clients under a lock
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = boto3.client(
+                service_name,
+                region_name=region_name,
+                config=Config(
+                    max_pool_connections=CLIENT_MAX_POOL_CONNECTIONS,
+                    connect_timeout=CLIENT_CONNECT_TIMEOUT,
+                    read_timeout=CLIENT_READ_TIMEOUT,
+                    retries={"max_attempts": CLIENT_MAX_ATTEMPTS, "mode": "standard"},
+                ),
+            )
+            tracing.instrument_client(client)
+            _clients[key] = client
+    return client
+
+
 def represents_int(s):
     try:
         int(s)
@@ -42,7 +98,7 @@ def get_secret_hash(username, client_id, client_secret):
 
 
 def delete_user(user_pool_id, username):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
     try:
         resp = client.admin_delete_user(UserPoolId=user_pool_id, Username=username)
     except Exception as e:
@@ -52,7 +108,7 @@ def delete_user(user_pool_id, username):
 
 
 def get_user(user_pool_id, username):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
     try:
         resp = client.admin_get_user(UserPoolId=user_pool_id, Username=username)
     except Exception as e:
@@ -62,7 +118,7 @@ def get_user(user_pool_id, username):
 
 
 def admin_create_user(user_pool_id, email, password):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     try:
         resp = client.admin_create_user(
@@ -108,7 +164,7 @@ def admin_confirm_signUp(
     client_secret=None,
     client_metadata=dict(),
 ):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     if not client_secret is None:
         secretHash = get_secret_hash(username, client_id, client_secret)
@@ -139,7 +195,7 @@ def admin_confirm_signUp(
 def confirm_sign_up(
     username, email, code, client_id, client_secret=None, client_metadata=dict()
 ):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     if not client_secret is None:
         secretHash = get_secret_hash(username, client_id, client_secret)
@@ -173,7 +229,7 @@ def confirm_forgot_password(
     client_secret=None,
     client_metadata=dict(),
 ):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     if not client_secret is None:
         secretHash = get_secret_hash(username, client_id, client_secret)
@@ -207,7 +263,7 @@ def register(
     client_secret=None,
     client_metadata=dict(),
 ):
-    cognito_client = boto3.client("cognito-idp")
+    cognito_client = get_client("cognito-idp")
     userAttributes = list()
     userAttribute = dict()
     userAttribute["Name"] = "email"
@@ -250,7 +306,7 @@ def register(
 
 
 def resend_confirm(username, client_id, client_secret=None, client_metadata=dict()):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     if not client_secret is None:
         secretHash = get_secret_hash(username, client_id, client_secret)
@@ -271,7 +327,7 @@ def resend_confirm(username, client_id, client_secret=None, client_metadata=dict
 
 
 def forgot_password(username, client_id, client_secret=None, client_metadata=dict()):
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     if not client_secret is None:
         secretHash = get_secret_hash(username, client_id, client_secret)
@@ -298,7 +354,7 @@ def forgot_password(username, client_id, client_secret=None, client_metadata=dic
 # def refreshAuth(user_pool_id, username, refreshToken, client_id, client_secret):
 def refresh_auth(username, refreshToken, client_id, client_secret=None):
 
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     authParameters = dict()
     authParameters["REFRESH_TOKEN"] = refreshToken
@@ -348,7 +404,7 @@ def initiate_auth(
         dict: The response.
         str: The error message.
     """
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
 
     auth_parameters = dict()
     client_metadata = dict()
@@ -408,6 +464,24 @@ EXPOSE_HEADERS = "Content-Type"
 ALLOW_CREDENTIALS = "true"
 
 
+# Header templates are shared by every response with the same status code.
+# They are never mutated once built, so no per-call copy is needed.
+_response_headers = dict()
+
+
+def _get_response_headers(status_code):
+    headers = _response_headers.get(status_code)
+    if headers is None:
+        headers = dict()
+        headers["Content-Type"] = "application/json"
+        headers["Access-Control-Allow-Origin"] = ALLOW_ORIGIN
+        headers["Access-Control-Expose-Headers"] = EXPOSE_HEADERS
+        if status_code != 200:
+            headers["x-amzn-ErrorType"] = status_code
+        _response_headers[status_code] = headers
+    return headers
+
+
 def build_response(
     body,
     status_code=200,
@@ -416,15 +490,36 @@ def build_response(
     resp = dict()
     resp["isBase64Encoded"] = False
     resp["statusCode"] = status_code
-    resp["headers"] = dict()
-    resp["headers"]["Content-Type"] = "application/json"
-    resp["headers"]["Access-Control-Allow-Origin"] = ALLOW_ORIGIN
-    resp["headers"]["Access-Control-Expose-Headers"] = EXPOSE_HEADERS
+    resp["headers"] = _get_response_headers(status_code)
+    resp["body"] = json.dumps(body, separators=(",", ":"))
+    return resp
+
+
+_static_responses = dict()
+
+
+def static_response(
+    message,
+    status_code=200,
+):
+    """
+    Get the response for a constant {"message": message} body.
 
-    if status_code != 200:
-        resp["headers"]["x-amzn-ErrorType"] = status_code
+    The response is encoded once per container and then shared, so callers
+    must not mutate it. Use build_response for dynamic bodies.
+
+    Args:
+        message (str): The constant message.
+        status_code (int): The HTTP status code.
 
-    resp["body"] = json.dumps(body)
+    Returns:
+        dict: The response.
+    """
+    key = (message, status_code)
+    resp = _static_responses.get(key)
+    if resp is None:
+        resp = build_response({"message": message}, status_code)
+        _static_responses[key] = resp
     return resp
 
 
@@ -465,30 +560,128 @@ class HTTPNotFoundException(Error):
         self.message = message
 
 
+# A scheduled {"warmup": true} event runs the registered warmers instead of the
+# handler. Client IDs listed in WARMUP_CLIENT_IDS have their metadata prefetched.
+WARMUP_EVENT_KEY = "warmup"
+WARMUP_CLIENT_IDS = [
+    client_id
+    for client_id in os.environ.get("WARMUP_CLIENT_IDS", "").split(",")
+    if client_id
+]
+
+_warmers = []
+
+
+def register_warmer(func):
+    """
+    Register a function to run on warm-up events. Usable as a decorator.
+
+    Args:
+        func (callable): The warmer, called without arguments.
+
+    Returns:
+        callable: The same function.
+    """
+    _warmers.append(func)
+    return func
+
+
+def is_warmup_event(event):
+    return isinstance(event, dict) and event.get(WARMUP_EVENT_KEY) is True
+
+
+def warm_up():
+    """
+    Run every registered warmer. A failing warmer does not stop the others.
+
+    Returns:
+        dict: The status and duration of each warmer, by name.
+    """
+    results = dict()
+    for warmer in _warmers:
+        start = time.perf_counter()
+        try:
+            warmer()
+            status = "ok"
+        except Exception as e:
+            status = e.__str__()
+        results[warmer.__name__] = {
+            "status": status,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+    return results
+
+
+@register_warmer
+def warm_cognito():
+    """
+    Build the Cognito client and prefetch the metadata of WARMUP_CLIENT_IDS,
+    which also opens its connection. Without configured IDs no call is made.
+    """
+    get_client("cognito-idp")
+    user_pool_id = os.environ.get("USER_POOL_ID")
+    if user_pool_id is None:
+        return
+    for client_id in WARMUP_CLIENT_IDS:
+        user_pool_client_cache.get(user_pool_id, client_id)
+
+
+@register_warmer
+def warm_dynamodb():
+    """
+    Build the DynamoDB client and open its connection.
+    """
+    table_name = os.environ.get("AUTH_CODE_TABLE_NAME") or os.environ.get(
+        "USER_TABLE_NAME"
+    )
+    if table_name is None:
+        return
+    dynamodb_client = get_client("dynamodb")
+    try:
+        dynamodb_client.describe_table(TableName=table_name)
+    except botocore.exceptions.ClientError:
+        pass
+
+
 class DeveloperMode(object):
-    def __init__(self, status=False):
+    def __init__(self, status=False, profile_cold_start=coldstart.COLD_START_PROFILE):
         self.status = status
+        self.profile_cold_start = profile_cold_start
 
     def __call__(self, func):
         def wrapper(*args, **kwargs):
-            if self.status:
-                try:
-                    response = func(*args, **kwargs)
-                    return response
-                except HTTPNotFoundException as e:
-                    print(str(e))
-                    return build_response(str(e), 404)
-                except HTTPForbiddenException as e:
-                    print(str(e))
-                    return build_response(str(e), 403)
-                except Exception:
-                    print(traceback.format_exc().split("\n"))
-                    return build_response(traceback.format_exc().split("\n"), 502)
-            else:
-                return func(*args, **kwargs)
+            if self.profile_cold_start:
+                # writes the cold start report on the first invocation only
+                coldstart.on_invoke()
+            try:
+                event = args[0] if args else kwargs.get("event")
+                if is_warmup_event(event):
+                    # initialize only, the handler is not run
+                    return {WARMUP_EVENT_KEY: warm_up()}
+                return self._invoke(func, *args, **kwargs)
+            finally:
+                # one EMF line with the downstream call spans of the invocation
+                tracing.flush()
 
         return wrapper
 
+    def _invoke(self, func, *args, **kwargs):
+        if self.status:
+            try:
+                response = func(*args, **kwargs)
+                return response
+            except HTTPNotFoundException as e:
+                print(str(e))
+                return build_response(str(e), 404)
+            except HTTPForbiddenException as e:
+                print(str(e))
+                return build_response(str(e), 403)
+            except Exception:
+                print(traceback.format_exc().split("\n"))
+                return build_response(traceback.format_exc().split("\n"), 502)
+        else:
+            return func(*args, **kwargs)
+
 
 def get_cognito_username_from_id_token(idToken):
     """
@@ -510,6 +703,130 @@ def get_cognito_username_from_id_token(idToken):
         return None, e.__str__()
 
 
+CLIENT_METADATA_TTL = int(os.environ.get("CLIENT_METADATA_TTL", 300))
+CLIENT_METADATA_NEGATIVE_TTL = int(os.environ.get("CLIENT_METADATA_NEGATIVE_TTL", 30))
+CLIENT_METADATA_MAX_STALE = int(os.environ.get("CLIENT_METADATA_MAX_STALE", 3600))
+CLIENT_METADATA_MAXSIZE = int(os.environ.get("CLIENT_METADATA_MAXSIZE", 256))
+
+
+class UserPoolClientMetadata(object):
+    """
+    A cached describe_user_pool_client result.
+
+    Attributes:
+        user_pool_client (dict): The UserPoolClient description, None if not found.
+        callback_urls (frozenset): The client's CallbackURLs.
+        client_secret (str): The client secret, None if the client has none.
+        expires_at (float): The monotonic time the entry expires.
+    """
+
+    __slots__ = ("user_pool_client", "callback_urls", "client_secret", "expires_at")
+
+    def __init__(self, user_pool_client, expires_at):
+        self.user_pool_client = user_pool_client
+        self.expires_at = expires_at
+        if user_pool_client is None:
+            self.callback_urls = frozenset()
+            self.client_secret = None
+        else:
+            self.callback_urls = frozenset(user_pool_client.get("CallbackURLs", ()))
+            self.client_secret = user_pool_client.get("ClientSecret")
+
+
+class UserPoolClientCache(object):
+    """
+    Container-wide cache of user pool client metadata.
+
+    Each client is described once per `ttl` seconds. After that the cached
+    metadata is still served, for at most `max_stale` more seconds, while one
+    background call describes the client again, and concurrent misses on the
+    same client share one call (see cachetools.func.swr_cache). Unknown client
+    IDs are remembered for `negative_ttl` seconds so that bad requests do not
+    spend the DescribeUserPoolClient quota. Other errors are never cached,
+    but after one the client is not described again for a short backoff.
+    """
+
+    def __init__(
+        self,
+        ttl=CLIENT_METADATA_TTL,
+        negative_ttl=CLIENT_METADATA_NEGATIVE_TTL,
+        max_stale=CLIENT_METADATA_MAX_STALE,
+        maxsize=CLIENT_METADATA_MAXSIZE,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._describe = swr_cache(maxsize=maxsize, ttl=ttl, max_stale=max_stale)(
+            self._describe_user_pool_client
+        )
+
+    def _describe_user_pool_client(self, user_pool_id, client_id):
+        # a deleted client is cached as not found, so that a refresh replaces
+        # its stale metadata instead of failing and keeping it
+        cognito_client = get_client("cognito-idp")
+        try:
+            resp = cognito_client.describe_user_pool_client(
+                UserPoolId=user_pool_id, ClientId=client_id
+            )
+        except cognito_client.exceptions.ResourceNotFoundException:
+            return UserPoolClientMetadata(None, time.monotonic() + self.negative_ttl)
+        return UserPoolClientMetadata(
+            resp["UserPoolClient"], time.monotonic() + self.ttl
+        )
+
+    def get(self, user_pool_id, client_id):
+        """
+        Get the metadata of a user pool client.
+
+        Args:
+            user_pool_id (str): The user pool ID.
+            client_id (str): The client ID.
+
+        Returns:
+            UserPoolClientMetadata: The metadata, user_pool_client is None if not found.
+            str: The error message.
+        """
+        try:
+            entry = self._describe(user_pool_id, client_id)
+            if entry.user_pool_client is None and entry.expires_at <= time.monotonic():
+                self._describe.cache_invalidate(user_pool_id, client_id)
+                entry = self._describe(user_pool_id, client_id)
+        except Exception as e:
+            return None, e.__str__()
+        if entry.user_pool_client is None:
+            return entry, "Client not found."
+        return entry, None
+
+    def invalidate(self, user_pool_id=None, client_id=None):
+        """
+        Drop one cached client, or every client if no ID is given.
+        """
+        if client_id is None:
+            self._describe.cache_clear()
+        else:
+            self._describe.cache_invalidate(user_pool_id, client_id)
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: hits, misses, stale hits, background refreshes, failed calls, callers that waited for another caller's call and the number of cached clients.
+        """
+        info = self._describe.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "stale": info.stale,
+            "refreshes": info.refreshes,
+            "failures": info.failures,
+            "coalesced": info.coalesced,
+            "size": info.currsize,
+        }
+
+
+user_pool_client_cache = UserPoolClientCache()
+
+
 def verify_client_id_and_redirect_uri(user_pool_id, client_id, redirect_uri):
     """
     Verify that the client ID and callback URL are valid.
@@ -520,21 +837,18 @@ def verify_client_id_and_redirect_uri(user_pool_id, client_id, redirect_uri):
         redirect_uri (str): The callback URL.
 
     Returns:
-        bool: True if the client ID and callback URL are valid.
+        dict: The user pool client if the client ID and callback URL are valid.
         str: The error message.
     """
-    cognito_client = boto3.client("cognito-idp")
-    try:
-        resp = cognito_client.describe_user_pool_client(
-            UserPoolId=user_pool_id, ClientId=client_id
-        )
-    except cognito_client.exceptions.ResourceNotFoundException:
-        return None, "Client not found."
-    except Exception as e:
-        return None, e.__str__()
-    if redirect_uri not in resp["UserPoolClient"]["CallbackURLs"]:
+    metadata, msg = user_pool_client_cache.get(user_pool_id, client_id)
+    if msg is not None:
+        return None, msg
+    if redirect_uri not in metadata.callback_urls:
         return None, "Callback URL not found."
-    return resp, None
+    return metadata.user_pool_client, None
+
+
+AUTH_CODE_TTL = int(os.environ.get("AUTH_CODE_TTL", 3600))
 
 
 def store_token_to_dynamodb_and_get_auth_code(
@@ -555,72 +869,76 @@ def store_token_to_dynamodb_and_get_auth_code(
         str: The auth code.
         str: The error message.
     """
-    dynamodb_client = boto3.client("dynamodb")
-    auth_code = str(uuid.uuid4())
-    ttl = int(time.time()) + 3600
-    code_record = dict()
-    code_record["client_id"] = client_id
-    code_record["redirect_uri"] = redirect_uri
-    code_record["auth_code"] = auth_code
-    code_record["ttl"] = ttl
-    code_record["token_set"] = json.dumps(token_set)
+    dynamodb_client = get_client("dynamodb")
+    code_record = AuthCodeRecord(
+        auth_code=str(uuid.uuid4()),
+        client_id=client_id,
+        redirect_uri=redirect_uri,
+        ttl=int(time.time()) + AUTH_CODE_TTL,
+        token_set=json.dumps(token_set),
+    )
     while True:
         try:
             dynamodb_client.put_item(
                 TableName=auth_code_table_name,
-                Item=dynamodb_utils.dumps(code_record, as_dict=True),
+                Item=code_record.to_item(),
                 ConditionExpression="attribute_not_exists(auth_code)",
             )
             break
         except dynamodb_client.exceptions.ConditionalCheckFailedException:
-            auth_code = str(uuid.uuid4())
-            code_record["auth_code"] = auth_code
+            code_record.auth_code = str(uuid.uuid4())
         except Exception as e:
             return None, e.__str__()
-    return auth_code, None
+    return code_record.auth_code, None
 
 
-def get_token_from_code(auth_code_table_name, auth_code):
+def get_token_from_code(
+    auth_code_table_name, auth_code, client_id=None, redirect_uri=None
+):
     """
-    Get the token from dynamodb.
+    Redeem the auth code and get the token from dynamodb.
+
+    The code is consumed with a single conditional delete, so an unknown,
+    expired or already used code fails atomically and two concurrent
+    redemptions of the same code can not both succeed. When `client_id` and
+    `redirect_uri` are given, the code must also have been issued to them.
 
     Args:
         auth_code_table_name (str): The auth code table name.
         auth_code (str): The auth code.
+        client_id (str): The client ID redeeming the code.
+        redirect_uri (str): The callback URL of the redemption.
 
     Returns:
         dict: The token set.
         str: The error message.
     """
-    dynamodb_client = boto3.client("dynamodb")
+    condition = "attribute_exists(auth_code) AND #ttl_key >= :now"
+    values = {":now": {"N": str(int(time.time()))}}
+    if client_id is not None:
+        condition += " AND client_id = :client_id"
+        values[":client_id"] = {"S": str(client_id)}
+    if redirect_uri is not None:
+        condition += " AND redirect_uri = :redirect_uri"
+        values[":redirect_uri"] = {"S": str(redirect_uri)}
+
+    dynamodb_client = get_client("dynamodb")
     try:
-        resp = dynamodb_client.get_item(
+        resp = dynamodb_client.delete_item(
             TableName=auth_code_table_name,
-            Key=dynamodb_utils.dumps({"auth_code": auth_code}, as_dict=True),
-        )
-    except Exception as e:
-        return None, e.__str__()
-    if "Item" not in resp:
-        return None, "Auth code not found."
-
-    resp_dict = dynamodb_utils.loads(resp["Item"])
-
-    if resp_dict["ttl"] < int(time.time()):
-        return None, "Auth code expired."
-
-    token_set = json.loads(resp_dict["token_set"])
-    # unvalidate the auth code
-    try:
-        dynamodb_client.update_item(
-            TableName=auth_code_table_name,
-            Key=dynamodb_utils.dumps({"auth_code": auth_code}, as_dict=True),
-            UpdateExpression="set #ttl_key = :ttl",
+            Key={"auth_code": {"S": str(auth_code)}},
+            ConditionExpression=condition,
             ExpressionAttributeNames={"#ttl_key": "ttl"},
-            ExpressionAttributeValues={":ttl": {"N": str(int(time.time()) - 3600)}},
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_OLD",
         )
+    except dynamodb_client.exceptions.ConditionalCheckFailedException:
+        return None, "Invalid auth code."
     except Exception as e:
         return None, e.__str__()
 
+    code_record = AuthCodeRecord.from_item(resp["Attributes"])
+    token_set = json.loads(code_record.token_set)
     return token_set, None
 
 
@@ -637,20 +955,17 @@ def verify_client_secret(user_pool_id, client_id, client_secret=None):
         bool: True if the client secret is valid.
         str: The error message.
     """
-    cognito_client = boto3.client("cognito-idp")
-    try:
-        resp = cognito_client.describe_user_pool_client(
-            UserPoolId=user_pool_id, ClientId=client_id
-        )
-    except cognito_client.exceptions.ResourceNotFoundException:
-        return None, "Client not found."
-    except Exception as e:
-        return None, e.__str__()
+    metadata, msg = user_pool_client_cache.get(user_pool_id, client_id)
+    if msg is not None:
+        return None, msg
 
-    if "ClientSecret" not in resp["UserPoolClient"] and client_secret is None:
+    if metadata.client_secret is None and client_secret is None:
         return True, None
-    elif "ClientSecret" in resp["UserPoolClient"]:
-        if resp["UserPoolClient"]["ClientSecret"] == client_secret:
+    elif metadata.client_secret is not None:
+        if hmac.compare_digest(
+            metadata.client_secret.encode("utf-8"),
+            (client_secret or "").encode("utf-8"),
+        ):
             return True, None
 
     return None, "Client secret is not valid."
@@ -668,18 +983,10 @@ def get_client_secret(user_pool_id, client_id):
         str: The client secret.
         str: The error message.
     """
-    cognito_client = boto3.client("cognito-idp")
-    try:
-        resp = cognito_client.describe_user_pool_client(
-            UserPoolId=user_pool_id, ClientId=client_id
-        )
-    except cognito_client.exceptions.ResourceNotFoundException:
-        return None, "Client not found."
-    except Exception as e:
-        return None, e.__str__()
-    if "ClientSecret" not in resp["UserPoolClient"]:
-        return None, None
-    return resp["UserPoolClient"]["ClientSecret"], None
+    metadata, msg = user_pool_client_cache.get(user_pool_id, client_id)
+    if msg is not None:
+        return None, msg
+    return metadata.client_secret, None
 
 
 def get_client_id_and_secret(authorization):
@@ -0,0 +1,63 @@
+"""
+JSON facade for the layer.
+
+The fastest available backend is picked once at import time:
+
+1. "simplejson" - simplejson with its C speedups. The vendored simplejson only
+   ships a darwin build of the speedups, so this needs a Linux build in the layer.
+2. "json" - the standard library json with its C scanner and encoder.
+3. "json-python" - the pure Python standard library json.
+
+The pure Python simplejson is never picked: it is slower than the standard library.
+Use `loads(s, use_decimal=True)` where DynamoDB needs exact numbers; Decimal
+values are always accepted by `dumps`.
+"""
+
+from decimal import Decimal
+
+try:
+    import simplejson as _json
+    from simplejson import _speedups  # noqa: F401
+
+    BACKEND = "simplejson"
+except ImportError:
+    import json as _json
+    from json import scanner as _scanner
+
+    BACKEND = "json" if _scanner.c_make_scanner is not None else "json-python"
+
+JSONDecodeError = _json.JSONDecodeError
+
+
+def _default(o):
+    if isinstance(o, Decimal):
+        if o % 1 == 0:
+            return int(o)
+        return float(o)
+    raise TypeError("Object of type %s is not JSON serializable" % type(o).__name__)
+
+
+def loads(s, use_decimal=False, **kwargs):
+    """Parse a JSON document.
+    :param s - str or bytes
+    :param use_decimal - parse floats as Decimal
+    :returns the python value
+    """
+    if use_decimal:
+        kwargs["parse_float"] = Decimal
+    return _json.loads(s, **kwargs)
+
+
+def dumps(obj, **kwargs):
+    """Serialize to a JSON string. Any json/simplejson keyword is accepted.
+    :param obj - the python value, Decimal included
+    :returns the JSON string
+    """
+    if BACKEND != "simplejson":
+        kwargs.setdefault("default", _default)
+    return _json.dumps(obj, **kwargs)
+
+
+def backend():
+    """The name of the active backend: "simplejson", "json" or "json-python"."""
+    return BACKEND
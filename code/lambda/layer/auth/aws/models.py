@@ -0,0 +1,141 @@
+# shared empty AttributeValue for attributes missing from an item
+_NULL = dict()
+
+
+class FederatedUserRecord(object):
+    """
+    A federated identity linked to a Cognito user, as stored in the user table.
+
+    Attributes:
+        cognito_id (str): The Cognito username.
+        cognito_email (str): The Cognito e-mail.
+        federated_id (str): "<platform>_<platform user id>", the GSI key.
+        first_name (str): The first name from the platform.
+        last_name (str): The last name from the platform.
+        email (str): The e-mail from the platform, None if not shared.
+        picture (str): The picture URL from the platform.
+    """
+
+    __slots__ = (
+        "cognito_id",
+        "cognito_email",
+        "federated_id",
+        "first_name",
+        "last_name",
+        "email",
+        "picture",
+    )
+
+    def __init__(
+        self,
+        cognito_id=None,
+        cognito_email=None,
+        federated_id=None,
+        first_name=None,
+        last_name=None,
+        email=None,
+        picture=None,
+    ):
+        self.cognito_id = cognito_id
+        self.cognito_email = cognito_email
+        self.federated_id = federated_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.picture = picture
+
+    def to_item(self):
+        """
+        Encode the record to a DynamoDB item. None attributes are omitted.
+        """
+        item = {"federated_id": {"S": self.federated_id}}
+        if self.cognito_id is not None:
+            item["cognito_id"] = {"S": self.cognito_id}
+        if self.cognito_email is not None:
+            item["cognito_email"] = {"S": self.cognito_email}
+        if self.first_name is not None:
+            item["first_name"] = {"S": self.first_name}
+        if self.last_name is not None:
+            item["last_name"] = {"S": self.last_name}
+        if self.email is not None:
+            item["email"] = {"S": self.email}
+        if self.picture is not None:
+            item["picture"] = {"S": self.picture}
+        return item
+
+    @classmethod
+    def from_item(cls, item):
+        """
+        Decode a DynamoDB item to a record.
+        """
+        record = cls.__new__(cls)
+        get = item.get
+        record.federated_id = item["federated_id"]["S"]
+        record.cognito_id = get("cognito_id", _NULL).get("S")
+        record.cognito_email = get("cognito_email", _NULL).get("S")
+        record.first_name = get("first_name", _NULL).get("S")
+        record.last_name = get("last_name", _NULL).get("S")
+        record.email = get("email", _NULL).get("S")
+        record.picture = get("picture", _NULL).get("S")
+        return record
+
+    def to_dict(self):
+        return dict(
+            (name, getattr(self, name))
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        )
+
+
+class AuthCodeRecord(object):
+    """
+    An authorization code and the token set it was issued for.
+
+    Attributes:
+        auth_code (str): The code, the table key.
+        client_id (str): The client ID.
+        redirect_uri (str): The callback URL.
+        ttl (int): The expiry, in epoch seconds.
+        token_set (str): The JSON encoded token set.
+    """
+
+    __slots__ = ("auth_code", "client_id", "redirect_uri", "ttl", "token_set")
+
+    def __init__(
+        self,
+        auth_code=None,
+        client_id=None,
+        redirect_uri=None,
+        ttl=None,
+        token_set=None,
+    ):
+        self.auth_code = auth_code
+        self.client_id = client_id
+        self.redirect_uri = redirect_uri
+        self.ttl = ttl
+        self.token_set = token_set
+
+    def to_item(self):
+        """
+        Encode the record to a DynamoDB item.
+        """
+        return {
+            "auth_code": {"S": self.auth_code},
+            "client_id": {"S": self.client_id},
+            "redirect_uri": {"S": self.redirect_uri},
+            "ttl": {"N": str(self.ttl)},
+            "token_set": {"S": self.token_set},
+        }
+
+    @classmethod
+    def from_item(cls, item):
+        """
+        Decode a DynamoDB item to a record.
+        """
+        record = cls.__new__(cls)
+        record.auth_code = item["auth_code"]["S"]
+        record.client_id = item["client_id"]["S"]
+        record.redirect_uri = item["redirect_uri"]["S"]
+        record.ttl = int(item["ttl"]["N"])
+        record.token_set = item["token_set"]["S"]
+        return record
@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import hmac
+import os
+import struct
+
+# The layer has no `cryptography`, so the AEAD is built from stdlib primitives:
+# HMAC-SHA256 in counter mode as the stream cipher, then HMAC-SHA256 over the
+# header and ciphertext as the tag (encrypt-then-MAC). Both keys are derived
+# from one master key, so a key ID maps to a single secret.
+
+VERSION = 1
+NONCE_SIZE = 16
+TAG_SIZE = 32
+
+
+class SealError(Exception):
+    pass
+
+
+def _derive_keys(master_key):
+    enc_key = hmac.new(master_key, b"sealing-enc", hashlib.sha256).digest()
+    mac_key = hmac.new(master_key, b"sealing-mac", hashlib.sha256).digest()
+    return enc_key, mac_key
+
+
+def _xor_keystream(enc_key, nonce, data):
+    blocks = []
+    for counter in range((len(data) + 31) // 32):
+        blocks.append(
+            hmac.new(
+                enc_key, nonce + struct.pack(">I", counter), hashlib.sha256
+            ).digest()
+        )
+    keystream = b"".join(blocks)[: len(data)]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(keystream, "big")).to_bytes(
+        len(data), "big"
+    )
+
+
+def seal(key_id, master_key, plaintext):
+    """
+    Encrypt and authenticate a payload.
+
+    Args:
+        key_id (str): The ID of the key, stored in clear in the envelope.
+        master_key (bytes): The key.
+        plaintext (bytes): The payload.
+
+    Returns:
+        str: The URL-safe sealed envelope.
+    """
+    enc_key, mac_key = _derive_keys(master_key)
+    kid = key_id.encode("utf-8")
+    header = struct.pack(">BB", VERSION, len(kid)) + kid + os.urandom(NONCE_SIZE)
+    ciphertext = _xor_keystream(enc_key, header[-NONCE_SIZE:], plaintext)
+    tag = hmac.new(mac_key, header + ciphertext, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(header + ciphertext + tag).rstrip(b"=").decode()
+
+
+def unseal(keys, sealed):
+    """
+    Authenticate and decrypt an envelope.
+
+    Args:
+        keys (dict): The master keys by key ID.
+        sealed (str): The envelope from seal().
+
+    Returns:
+        bytes: The payload.
+
+    Raises:
+        SealError: If the envelope is malformed, tampered or its key is unknown.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(sealed + "=" * (-len(sealed) % 4))
+        version, kid_length = struct.unpack(">BB", raw[:2])
+        kid = raw[2 : 2 + kid_length].decode("utf-8")
+    except Exception:
+        raise SealError("Malformed envelope.")
+    header_length = 2 + kid_length + NONCE_SIZE
+    if version != VERSION or len(raw) < header_length + TAG_SIZE:
+        raise SealError("Malformed envelope.")
+    if kid not in keys:
+        raise SealError("Unknown key.")
+
+    enc_key, mac_key = _derive_keys(keys[kid])
+    header = raw[:header_length]
+    ciphertext = raw[header_length:-TAG_SIZE]
+    tag = hmac.new(mac_key, header + ciphertext, hashlib.sha256).digest()
+    if not hmac.compare_digest(tag, raw[-TAG_SIZE:]):
+        raise SealError("Invalid tag.")
+    return _xor_keystream(enc_key, header[-NONCE_SIZE:], ciphertext)
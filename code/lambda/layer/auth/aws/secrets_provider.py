@@ -0,0 +1,141 @@
+import os
+import threading
+
+from cachetools.func import swr_cache
+
+from aws import json_backend as json
+from aws import helper
+
+SECRET_TTL = int(os.environ.get("SECRET_TTL", 300))
+SECRET_MAX_STALE = int(os.environ.get("SECRET_MAX_STALE", 3600))
+SECRET_BACKOFF = int(os.environ.get("SECRET_BACKOFF", 1))
+SECRET_MAX_BACKOFF = int(os.environ.get("SECRET_MAX_BACKOFF", 60))
+SECRET_REGION = os.environ.get("SECRET_REGION", "ap-southeast-1")
+
+
+class SecretsProvider(object):
+    """
+    Cached Secrets Manager reader.
+
+    Secrets are parsed once and served from memory for `ttl` seconds. After
+    that the cached value is still served while a single background refresh
+    reads the current version, so a rotation is picked up on the next refresh.
+    A value older than `max_stale` seconds is refetched synchronously.
+    Concurrent misses on the same secret share one GetSecretValue call. After
+    a failed read the secret is not read again for `backoff` seconds, doubled
+    on every further failure up to `max_backoff` (see cachetools.func.swr_cache).
+
+    Note that Lambda freezes background threads between invocations, so a
+    refresh started at the end of an invocation completes in the next one.
+    """
+
+    def __init__(
+        self,
+        region_name=SECRET_REGION,
+        ttl=SECRET_TTL,
+        max_stale=SECRET_MAX_STALE,
+        backoff=SECRET_BACKOFF,
+        max_backoff=SECRET_MAX_BACKOFF,
+    ):
+        self.region_name = region_name
+        self.ttl = ttl
+        self.max_stale = max_stale
+        # swr_cache serves a stale value for max_stale seconds after the ttl
+        self._load_cached = swr_cache(
+            maxsize=None,
+            ttl=ttl,
+            max_stale=max(max_stale - ttl, 0),
+            backoff=backoff,
+            max_backoff=max_backoff,
+        )(self._load)
+
+    def get(self, secret_id):
+        """
+        Get a secret.
+
+        Args:
+            secret_id (str): The secret name or ARN.
+
+        Returns:
+            dict|str|bytes: The parsed JSON secret, or the raw string or binary.
+
+        Raises:
+            botocore.exceptions.ClientError: If the secret cannot be read and
+                no usable cached value exists.
+        """
+        return self._load_cached(secret_id)
+
+    def invalidate(self, secret_id=None):
+        """
+        Drop one cached secret, or every secret if no ID is given.
+        """
+        if secret_id is None:
+            self._load_cached.cache_clear()
+        else:
+            self._load_cached.cache_invalidate(secret_id)
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: hits, misses, stale hits, background refreshes, failed
+                reads, callers that waited for another caller's read and
+                cached secrets.
+        """
+        info = self._load_cached.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "stale": info.stale,
+            "refreshes": info.refreshes,
+            "failures": info.failures,
+            "coalesced": info.coalesced,
+            "size": info.currsize,
+        }
+
+    def _load(self, secret_id):
+        client = helper.get_client("secretsmanager", region_name=self.region_name)
+        resp = client.get_secret_value(SecretId=secret_id)
+
+        if "SecretString" in resp:
+            value = resp["SecretString"]
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        else:
+            value = resp["SecretBinary"]
+        return value
+
+
+_providers = dict()
+_providers_lock = threading.Lock()
+
+
+def get_provider(region_name=SECRET_REGION):
+    """
+    Get the container-wide secrets provider for a region.
+    """
+    provider = _providers.get(region_name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(region_name)
+            if provider is None:
+                provider = SecretsProvider(region_name=region_name)
+                _providers[region_name] = provider
+    return provider
+
+
+def get_secret(secret_id, region_name=SECRET_REGION):
+    """
+    Get a secret through the container-wide provider.
+
+    Args:
+        secret_id (str): The secret name or ARN.
+        region_name (str): The region of the secret.
+
+    Returns:
+        dict|str|bytes: The parsed JSON secret, or the raw string or binary.
+    """
+    return get_provider(region_name).get(secret_id)
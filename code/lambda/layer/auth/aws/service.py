@@ -1,7 +1,8 @@
-import json
-import boto3
 from botocore.exceptions import ClientError
-import base64
+
+from aws import json_backend as json
+from aws import helper
+from aws import secrets_provider
 
 
 def sendSQSMessage(sqsQueueURL, body):
@@ -14,7 +15,7 @@ def sendSQSMessage(sqsQueueURL, body):
     """
 
     # Send the SQS message
-    sqs_client = boto3.client("sqs")
+    sqs_client = helper.get_client("sqs")
     try:
         msg = sqs_client.send_message(QueueUrl=sqsQueueURL, MessageBody=body)
     except ClientError as e:
@@ -24,53 +25,15 @@ def sendSQSMessage(sqsQueueURL, body):
 
 
 def getSecret(secretName, regionName="ap-southeast-1"):
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(service_name="secretsmanager", region_name=regionName)
-
-    # In this sample we only handle the specific exceptions for the 'GetSecretValue' API.
-    # See https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-    # We rethrow the exception by default.
+    """
 
-    try:
-        get_secret_value_response = client.get_secret_value(SecretId=secretName)
-        print(get_secret_value_response)
-    except ClientError as e:
-        if e.response["Error"]["Code"] == "DecryptionFailureException":
-            # Secrets Manager can't decrypt the protected secret text using the provided KMS key.
-            # Deal with the exception here, and/or rethrow at your discretion.
-            raise e
-        elif e.response["Error"]["Code"] == "InternalServiceErrorException":
-            # An error occurred on the server side.
-            # Deal with the exception here, and/or rethrow at your discretion.
-            raise e
-        elif e.response["Error"]["Code"] == "InvalidParameterException":
-            # You provided an invalid value for a parameter.
-            # Deal with the exception here, and/or rethrow at your discretion.
-            raise e
-        elif e.response["Error"]["Code"] == "InvalidRequestException":
-            # You provided a parameter value that is not valid for the current state of the resource.
-            # Deal with the exception here, and/or rethrow at your discretion.
-            raise e
-        elif e.response["Error"]["Code"] == "ResourceNotFoundException":
-            # We can't find the resource that you asked for.
-            # Deal with the exception here, and/or rethrow at your discretion.
-            raise e
-    else:
-        # Decrypts secret using the associated KMS CMK.
-        # Depending on whether the secret is a string or binary, one of these fields will be populated.
-        if "SecretString" in get_secret_value_response:
-            secret = get_secret_value_response["SecretString"]
-        else:
-            decoded_binary_secret = base64.b64decode(
-                get_secret_value_response["SecretBinary"]
-            )
-    try:
-        json_secret = json.loads(secret)
-        secret = json_secret
-    except Exception as e:
-        pass
-    return secret
+    :param secretName: String name or ARN of the secret
+    :param regionName: String region of the secret
+    :return: The parsed JSON secret, or the raw string or binary. Served from
+        the container-wide secrets cache, see aws.secrets_provider.
+    """
+    # ClientError (DecryptionFailure, ResourceNotFound, ...) is rethrown by the provider
+    return secrets_provider.get_secret(secretName, region_name=regionName)
 
 
 def sendEmail(
@@ -85,8 +48,8 @@ def sendEmail(
     BODY_TEXT = body
     BODY_HTML = bodyHtml  # The HTML body of the email.
 
-    # Create a new SES resource and specify a region.
-    client = boto3.client("ses", region_name=AWS_REGION)
+    # Get the shared SES client for the region.
+    client = helper.get_client("ses", region_name=AWS_REGION)
     # Try to send the email.
     try:
         # Provide the contents of the email.
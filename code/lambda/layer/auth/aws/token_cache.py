@@ -0,0 +1,92 @@
+import hashlib
+import threading
+import time
+
+from cachetools import LRUCache
+
+from aws import tracing
+
+
+class TokenCache(object):
+    """
+    LRU cache of results derived from bearer tokens.
+
+    Entries are keyed by the SHA-256 of the token, so the cache never holds
+    a usable token, and each entry expires at its own time (e.g. the token's
+    `exp`), capped by `max_ttl` seconds if given. Hits and misses are counted
+    into the invocation's tracing metrics as <name>CacheHits/<name>CacheMisses.
+    """
+
+    def __init__(self, name, maxsize, max_ttl=None):
+        self.name = name
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token, scope):
+        return (scope, hashlib.sha256(token.encode("utf-8")).digest())
+
+    def get(self, token, scope=None):
+        """
+        Get the cached result of a token.
+
+        Args:
+            token (str): The token.
+            scope (str): What else the result depends on, e.g. the audience.
+
+        Returns:
+            object: The result, None if not cached or expired.
+        """
+        key = self._key(token, scope)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._cache[key]
+                entry = None
+        if entry is None:
+            self.misses += 1
+            tracing.count(self.name + "CacheMisses")
+            return None
+        self.hits += 1
+        tracing.count(self.name + "CacheHits")
+        return entry[1]
+
+    def put(self, token, value, expires_at, scope=None):
+        """
+        Cache the result of a token.
+
+        Args:
+            token (str): The token.
+            value (object): The result, shared with later callers.
+            expires_at (float): The epoch time the entry expires.
+            scope (str): What else the result depends on, e.g. the audience.
+        """
+        now = time.time()
+        if self.max_ttl is not None:
+            expires_at = min(expires_at, now + self.max_ttl)
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._cache[self._key(token, scope)] = (expires_at, value)
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate and the number of entries.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "size": len(self._cache),
+        }
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+
+from aws import json_backend as json
+
+# Spans are buffered in memory and written at handler exit as one CloudWatch
+# Embedded Metric Format (EMF) line on stdout, so tracing adds no network call.
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "true").lower() == "true"
+TRACING_NAMESPACE = os.environ.get("TRACING_NAMESPACE", "AuthLayer")
+
+
+class Span(object):
+    """
+    The timing of one downstream call.
+
+    Attributes:
+        service (str): The downstream service, e.g. "cognito-idp" or "http".
+        operation (str): The operation, e.g. "InitiateAuth" or "POST graph.facebook.com".
+        duration_ms (float): The wall time of the call, retries included.
+        status (str): "ok", the AWS error code, the HTTP status or the exception name.
+        retries (int): The retry attempts reported by botocore.
+    """
+
+    __slots__ = ("service", "operation", "start", "duration_ms", "status", "retries")
+
+    def __init__(self, service, operation):
+        self.service = service
+        self.operation = operation
+        self.start = None
+        self.duration_ms = None
+        self.status = "ok"
+        self.retries = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+        if exc_type is not None:
+            self.status = exc_type.__name__
+        recorder.record(self)
+        return False
+
+    def to_dict(self):
+        return {
+            "service": self.service,
+            "operation": self.operation,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "retries": self.retries,
+        }
+
+
+class SpanRecorder(object):
+    """
+    Per-invocation buffer of spans.
+
+    A Lambda container serves one invocation at a time, so the buffer is
+    container-wide and emptied by flush() at handler exit. Spans of background
+    threads that outlive an invocation are reported with the next one.
+    """
+
+    def __init__(self, namespace=TRACING_NAMESPACE, enabled=TRACING_ENABLED):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._spans = []
+        self._counters = dict()
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        if self.enabled:
+            with self._lock:
+                self._spans.append(span)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def build_document(self, spans, counters=None):
+        """
+        Build the EMF document of the spans.
+
+        Each "<service>.<operation>" becomes a latency metric (a list of values
+        if the operation was called more than once) under the FunctionName
+        dimension, and each counter a Count metric. Every span is also kept in
+        the "spans" property for Logs Insights queries.
+
+        Args:
+            spans (list): The spans.
+            counters (dict): The counters, by metric name.
+
+        Returns:
+            dict: The EMF document.
+        """
+        doc = dict()
+        metrics = []
+        retries = 0
+        errors = 0
+        for span in spans:
+            name = span.service + "." + span.operation
+            if name in doc:
+                if not isinstance(doc[name], list):
+                    doc[name] = [doc[name]]
+                doc[name].append(round(span.duration_ms, 3))
+            else:
+                doc[name] = round(span.duration_ms, 3)
+                metrics.append({"Name": name, "Unit": "Milliseconds"})
+            retries += span.retries
+            if span.status != "ok":
+                errors += 1
+        doc["DownstreamRetries"] = retries
+        doc["DownstreamErrors"] = errors
+        metrics.append({"Name": "DownstreamRetries", "Unit": "Count"})
+        metrics.append({"Name": "DownstreamErrors", "Unit": "Count"})
+        for name, value in (counters or {}).items():
+            doc[name] = value
+            metrics.append({"Name": name, "Unit": "Count"})
+
+        doc["_aws"] = {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": self.namespace,
+                    "Dimensions": [["FunctionName"]],
+                    "Metrics": metrics,
+                }
+            ],
+        }
+        doc["FunctionName"] = os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+        doc["spans"] = [span.to_dict() for span in spans]
+        return doc
+
+    def flush(self):
+        """
+        Write the buffered spans and counters as one EMF line and empty the buffer.
+
+        Returns:
+            dict: The EMF document, None if there was nothing to write.
+        """
+        with self._lock:
+            spans = self._spans
+            counters = self._counters
+            self._spans = []
+            self._counters = dict()
+        if not spans and not counters:
+            return None
+        doc = self.build_document(spans, counters)
+        print(json.dumps(doc, separators=(",", ":")))
+        return doc
+
+
+recorder = SpanRecorder()
+
+
+def span(service, operation):
+    """
+    Time a downstream call.
+
+    Usage:
+        with tracing.span("http", "GET graph.facebook.com") as s:
+            resp = requests.get(...)
+            s.status = str(resp.status_code)
+
+    Args:
+        service (str): The downstream service.
+        operation (str): The operation.
+
+    Returns:
+        Span: The span, recorded when the block exits.
+    """
+    return Span(service, operation)
+
+
+def count(name, value=1):
+    """
+    Add to a counter of the invocation, written as a Count metric.
+
+    Args:
+        name (str): The metric name.
+        value (int): The increment.
+    """
+    recorder.count(name, value)
+
+
+def _before_call(model, context, **kwargs):
+    context["tracing_span"] = Span(
+        model.service_model.endpoint_prefix, model.name
+    ).__enter__()
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    span = context.pop("tracing_span", None)
+    if span is None:
+        return
+    metadata = parsed.get("ResponseMetadata", {})
+    span.retries = metadata.get("RetryAttempts", 0)
+    if http_response.status_code >= 300:
+        span.status = parsed.get("Error", {}).get(
+            "Code", str(http_response.status_code)
+        )
+    span.__exit__(None, None, None)
+
+
+def _after_call_error(exception, context, **kwargs):
+    span = context.pop("tracing_span", None)
+    if span is None:
+        return
+    span.__exit__(type(exception), exception, None)
+
+
+def instrument_client(client):
+    """
+    Record a span for every API call of a boto3 client.
+
+    Args:
+        client (botocore.client.BaseClient): The client.
+
+    Returns:
+        botocore.client.BaseClient: The same client.
+    """
+    if TRACING_ENABLED:
+        events = client.meta.events
+        events.register("before-call", _before_call)
+        events.register("after-call", _after_call)
+        events.register("after-call-error", _after_call_error)
+    return client
+
+
+def flush():
+    """
+    Write the spans of the invocation, see SpanRecorder.flush.
+    """
+    return recorder.flush()
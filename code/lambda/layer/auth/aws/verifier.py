@@ -0,0 +1,208 @@
+import base64
+import os
+import threading
+import time
+import urllib.request
+
+import rsa
+
+from aws import json_backend as json
+from aws import helper
+from aws import tracing
+
+COGNITO_JWKS_TTL = int(os.environ.get("COGNITO_JWKS_TTL", 3600))
+COGNITO_JWKS_MIN_REFETCH_INTERVAL = int(
+    os.environ.get("COGNITO_JWKS_MIN_REFETCH_INTERVAL", 60)
+)
+COGNITO_JWKS_TIMEOUT = float(os.environ.get("COGNITO_JWKS_TIMEOUT", 2))
+COGNITO_TOKEN_LEEWAY = int(os.environ.get("COGNITO_TOKEN_LEEWAY", 5))
+
+
+def base64url_decode(value):
+    if isinstance(value, str):
+        value = value.encode("ascii")
+    return base64.urlsafe_b64decode(value + b"=" * (-len(value) % 4))
+
+
+class CognitoJWKS(object):
+    """
+    The signing keys of a Cognito user pool.
+
+    Keys are fetched once per `ttl` seconds. An unknown `kid` triggers one
+    refetch, at most once per `min_refetch_interval` seconds, so that tokens
+    with forged key IDs cannot be used to hammer the JWKS endpoint.
+    """
+
+    def __init__(
+        self,
+        jwks_url,
+        ttl=COGNITO_JWKS_TTL,
+        min_refetch_interval=COGNITO_JWKS_MIN_REFETCH_INTERVAL,
+        timeout=COGNITO_JWKS_TIMEOUT,
+    ):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._keys = dict()
+        self._fetched_at = None
+        self._attempted_at = None
+        self._lock = threading.Lock()
+
+    def get_key(self, kid):
+        """
+        Get the public key for a key ID.
+
+        Args:
+            kid (str): The key ID from the token header.
+
+        Returns:
+            rsa.PublicKey: The key, None if the pool has no such key.
+        """
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now - self._fetched_at < self.ttl:
+            return key
+        with self._lock:
+            # every fetch, including a failed one, is rate limited
+            if (
+                self._attempted_at is None
+                or now - self._attempted_at >= self.min_refetch_interval
+            ):
+                self._refresh()
+            return self._keys.get(kid)
+
+    def prefetch(self):
+        """
+        Fetch the keys now if they were never fetched, e.g. on a warm-up event.
+        """
+        with self._lock:
+            if self._fetched_at is None:
+                self._refresh()
+
+    def _refresh(self):
+        self._attempted_at = time.monotonic()
+        try:
+            with tracing.span("http", "GET cognito-idp jwks"):
+                with urllib.request.urlopen(
+                    self.jwks_url, timeout=self.timeout
+                ) as resp:
+                    jwks = json.loads(resp.read().decode("utf-8"))
+        except Exception as e:
+            # keep the previous keys, a rotation keeps old keys published
+            print("JWKS fetch failed: " + e.__str__())
+            return
+        keys = dict()
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kty") != "RSA":
+                continue
+            keys[jwk["kid"]] = rsa.PublicKey(
+                int.from_bytes(base64url_decode(jwk["n"]), "big"),
+                int.from_bytes(base64url_decode(jwk["e"]), "big"),
+            )
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+
+class CognitoTokenVerifier(object):
+    """
+    Verify Cognito access and ID tokens without calling Cognito.
+
+    Checks the RS256 signature against the user pool JWKS, the expiry, the
+    issuer, the token use and that the token was issued to a client of the
+    user pool (via the shared user pool client cache).
+
+    Note that a signature can not show that a token was revoked, e.g. by a
+    global sign-out, so a valid token may still need Cognito's word.
+    """
+
+    def __init__(self, user_pool_id, region_name=None, leeway=COGNITO_TOKEN_LEEWAY):
+        if region_name is None:
+            region_name = user_pool_id.split("_", 1)[0]
+        self.user_pool_id = user_pool_id
+        self.issuer = "https://cognito-idp.%s.amazonaws.com/%s" % (
+            region_name,
+            user_pool_id,
+        )
+        self.leeway = leeway
+        self.jwks = CognitoJWKS(self.issuer + "/.well-known/jwks.json")
+
+    def verify(self, token, token_use="access", client_id=None):
+        """
+        Verify a token.
+
+        Args:
+            token (str): The JWT.
+            token_use (str): "access" or "id".
+            client_id (str): The expected client ID, any client of the pool if None.
+
+        Returns:
+            dict: The token claims.
+            str: The error message.
+        """
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(base64url_decode(header_segment))
+            claims = json.loads(base64url_decode(payload_segment))
+            signature = base64url_decode(signature_segment)
+        except Exception:
+            return None, "Invalid token."
+
+        if header.get("alg") != "RS256":
+            return None, "Invalid token."
+
+        key = self.jwks.get_key(header.get("kid"))
+        if key is None:
+            return None, "Invalid token."
+        signing_input = (header_segment + "." + payload_segment).encode("ascii")
+        try:
+            hash_method = rsa.verify(signing_input, signature, key)
+        except rsa.VerificationError:
+            return None, "Invalid token."
+        if hash_method != "SHA-256":
+            return None, "Invalid token."
+
+        exp = claims.get("exp")
+        if not isinstance(exp, int) or exp + self.leeway < int(time.time()):
+            return None, "Token expired."
+        if claims.get("iss") != self.issuer:
+            return None, "Invalid token issuer."
+        if claims.get("token_use") != token_use:
+            return None, "Invalid token use."
+
+        token_client_id = claims.get("client_id" if token_use == "access" else "aud")
+        if client_id is not None:
+            if token_client_id != client_id:
+                return None, "Invalid token client."
+        else:
+            _, msg = helper.user_pool_client_cache.get(
+                self.user_pool_id, token_client_id
+            )
+            if msg is not None:
+                return None, "Invalid token client."
+
+        return claims, None
+
+
+_verifiers = dict()
+
+
+def get_verifier(user_pool_id):
+    """
+    Get the container-wide token verifier for a user pool.
+    """
+    verifier = _verifiers.get(user_pool_id)
+    if verifier is None:
+        verifier = CognitoTokenVerifier(user_pool_id)
+        _verifiers[user_pool_id] = verifier
+    return verifier
+
+
+@helper.register_warmer
+def warm_jwks():
+    """
+    Prefetch the signing keys of the function's user pool.
+    """
+    user_pool_id = os.environ.get("USER_POOL_ID")
+    if user_pool_id is not None:
+        get_verifier(user_pool_id).jwks.prefetch()
@@ -1,6 +1,14 @@
 """`functools.lru_cache` compatible memoizing function decorators."""
 
-__all__ = ("fifo_cache", "lfu_cache", "lru_cache", "mru_cache", "rr_cache", "ttl_cache")
+__all__ = (
+    "fifo_cache",
+    "lfu_cache",
+    "lru_cache",
+    "mru_cache",
+    "rr_cache",
+    "swr_cache",
+    "ttl_cache",
+)
 
 import collections
 import functools
@@ -9,9 +17,9 @@ import random
 import time
 
 try:
-    from threading import RLock
+    from threading import Event, RLock, Thread
 except ImportError:  # pragma: no cover
-    from dummy_threading import RLock
+    from dummy_threading import Event, RLock, Thread
 
 from . import FIFOCache, LFUCache, LRUCache, MRUCache, RRCache, TTLCache
 from . import keys
@@ -22,6 +30,21 @@ _CacheInfo = collections.namedtuple(
 )
 
 
+_SWRCacheInfo = collections.namedtuple(
+    "SWRCacheInfo",
+    [
+        "hits",
+        "misses",
+        "maxsize",
+        "currsize",
+        "stale",
+        "refreshes",
+        "failures",
+        "coalesced",
+    ],
+)
+
+
 class _UnboundCache(dict):
     @property
     def maxsize(self):
@@ -169,3 +192,176 @@ def ttl_cache(maxsize=128, ttl=600, timer=time.monotonic, typed=False):
         return _cache(TTLCache(128, ttl, timer), typed)(maxsize)
     else:
         return _cache(TTLCache(maxsize, ttl, timer), typed)
+
+
+class _Flight:
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = Event()
+        self.value = None
+        self.error = None
+
+
+def _swr_cache(cache, ttl, max_stale, backoff, max_backoff, timer, typed):
+    maxsize = cache.maxsize
+
+    def decorator(func):
+        key = keys.typedkey if typed else keys.hashkey
+        lock = RLock()
+        # hits, misses, stale hits, background refreshes, failed calls,
+        # callers that waited for another caller's call
+        stats = [0, 0, 0, 0, 0, 0]
+        # key -> computation in progress, shared by every caller of the key
+        flights = {}
+        # key -> (consecutive failures, time of the next call, last error)
+        retries = {}
+
+        def compute(k, flight, args, kwargs):
+            try:
+                v = func(*args, **kwargs)
+            except BaseException as e:
+                with lock:
+                    del flights[k]
+                    if isinstance(e, Exception):
+                        stats[4] += 1
+                        failures = retries.get(k, (0,))[0] + 1
+                        delay = min(backoff * 2 ** (failures - 1), max_backoff)
+                        retries[k] = (failures, timer() + delay, e)
+                flight.error = e
+                flight.event.set()
+                raise
+            now = timer()
+            with lock:
+                del flights[k]
+                retries.pop(k, None)
+                try:
+                    cache[k] = (v, now + ttl, now + ttl + max_stale)
+                except ValueError:
+                    pass  # value too large
+            flight.value = v
+            flight.event.set()
+            return v
+
+        def refresh(k, flight, args, kwargs):
+            try:
+                compute(k, flight, args, kwargs)
+            except Exception:
+                pass  # the stale result is kept, compute() set the backoff
+
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs)
+            with lock:
+                now = timer()
+                entry = cache.get(k)
+                if entry is not None:
+                    v, fresh_until, stale_until = entry
+                    if now < fresh_until:
+                        stats[0] += 1
+                        return v
+                    if now < stale_until:
+                        stats[2] += 1
+                        if k not in flights and now >= retries.get(k, (0, now))[1]:
+                            stats[3] += 1
+                            flight = flights[k] = _Flight()
+                            thread = Thread(
+                                target=refresh, args=(k, flight, args, kwargs)
+                            )
+                            thread.daemon = True
+                            thread.start()
+                        return v
+                flight = flights.get(k)
+                leader = flight is None
+                if leader:
+                    stats[1] += 1
+                    retry = retries.get(k)
+                    if retry is not None and now < retry[1]:
+                        # failed recently, fail again without calling
+                        raise retry[2]
+                    flight = flights[k] = _Flight()
+                else:
+                    stats[5] += 1
+            if leader:
+                return compute(k, flight, args, kwargs)
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        def cache_info():
+            with lock:
+                hits, misses, stale, refreshes, failures, coalesced = stats
+                maxsize = cache.maxsize
+                currsize = cache.currsize
+            return _SWRCacheInfo(
+                hits, misses, maxsize, currsize, stale, refreshes, failures, coalesced
+            )
+
+        def cache_clear():
+            with lock:
+                try:
+                    cache.clear()
+                    retries.clear()
+                finally:
+                    stats[:] = [0, 0, 0, 0, 0, 0]
+
+        def cache_invalidate(*args, **kwargs):
+            k = key(*args, **kwargs)
+            with lock:
+                cache.pop(k, None)
+                retries.pop(k, None)
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_invalidate = cache_invalidate
+        wrapper.cache_parameters = lambda: {
+            "maxsize": maxsize,
+            "typed": typed,
+            "ttl": ttl,
+            "max_stale": max_stale,
+            "backoff": backoff,
+            "max_backoff": max_backoff,
+        }
+        functools.update_wrapper(wrapper, func)
+        return wrapper
+
+    return decorator
+
+
+def swr_cache(
+    maxsize=128,
+    ttl=600,
+    max_stale=None,
+    backoff=1,
+    max_backoff=60,
+    timer=time.monotonic,
+    typed=False,
+):
+    """Decorator to wrap a function with a thread-safe memoizing callable
+    that saves up to `maxsize` results based on a Least Recently Used
+    (LRU) algorithm, with single-flight misses and stale-while-revalidate
+    refreshes.
+
+    Concurrent misses on the same key wait for one call of the function,
+    and get its result or exception; cache_info() counts the waiting
+    callers as `coalesced`. A result older than `ttl` seconds is still
+    returned for `max_stale` more seconds (default: `ttl`) while one
+    background thread calls the function again. After a failed call the
+    key is not called again for `backoff` seconds, doubled on every
+    further failure up to `max_backoff`: a refresh keeps the stale
+    result, a miss raises the last exception. Results of failed calls
+    are never cached.
+
+    """
+    if max_stale is None:
+        max_stale = ttl
+    if maxsize is None:
+        cache = _UnboundCache()
+    elif callable(maxsize):
+        return _swr_cache(
+            LRUCache(128), ttl, max_stale, backoff, max_backoff, timer, typed
+        )(maxsize)
+    else:
+        cache = LRUCache(maxsize)
+    return _swr_cache(cache, ttl, max_stale, backoff, max_backoff, timer, typed)
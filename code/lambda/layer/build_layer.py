@@ -0,0 +1,125 @@
+"""
+Build the runtime-only artifact of a Lambda layer.
+
+Usage:
+    python build_layer.py <source dir> <output dir>
+
+The source tree is copied to the output directory without build tools,
+tests, CLI entry points and .pth hooks, then every module is compiled to
+bytecode with the running interpreter. Run it with the target runtime
+(AuthLayerStack runs it in the Python 3.8 bundling image): the layer is
+read-only at /opt/python, so modules that ship without a matching .pyc are
+compiled again on every cold start.
+"""
+
+import compileall
+import fnmatch
+import os
+import py_compile
+import shutil
+import sys
+
+# removed at the top level of the layer only
+PRUNE_TOP_LEVEL = (
+    "setuptools",
+    "setuptools-*.dist-info",
+    "pkg_resources",
+    "_distutils_hack",
+    "bin",
+    "*.pth",
+)
+
+# removed at any depth
+PRUNE_ANYWHERE = (
+    "tests",
+    "test",
+    "__pycache__",
+    "*.pyc",
+    ".DS_Store",
+    # native extensions built for another platform
+    "*-darwin.so",
+    "*.exe",
+)
+
+# command line entry points, relative to the layer root
+PRUNE_PATHS = (
+    "certifi/__main__.py",
+    "charset_normalizer/cli",
+    "rsa/cli.py",
+    "simplejson/tool.py",
+)
+
+
+def _ignore(root, path_prefixes):
+    def ignore(directory, names):
+        relative = os.path.relpath(directory, root)
+        ignored = set()
+        for name in names:
+            path = os.path.normpath(os.path.join(relative, name)).replace(os.sep, "/")
+            if relative == "." and any(
+                fnmatch.fnmatch(name, pattern) for pattern in PRUNE_TOP_LEVEL
+            ):
+                ignored.add(name)
+            elif any(fnmatch.fnmatch(name, pattern) for pattern in PRUNE_ANYWHERE):
+                ignored.add(name)
+            elif path in path_prefixes:
+                ignored.add(name)
+        return ignored
+
+    return ignore
+
+
+def _tree_size(root):
+    files = 0
+    size = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(directory, name))
+    return files, size
+
+
+def build(source, output):
+    """
+    Copy the pruned layer to `output` and precompile it.
+
+    Args:
+        source (str): The layer source directory.
+        output (str): The artifact directory, e.g. /asset-output/python.
+
+    Returns:
+        bool: True if every module compiled.
+    """
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    shutil.copytree(source, output, ignore=_ignore(source, set(PRUNE_PATHS)))
+
+    # unchecked hash pycs are used without a stat of the source, and stay
+    # valid whatever mtimes the layer zip gives the files
+    compiled = compileall.compile_dir(
+        output,
+        quiet=1,
+        workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+    source_files, source_size = _tree_size(source)
+    output_files, output_size = _tree_size(output)
+    print(
+        "layer: %d files, %.1f MB -> %d files, %.1f MB (python %s)"
+        % (
+            source_files,
+            source_size / 1e6,
+            output_files,
+            output_size / 1e6,
+            sys.version.split()[0],
+        )
+    )
+    return bool(compiled)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(0 if build(sys.argv[1], sys.argv[2]) else 1)
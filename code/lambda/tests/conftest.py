@@ -0,0 +1,38 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# the handlers import the layer as top-level packages, as they do in Lambda
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "layer", "auth")
+)
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+FUNCTION_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "function"
+)
+
+
+@pytest.fixture
+def load_handler(monkeypatch):
+    """
+    Import the app.py of a function, e.g. load_handler("Auth/Login", USER_POOL_ID=...),
+    with the given environment.
+    """
+
+    def load(function, **environ):
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        spec = importlib.util.spec_from_file_location(
+            "app", os.path.join(FUNCTION_DIR, function, "app.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
@@ -0,0 +1,109 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from aws import auth_code_store
+
+moto = pytest.importorskip("moto")
+
+TOKEN_SET = {"id_token": "id", "access_token": "access", "refresh_token": "refresh"}
+CLIENT_ID = "client"
+REDIRECT_URI = "https://example.com/callback"
+
+
+@pytest.fixture
+def aws():
+    with moto.mock_aws():
+        yield
+
+
+@pytest.fixture
+def auth_code_table(aws):
+    import boto3
+
+    table_name = "auth-code-" + uuid.uuid4().hex
+    boto3.client("dynamodb").create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": "auth_code", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "auth_code", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return table_name
+
+
+def _dynamodb(auth_code_table):
+    return auth_code_store.DynamoDBAuthCodeStore(auth_code_table)
+
+
+def _memory(auth_code_table):
+    return auth_code_store.InMemoryAuthCodeStore()
+
+
+def _sqlite(auth_code_table, tmp_path):
+    return auth_code_store.SQLiteAuthCodeStore(path=str(tmp_path / "auth_code.db"))
+
+
+def _sealed(auth_code_table):
+    import boto3
+
+    secret_id = "sealing-" + uuid.uuid4().hex
+    boto3.client(
+        "secretsmanager", region_name=auth_code_store.secrets_provider.SECRET_REGION
+    ).create_secret(
+        Name=secret_id,
+        SecretString=json.dumps(
+            {"current": "k1", "keys": {"k1": base64.b64encode(bytes(32)).decode()}}
+        ),
+    )
+    return auth_code_store.SealedAuthCodeStore(auth_code_table, secret_id=secret_id)
+
+
+@pytest.fixture(params=["dynamodb", "memory", "sqlite", "sealed"])
+def store(request, auth_code_table, tmp_path):
+    if request.param == "dynamodb":
+        return _dynamodb(auth_code_table)
+    if request.param == "memory":
+        return _memory(auth_code_table)
+    if request.param == "sqlite":
+        return _sqlite(auth_code_table, tmp_path)
+    return _sealed(auth_code_table)
+
+
+def test_redeem_once(store):
+    auth_code, msg = store.put(CLIENT_ID, REDIRECT_URI, TOKEN_SET)
+    assert msg is None
+    assert store.redeem(auth_code, CLIENT_ID, REDIRECT_URI) == (TOKEN_SET, None)
+    assert store.redeem(auth_code, CLIENT_ID, REDIRECT_URI) == (
+        None,
+        "Invalid auth code.",
+    )
+
+
+def test_unknown_code_is_rejected(store):
+    assert store.redeem(str(uuid.uuid4()), CLIENT_ID, REDIRECT_URI)[1] is not None
+
+
+@pytest.mark.parametrize(
+    "client_id, redirect_uri",
+    [("other-client", REDIRECT_URI), (CLIENT_ID, "https://evil.example.com/")],
+)
+def test_mismatched_client_is_rejected(store, client_id, redirect_uri):
+    auth_code, _ = store.put(CLIENT_ID, REDIRECT_URI, TOKEN_SET)
+    assert store.redeem(auth_code, client_id, redirect_uri) == (
+        None,
+        "Invalid auth code.",
+    )
+    # the code was issued to CLIENT_ID, which can still redeem it
+    assert store.redeem(auth_code, CLIENT_ID, REDIRECT_URI) == (TOKEN_SET, None)
+
+
+def test_expired_code_is_rejected(store, monkeypatch):
+    monkeypatch.setattr(auth_code_store.helper, "AUTH_CODE_TTL", -10)
+    store.ttl = -10
+    auth_code, _ = store.put(CLIENT_ID, REDIRECT_URI, TOKEN_SET)
+    assert store.redeem(auth_code, CLIENT_ID, REDIRECT_URI) == (
+        None,
+        "Invalid auth code.",
+    )
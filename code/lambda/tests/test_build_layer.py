@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "layer")
+)
+
+import build_layer  # noqa: E402
+
+
+def _write(root, *paths):
+    for path in paths:
+        path = root.joinpath(*path.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n" if path.suffix == ".py" else "")
+
+
+def _files(root):
+    return set(
+        os.path.relpath(os.path.join(directory, name), root).replace(os.sep, "/")
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def test_build_prunes_and_precompiles(tmp_path):
+    source = tmp_path / "source"
+    _write(
+        source,
+        "aws/__init__.py",
+        "aws/helper.py",
+        "rsa/cli.py",
+        "rsa/key.py",
+        "setuptools/__init__.py",
+        "distutils-precedence.pth",
+        "simplejson/tests/test_dump.py",
+        "simplejson/_speedups.cpython-38-darwin.so",
+        "aws/__pycache__/helper.cpython-38.pyc",
+        "other/setuptools/__init__.py",
+    )
+    output = tmp_path / "python"
+    assert build_layer.build(str(source), str(output))
+
+    files = _files(output)
+    sources = set(path for path in files if "__pycache__" not in path)
+    assert sources == {
+        "aws/__init__.py",
+        "aws/helper.py",
+        "rsa/key.py",
+        # only pruned at the top level
+        "other/setuptools/__init__.py",
+    }
+    tag = sys.implementation.cache_tag
+    assert "aws/__pycache__/helper.%s.pyc" % tag in files
+    assert "rsa/__pycache__/key.%s.pyc" % tag in files
+
+
+def test_build_replaces_the_previous_output(tmp_path):
+    source = tmp_path / "source"
+    _write(source, "aws/__init__.py")
+    output = tmp_path / "python"
+    _write(output, "stale.py")
+    build_layer.build(str(source), str(output))
+    assert "stale.py" not in _files(output)
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from aws import call_graph
+
+
+def _after(delay, value):
+    time.sleep(delay)
+    return value
+
+
+def test_independent_calls_and_chain():
+    graph = call_graph.CallGraph()
+    graph.add("a", _after, 0.01, ("a", None))
+    graph.add("b", _after, 0.01, ("b", None))
+    graph.add("c", _after, 0, ("c", None), depends=("a", "b"))
+    assert graph.run() == ({"a": "a", "b": "b", "c": "c"}, None)
+
+
+def test_earliest_declared_failure_is_reported():
+    graph = call_graph.CallGraph()
+    graph.add("first", _after, 0.05, (None, "first failed"))
+    graph.add("second", _after, 0, (None, "second failed"))
+    assert graph.run() == (None, "first failed")
+
+
+def test_malformed_result_fails_its_call():
+    graph = call_graph.CallGraph()
+    graph.add("first", _after, 0.05, (None, "first failed"))
+    # not a (value, msg) pair
+    graph.add("second", _after, 0, "value")
+    assert graph.run() == (None, "first failed")
+
+
+def test_malformed_result_stops_dependent_calls():
+    started = []
+    graph = call_graph.CallGraph()
+    graph.add("first", _after, 0, None)
+    graph.add("second", started.append, "second", returns_msg=False, depends=("first",))
+    with pytest.raises(TypeError):
+        graph.run()
+    assert started == []
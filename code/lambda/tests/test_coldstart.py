@@ -0,0 +1,47 @@
+import builtins
+
+import pytest
+
+from aws import coldstart
+from aws import json_backend as json
+
+
+@pytest.fixture
+def profiler(monkeypatch, tmp_path):
+    monkeypatch.setattr(coldstart, "_imports", dict())
+    monkeypatch.setattr(coldstart, "_first_invocation", True)
+    package = tmp_path / "coldpkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "inner.py").write_text("import time\ntime.sleep(0.02)\n")
+    (tmp_path / "coldmod.py").write_text("import coldpkg.inner\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    coldstart.install()
+    try:
+        yield coldstart
+    finally:
+        coldstart.uninstall()
+
+
+def test_imports_are_timed_per_package(profiler):
+    import coldmod  # noqa: F401
+
+    inclusive, self_ms = profiler._imports["coldmod"]
+    assert inclusive >= 20 and self_ms < 20
+    assert profiler._imports["coldpkg.inner"][1] >= 20
+
+    doc = profiler.build_report(100)
+    assert doc["Import.coldpkg"] >= 20
+    assert doc["Import.coldmod"] < 20
+    assert doc["ImportDuration"] >= doc["Import.coldpkg"]
+
+
+def test_report_is_written_on_the_first_invocation_only(profiler, capsys):
+    doc = profiler.on_invoke()
+    assert builtins.__import__ is not profiler._timed_import
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1 and json.loads(lines[0]) == doc
+    assert doc["ColdStart"] == 1
+
+    assert profiler.on_invoke() is None
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+
+from aws import email_index
+
+moto = pytest.importorskip("moto")
+
+
+@pytest.fixture
+def deployment():
+    import boto3
+
+    with moto.mock_aws():
+        cognito = boto3.client("cognito-idp")
+        user_pool_id = cognito.create_user_pool(PoolName="sso")["UserPool"]["Id"]
+        table_name = "email-marker-" + uuid.uuid4().hex
+        boto3.client("dynamodb").create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": "email_hash", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "email_hash", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield cognito, user_pool_id, table_name
+
+
+def _create_user(cognito, user_pool_id, email):
+    cognito.admin_create_user(
+        UserPoolId=user_pool_id,
+        Username=email,
+        UserAttributes=[{"Name": "email", "Value": email}],
+    )
+
+
+def _built_index(user_pool_id, table_name):
+    index = email_index.EmailIndex(user_pool_id, table_name)
+    index.build()
+    return index
+
+
+def test_filter_miss_is_answered_without_cognito(deployment):
+    cognito, user_pool_id, table_name = deployment
+    _create_user(cognito, user_pool_id, "taken@example.com")
+    index = _built_index(user_pool_id, table_name)
+
+    assert index.is_taken("free@example.com") == (False, None)
+    assert index.is_taken("Taken@Example.com") == (True, None)
+    stats = index.stats()
+    assert (stats["filter_answers"], stats["cognito_calls"]) == (1, 1)
+
+
+def test_registration_in_another_container_is_seen_at_once(deployment):
+    cognito, user_pool_id, table_name = deployment
+    checker = _built_index(user_pool_id, table_name)
+    assert checker.is_taken("new@example.com") == (False, None)
+
+    # Register, in a container of its own
+    registrar = email_index.EmailIndex(user_pool_id, table_name)
+    assert registrar.mark("new@example.com") == (True, None)
+    _create_user(cognito, user_pool_id, "new@example.com")
+
+    assert checker.is_taken("new@example.com") == (True, None)
+
+
+def test_marked_but_not_registered_email_is_free(deployment):
+    _, user_pool_id, table_name = deployment
+    index = _built_index(user_pool_id, table_name)
+    index.mark("failed@example.com")
+    assert index.is_taken("failed@example.com") == (False, None)
+    assert index.stats()["cognito_calls"] == 1
+
+
+def test_failed_marker_write_stops_trusting_the_filter(deployment):
+    cognito, user_pool_id, table_name = deployment
+    index = _built_index(user_pool_id, table_name)
+    index.marker_table_name = "missing-" + table_name
+    marked, msg = index.mark("new@example.com")
+    assert marked is None and msg is not None
+    index.marker_table_name = table_name
+    _create_user(cognito, user_pool_id, "new@example.com")
+
+    # the email has no marker, so only Cognito knows it is taken
+    assert index.is_taken("new@example.com") == (True, None)
+    assert index.stats()["filter_answers"] == 0
+
+    # a filter built afterwards is trusted again
+    index._marker_failed_at -= email_index.EMAIL_MARKER_MARGIN + 1
+    assert index.build() == 1
+    assert index.is_taken("free@example.com") == (False, None)
+    assert index.stats()["filter_answers"] == 1
+
+
+def test_free_answers_are_not_cached(deployment):
+    cognito, user_pool_id, _ = deployment
+    index = email_index.EmailIndex(user_pool_id)
+    assert index.is_taken("later@example.com") == (False, None)
+    _create_user(cognito, user_pool_id, "later@example.com")
+    assert index.is_taken("later@example.com") == (True, None)
+
+
+def test_filter_older_than_the_markers_is_not_used(deployment):
+    _, user_pool_id, table_name = deployment
+    index = _built_index(user_pool_id, table_name)
+    index._built_at -= index.marker_ttl
+    assert index.is_taken("free@example.com") == (False, None)
+    assert index.stats()["cognito_calls"] == 1
+
+
+def test_without_marker_table_every_email_goes_to_cognito(deployment):
+    _, user_pool_id, _ = deployment
+    index = email_index.EmailIndex(user_pool_id)
+    assert index.mark("free@example.com") == (False, None)
+    assert index.is_taken("free@example.com") == (False, None)
+    stats = index.stats()
+    assert (stats["builds"], stats["cognito_calls"]) == (0, 1)
@@ -0,0 +1,145 @@
+import json
+import time
+import uuid
+
+import pytest
+import rsa
+
+from aws import federate
+from aws import federate_engine
+from aws import secrets_provider
+from aws.models import FederatedUserRecord
+
+moto = pytest.importorskip("moto")
+
+GOOGLE_CLIENT_ID = "google-app.apps.googleusercontent.com"
+REDIRECT_URI = "https://example.com/callback"
+KID = "test-key"
+
+
+@pytest.fixture(scope="module")
+def google_key():
+    public_key, private_key = rsa.newkeys(1024)
+    return (
+        private_key.save_pkcs1().decode("utf-8"),
+        public_key.save_pkcs1().decode("utf-8"),
+    )
+
+
+@pytest.fixture
+def google_certs(google_key, monkeypatch):
+    certs = {KID: google_key[1]}
+    monkeypatch.setattr(
+        federate.google_cert_cache, "get", lambda request, kid=None: certs
+    )
+
+
+def _google_id_token(google_key, audience=GOOGLE_CLIENT_ID, sub="1234"):
+    from google.auth import crypt
+    from google.auth import jwt
+
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "sub": sub,
+        "iat": now,
+        "exp": now + 600,
+        "given_name": "Ada",
+        "family_name": "Lovelace",
+        "email": "ada@example.com",
+        "picture": "https://example.com/ada.png",
+    }
+    signer = crypt.RSASigner.from_string(google_key[0], key_id=KID)
+    return jwt.encode(signer, payload).decode("utf-8")
+
+
+@pytest.fixture
+def deployment():
+    import boto3
+
+    with moto.mock_aws():
+        cognito = boto3.client("cognito-idp")
+        user_pool_id = cognito.create_user_pool(PoolName="sso")["UserPool"]["Id"]
+        client_id = cognito.create_user_pool_client(
+            UserPoolId=user_pool_id, ClientName="app", CallbackURLs=[REDIRECT_URI]
+        )["UserPoolClient"]["ClientId"]
+
+        user_table_name = "user-" + uuid.uuid4().hex
+        boto3.client("dynamodb").create_table(
+            TableName=user_table_name,
+            KeySchema=[{"AttributeName": "cognito_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "cognito_id", "AttributeType": "S"},
+                {"AttributeName": "federated_id", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "federated_id-index",
+                    "KeySchema": [{"AttributeName": "federated_id", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+        secret_arn = boto3.client(
+            "secretsmanager", region_name=secrets_provider.SECRET_REGION
+        ).create_secret(
+            Name="google-" + uuid.uuid4().hex,
+            SecretString=json.dumps(
+                {"client_id": GOOGLE_CLIENT_ID, "client_secret": "secret"}
+            ),
+        )[
+            "ARN"
+        ]
+        yield user_pool_id, client_id, user_table_name, secret_arn
+
+
+def _exchange(deployment, id_token):
+    user_pool_id, client_id, user_table_name, secret_arn = deployment
+    return federate_engine.exchange_platform_login(
+        user_pool_id=user_pool_id,
+        user_table_name=user_table_name,
+        client_id=client_id,
+        redirect_uri=REDIRECT_URI,
+        platform_login_data={"platform": "google", "id_token": id_token},
+        secret_arn=secret_arn,
+    )
+
+
+def test_google_id_token_of_unknown_user(deployment, google_key, google_certs):
+    assert _exchange(deployment, _google_id_token(google_key)) == (None, None)
+
+
+def test_google_id_token_of_linked_user(deployment, google_key, google_certs):
+    _, _, user_table_name, _ = deployment
+    federate.put_user_info(
+        user_table_name=user_table_name,
+        sso_user_info=FederatedUserRecord(
+            cognito_id="cognito-user",
+            cognito_email="ada@example.com",
+            federated_id="google_linked",
+        ),
+    )
+
+    federate_account, msg = _exchange(
+        deployment, _google_id_token(google_key, sub="linked")
+    )
+    assert msg is None
+    assert federate_account.cognito_id == "cognito-user"
+
+
+def test_google_id_token_for_another_app_is_rejected(
+    deployment, google_key, google_certs
+):
+    id_token = _google_id_token(google_key, audience="other-app")
+    assert _exchange(deployment, id_token) == (None, "Invalid ID token.")
+
+
+def test_google_id_token_without_client_id_is_rejected(google_key, google_certs):
+    id_token = _google_id_token(google_key, sub="no-audience")
+    assert federate.verify_google_id_token(None, id_token) == (
+        None,
+        "Invalid ID token.",
+    )
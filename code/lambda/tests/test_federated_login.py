@@ -0,0 +1,242 @@
+import base64
+import json
+import time
+import uuid
+
+import pytest
+import rsa
+
+from aws import federate
+from aws import secrets_provider
+
+moto = pytest.importorskip("moto")
+
+GOOGLE_CLIENT_ID = "google-app.apps.googleusercontent.com"
+REDIRECT_URI = "https://example.com/callback"
+KID = "test-key"
+PASSWORD = "Passw0rd!"
+
+
+@pytest.fixture(scope="module")
+def google_key():
+    public_key, private_key = rsa.newkeys(1024)
+    return (
+        private_key.save_pkcs1().decode("utf-8"),
+        public_key.save_pkcs1().decode("utf-8"),
+    )
+
+
+@pytest.fixture
+def cert_lookups(google_key, monkeypatch):
+    lookups = []
+
+    def get_certs(request, kid=None):
+        lookups.append(kid)
+        return {KID: google_key[1]}
+
+    monkeypatch.setattr(federate.google_cert_cache, "get", get_certs)
+    return lookups
+
+
+def _google_id_token(google_key, sub):
+    from google.auth import crypt
+    from google.auth import jwt
+
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": GOOGLE_CLIENT_ID,
+        "sub": sub,
+        "iat": now,
+        "exp": now + 600,
+        "given_name": "Ada",
+        "family_name": "Lovelace",
+        "email": "ada@example.com",
+        "picture": "https://example.com/ada.png",
+    }
+    signer = crypt.RSASigner.from_string(google_key[0], key_id=KID)
+    return jwt.encode(signer, payload).decode("utf-8")
+
+
+@pytest.fixture
+def deployment(monkeypatch):
+    import boto3
+
+    with moto.mock_aws():
+        cognito = boto3.client("cognito-idp")
+        user_pool_id = cognito.create_user_pool(PoolName="sso")["UserPool"]["Id"]
+        client_id = cognito.create_user_pool_client(
+            UserPoolId=user_pool_id,
+            ClientName="app",
+            CallbackURLs=[REDIRECT_URI],
+            ExplicitAuthFlows=["ALLOW_USER_PASSWORD_AUTH", "ALLOW_REFRESH_TOKEN_AUTH"],
+        )["UserPoolClient"]["ClientId"]
+
+        dynamodb = boto3.client("dynamodb")
+        user_table_name = "user-" + uuid.uuid4().hex
+        dynamodb.create_table(
+            TableName=user_table_name,
+            KeySchema=[{"AttributeName": "cognito_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "cognito_id", "AttributeType": "S"},
+                {"AttributeName": "federated_id", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "federated_id-index",
+                    "KeySchema": [{"AttributeName": "federated_id", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        auth_code_table_name = "auth-code-" + uuid.uuid4().hex
+        dynamodb.create_table(
+            TableName=auth_code_table_name,
+            KeySchema=[{"AttributeName": "auth_code", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "auth_code", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        email_marker_table_name = "email-marker-" + uuid.uuid4().hex
+        dynamodb.create_table(
+            TableName=email_marker_table_name,
+            KeySchema=[{"AttributeName": "email_hash", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "email_hash", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+        # only the Google secret knows the client ID, as in the deployed stack
+        secret_arn = boto3.client(
+            "secretsmanager", region_name=secrets_provider.SECRET_REGION
+        ).create_secret(
+            Name="google-" + uuid.uuid4().hex,
+            SecretString=json.dumps({"client_id": GOOGLE_CLIENT_ID}),
+        )[
+            "ARN"
+        ]
+        monkeypatch.delenv("GOOGLE_CLIENT_ID", raising=False)
+        monkeypatch.setattr(federate, "GOOGLE_CLIENT_ID", None)
+        monkeypatch.setattr(federate, "GOOGLE_SECRET_ARN", secret_arn)
+
+        yield {
+            "cognito": cognito,
+            "dynamodb": dynamodb,
+            "client_id": client_id,
+            "user_table_name": user_table_name,
+            "environ": dict(
+                USER_POOL_ID=user_pool_id,
+                USER_TABLE_NAME=user_table_name,
+                AUTH_CODE_TABLE_NAME=auth_code_table_name,
+                EMAIL_MARKER_TABLE_NAME=email_marker_table_name,
+            ),
+        }
+
+
+def _federated_ids(deployment):
+    items = deployment["dynamodb"].scan(TableName=deployment["user_table_name"])
+    return [item["federated_id"]["S"] for item in items["Items"]]
+
+
+def _register(load_handler, deployment, body):
+    app = load_handler("Auth/Register", **deployment["environ"])
+    body = dict(
+        email="ada@example.com", password=PASSWORD, redirect_uri=REDIRECT_URI, **body
+    )
+    return app.lambda_handler({"body": json.dumps(body)}, None)
+
+
+def _login(load_handler, deployment, body):
+    app = load_handler("Auth/Login", **deployment["environ"])
+    authorization = base64.b64encode(
+        ("ada@example.com:" + PASSWORD).encode("utf-8")
+    ).decode("ascii")
+    event = {
+        "headers": {"authorization": "Basic " + authorization},
+        "body": json.dumps(
+            dict(redirect_uri=REDIRECT_URI, response_type="token", **body)
+        ),
+    }
+    return app.lambda_handler(event, None)
+
+
+def test_register_links_google_with_the_client_id_of_the_secret(
+    load_handler, deployment, google_key, cert_lookups
+):
+    resp = _register(
+        load_handler,
+        deployment,
+        dict(
+            client_id=deployment["client_id"],
+            platform="google",
+            platform_id_token=_google_id_token(google_key, "register"),
+        ),
+    )
+    assert resp["statusCode"] == 200, resp["body"]
+    assert _federated_ids(deployment) == ["google_register"]
+
+
+def test_login_links_google_with_the_client_id_of_the_secret(
+    load_handler, deployment, google_key, cert_lookups
+):
+    _register(load_handler, deployment, dict(client_id=deployment["client_id"]))
+    deployment["cognito"].admin_confirm_sign_up(
+        UserPoolId=deployment["environ"]["USER_POOL_ID"], Username="ada@example.com"
+    )
+
+    resp = _login(
+        load_handler,
+        deployment,
+        dict(
+            client_id=deployment["client_id"],
+            platform="google",
+            platform_id_token=_google_id_token(google_key, "login"),
+        ),
+    )
+    assert resp["statusCode"] == 200, resp["body"]
+    assert _federated_ids(deployment) == ["google_login"]
+
+
+@pytest.mark.parametrize("send", [_register, _login])
+def test_no_provider_call_for_an_invalid_client(
+    load_handler, deployment, google_key, cert_lookups, send
+):
+    resp = send(
+        load_handler,
+        deployment,
+        dict(
+            client_id="unknown-client",
+            platform="google",
+            platform_id_token=_google_id_token(google_key, "attacker"),
+        ),
+    )
+    assert resp["statusCode"] == 403
+    assert cert_lookups == []
+
+
+def test_no_provider_call_before_login_succeeds(
+    load_handler, deployment, google_key, cert_lookups
+):
+    # no such user in the pool
+    resp = _login(
+        load_handler,
+        deployment,
+        dict(
+            client_id=deployment["client_id"],
+            platform="google",
+            platform_id_token=_google_id_token(google_key, "attacker"),
+        ),
+    )
+    assert resp["statusCode"] == 403
+    assert cert_lookups == []
+
+
+def test_failed_marker_write_does_not_fail_the_registration(load_handler, deployment):
+    deployment["environ"]["EMAIL_MARKER_TABLE_NAME"] = "missing"
+    resp = _register(load_handler, deployment, dict(client_id=deployment["client_id"]))
+    assert resp["statusCode"] == 200, resp["body"]
+    user = deployment["cognito"].admin_get_user(
+        UserPoolId=deployment["environ"]["USER_POOL_ID"], Username="ada@example.com"
+    )
+    assert user["Username"] == "ada@example.com"
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from aws import google_certs
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _Response(object):
+    def __init__(self, status, certs=None, headers=None):
+        self.status = status
+        self.data = google_certs.json.dumps(certs or {}).encode("utf-8")
+        self.headers = headers or {}
+
+
+class _Google(object):
+    """
+    A google-auth transport that serves the queued responses.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self, url, method="GET"):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(google_certs, "time", clock)
+    return clock
+
+
+def _wait_for_refresh(cache):
+    deadline = time.monotonic() + 5
+    while cache._refreshing:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_max_age():
+    assert google_certs._max_age({}, 300) == 300
+    headers = {"cache-control": "public, max-age=20000", "age": "500"}
+    assert google_certs._max_age(headers, 300) == 19500
+
+
+def test_certificates_without_max_age_are_not_refreshed_on_every_lookup(clock):
+    google = _Google(_Response(200, {"a": "cert"}), _Response(200, {"b": "cert"}))
+    cache = google_certs.GoogleCertCache(default_max_age=300, refresh_ahead=300)
+    assert cache.get(google) == {"a": "cert"}
+
+    # refreshed within the last tenth of the lifetime only
+    clock.now += 269
+    assert cache.get(google) == {"a": "cert"}
+    assert google.calls == 1
+    clock.now += 1
+    assert cache.get(google) == {"a": "cert"}
+    _wait_for_refresh(cache)
+    assert google.calls == 2
+    assert cache.get(google) == {"b": "cert"}
+
+
+def test_refresh_ahead_of_a_long_lifetime(clock):
+    headers = {"cache-control": "max-age=20000"}
+    google = _Google(_Response(200, {"a": "cert"}, headers))
+    cache = google_certs.GoogleCertCache(refresh_ahead=300)
+    cache.get(google)
+    assert cache._refresh_at == cache._expires_at - 300
+
+
+def test_failed_refresh_is_retried_after_min_refetch_interval(clock):
+    google = _Google(
+        _Response(200, {"a": "cert"}),
+        _Response(500),
+        _Response(200, {"b": "cert"}),
+    )
+    cache = google_certs.GoogleCertCache(
+        default_max_age=3000, refresh_ahead=300, min_refetch_interval=60
+    )
+    cache.get(google)
+    clock.now += 2700
+    assert cache.get(google) == {"a": "cert"}
+    _wait_for_refresh(cache)
+    assert google.calls == 2
+
+    clock.now += 59
+    for _ in range(5):
+        assert cache.get(google) == {"a": "cert"}
+    assert google.calls == 2
+
+    clock.now += 1
+    assert cache.get(google) == {"a": "cert"}
+    _wait_for_refresh(cache)
+    assert google.calls == 3
+    assert cache.get(google) == {"b": "cert"}
@@ -0,0 +1,39 @@
+import threading
+
+from aws import helper
+
+
+def test_client_is_shared_per_service_and_region():
+    client = helper.get_client("sqs")
+    assert helper.get_client("sqs") is client
+    assert helper.get_client("sqs", region_name="eu-west-1") is not client
+    assert helper.get_client("sns") is not client
+
+
+def test_client_is_built_once_under_concurrency(monkeypatch):
+    monkeypatch.setattr(helper, "_clients", dict())
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def get():
+        barrier.wait()
+        clients.append(helper.get_client("dynamodb", region_name="ap-south-1"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(map(id, clients))) == 1
+
+
+def test_client_config():
+    config = helper.get_client("kms").meta.config
+    assert config.max_pool_connections == helper.CLIENT_MAX_POOL_CONNECTIONS
+    assert config.connect_timeout == helper.CLIENT_CONNECT_TIMEOUT
+    assert config.read_timeout == helper.CLIENT_READ_TIMEOUT
+    # botocore counts the first attempt in total_max_attempts
+    assert config.retries == {
+        "total_max_attempts": helper.CLIENT_MAX_ATTEMPTS + 1,
+        "mode": "standard",
+    }
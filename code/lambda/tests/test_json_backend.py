@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+import pytest
+
+from aws import json_backend as json
+
+
+def test_simplejson_is_only_used_with_its_speedups():
+    if json.backend() == "simplejson":
+        from simplejson import _speedups  # noqa: F401
+    else:
+        assert json._json.__name__ == "json"
+
+
+def test_decimal_round_trip():
+    s = json.dumps({"int": Decimal("3"), "float": Decimal("1.25")})
+    assert json.loads(s) == {"int": 3, "float": 1.25}
+    assert isinstance(json.loads(s)["int"], int)
+    assert json.loads(s, use_decimal=True)["float"] == Decimal("1.25")
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(TypeError):
+        json.dumps({"value": object()})
+
+
+def test_decode_error():
+    with pytest.raises(json.JSONDecodeError):
+        json.loads("{")
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+LAYER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "layer", "auth"
+)
+
+
+def _modules_after(code):
+    # a fresh interpreter, so that modules imported by other tests do not count
+    out = subprocess.check_output(
+        [sys.executable, "-c", code + "\nimport sys\nprint(' '.join(sys.modules))"],
+        cwd=LAYER_DIR,
+        env=dict(os.environ, PYTHONPATH=LAYER_DIR),
+    )
+    return set(out.decode().split())
+
+
+def test_federate_does_not_import_the_provider_libraries():
+    modules = _modules_after("from aws import federate")
+    assert "aws.federate" in modules
+    # urllib3 is not in the list, botocore imports it
+    assert not {"requests", "google.auth.jwt", "rsa"} & modules
+
+
+def test_provider_libraries_are_imported_on_first_use():
+    modules = _modules_after("from aws import federate\nfederate._get_google()")
+    assert {"requests", "google.auth.jwt"} <= modules
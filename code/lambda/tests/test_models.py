@@ -0,0 +1,39 @@
+from aws.models import AuthCodeRecord, FederatedUserRecord
+
+
+def test_federated_user_record_round_trip():
+    record = FederatedUserRecord(
+        cognito_id="user-1",
+        cognito_email="user@example.com",
+        federated_id="google_123",
+        first_name="Ada",
+        picture="https://example.com/ada.png",
+    )
+    item = record.to_item()
+    # unset attributes are not written
+    assert set(item) == {
+        "federated_id",
+        "cognito_id",
+        "cognito_email",
+        "first_name",
+        "picture",
+    }
+    decoded = FederatedUserRecord.from_item(item)
+    assert decoded.to_dict() == record.to_dict()
+    assert decoded.last_name is None and decoded.email is None
+
+
+def test_auth_code_record_round_trip():
+    record = AuthCodeRecord(
+        auth_code="code",
+        client_id="client",
+        redirect_uri="https://app.example.com/callback",
+        ttl=1700000000,
+        token_set='{"access_token": "a"}',
+    )
+    item = record.to_item()
+    assert item["ttl"] == {"N": "1700000000"}
+    decoded = AuthCodeRecord.from_item(item)
+    assert [getattr(decoded, name) for name in AuthCodeRecord.__slots__] == [
+        getattr(record, name) for name in AuthCodeRecord.__slots__
+    ]
@@ -0,0 +1,57 @@
+import pytest
+
+from aws import federate
+from aws.token_cache import TokenCache
+
+
+class _Response(object):
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    calls = []
+    responses = {"good": _Response(200, {"id": "1"}), "bad": _Response(401)}
+
+    def http(method, url, **kwargs):
+        token = kwargs.get("headers", {}).get("Authorization", url)
+        token = token.rsplit("=", 1)[-1].replace("Bearer ", "")
+        calls.append(token)
+        return responses[token]
+
+    monkeypatch.setattr(federate, "_http", http)
+    monkeypatch.setattr(
+        federate, "facebook_profile_cache", TokenCache("FacebookProfile", 8)
+    )
+    monkeypatch.setattr(
+        federate, "linkedin_profile_cache", TokenCache("LinkedInProfile", 8)
+    )
+    return calls
+
+
+@pytest.mark.parametrize(
+    "verify",
+    [federate.verify_facebook_access_token, federate.verify_linkedin_access_token],
+)
+def test_profile_of_a_valid_token_is_cached(provider, verify):
+    for _ in range(3):
+        assert verify("good") == ({"id": "1"}, None)
+    assert provider == ["good"]
+
+    for _ in range(2):
+        assert verify("bad") == (None, "Invalid access token.")
+    assert provider == ["good", "bad", "bad"]
+
+
+def test_profile_expires_after_provider_profile_ttl(provider, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(federate.time, "time", lambda: now[0])
+    federate.verify_facebook_access_token("good")
+    now[0] += federate.PROVIDER_PROFILE_TTL
+    federate.verify_facebook_access_token("good")
+    assert provider == ["good", "good"]
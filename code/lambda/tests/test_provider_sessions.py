@@ -0,0 +1,70 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from aws import federate
+from aws import tracing
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield "http://127.0.0.1:%d/" % server.server_port
+    server.shutdown()
+    server.server_close()
+
+
+def test_one_session_per_host():
+    session = federate.get_session("graph.facebook.com")
+    assert federate.get_session("graph.facebook.com") is session
+    assert federate.get_session("api.linkedin.com") is not session
+    adapter = session.get_adapter("https://graph.facebook.com/me")
+    assert isinstance(adapter, federate._get_adapter_class())
+    assert adapter.max_retries.total == 0
+
+
+def test_connections_are_reused_and_counted(server, monkeypatch):
+    recorder = tracing.SpanRecorder(enabled=True)
+    monkeypatch.setattr(tracing, "recorder", recorder)
+    session = federate._get_requests().Session()
+    # the provider hosts are https only, the adapter is the same
+    session.mount("http://", federate._get_adapter_class()(pool_maxsize=1))
+
+    for _ in range(3):
+        assert session.get(server).status_code == 200
+    assert recorder._counters == {
+        "ProviderConnectionsOpened": 1,
+        "ProviderConnectionsReused": 2,
+    }
+
+
+def test_default_timeout_is_applied(monkeypatch):
+    sent = []
+    adapter_class = federate._get_adapter_class()
+    monkeypatch.setattr(
+        adapter_class.__bases__[0],
+        "send",
+        lambda self, request, **kwargs: sent.append(kwargs["timeout"]),
+    )
+    adapter = adapter_class()
+    request = federate._get_requests().Request("GET", "https://example.com/")
+    adapter.send(request.prepare())
+    adapter.send(request.prepare(), timeout=1)
+    assert sent == [federate.PROVIDER_TIMEOUT, 1]
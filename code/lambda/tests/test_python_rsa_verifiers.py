@@ -0,0 +1,30 @@
+import pytest
+import rsa
+
+from google.auth.crypt import _python_rsa
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return rsa.newkeys(1024)
+
+
+def test_verifier_is_parsed_once_per_key(keys):
+    public_key, private_key = keys
+    pem = public_key.save_pkcs1()
+    verifier = _python_rsa.RSAVerifier.from_string(pem)
+    assert _python_rsa.RSAVerifier.from_string(pem.decode("ascii")) is verifier
+
+    signature = rsa.sign(b"message", private_key, "SHA-256")
+    assert verifier.verify(b"message", signature)
+    assert not verifier.verify(b"other", signature)
+
+    other = rsa.newkeys(512)[0].save_pkcs1()
+    assert _python_rsa.RSAVerifier.from_string(other) is not verifier
+
+
+def test_unparseable_key_is_not_cached():
+    size = len(_python_rsa._verifier_cache)
+    with pytest.raises(ValueError):
+        _python_rsa.RSAVerifier.from_string(b"not a key")
+    assert len(_python_rsa._verifier_cache) == size
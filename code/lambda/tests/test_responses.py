@@ -0,0 +1,19 @@
+from aws import helper
+from aws import json_backend as json
+
+
+def test_static_response_is_encoded_once():
+    resp = helper.static_response("Invalid access token", 401)
+    assert helper.static_response("Invalid access token", 401) is resp
+    assert helper.static_response("Invalid access token", 403) is not resp
+    assert resp == helper.build_response({"message": "Invalid access token"}, 401)
+
+
+def test_build_response():
+    resp = helper.build_response({"token": "a b"}, 200)
+    assert resp["statusCode"] == 200
+    assert resp["isBase64Encoded"] is False
+    assert resp["body"] == '{"token":"a b"}'
+    assert json.loads(resp["body"]) == {"token": "a b"}
+    # the header dict is shared per status code
+    assert helper.build_response({}, 200)["headers"] is resp["headers"]
@@ -0,0 +1,75 @@
+import base64
+import hashlib
+import hmac
+import struct
+
+import pytest
+
+from aws import sealing
+
+KEY = bytes(range(32))
+KEYS = {"k1": KEY}
+PLAINTEXT = b'{"c":"client"}'
+NONCE = b"\xa5" * sealing.NONCE_SIZE
+# seal("k1", KEY, PLAINTEXT) with NONCE
+SEALED = (
+    "AQJrMaWlpaWlpaWlpaWlpaWlpaXbeauCMYUKwuunrQ6BeGi4gVMam_qvs6KXWW9R6y7X"
+    "ifxqDU45wicR1vG9HzVt"
+)
+
+
+def _decode(envelope):
+    return base64.urlsafe_b64decode(envelope + "=" * (-len(envelope) % 4))
+
+
+def _encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def test_known_answer(monkeypatch):
+    monkeypatch.setattr(sealing.os, "urandom", lambda n: NONCE)
+    assert sealing.seal("k1", KEY, PLAINTEXT) == SEALED
+    assert sealing.unseal(KEYS, SEALED) == PLAINTEXT
+
+
+def test_known_answer_layout():
+    # recompute the envelope from the primitives, independently of seal()
+    enc_key = hmac.new(KEY, b"sealing-enc", hashlib.sha256).digest()
+    mac_key = hmac.new(KEY, b"sealing-mac", hashlib.sha256).digest()
+    keystream = hmac.new(enc_key, NONCE + struct.pack(">I", 0), hashlib.sha256)
+    header = b"\x01\x02k1" + NONCE
+    ciphertext = bytes(a ^ b for a, b in zip(PLAINTEXT, keystream.digest()))
+    tag = hmac.new(mac_key, header + ciphertext, hashlib.sha256).digest()
+    assert _decode(SEALED) == header + ciphertext + tag
+
+
+def test_round_trip_multi_block():
+    plaintext = bytes(range(256)) * 3
+    sealed = sealing.seal("k1", KEY, plaintext)
+    assert sealing.unseal(KEYS, sealed) == plaintext
+    assert sealing.seal("k1", KEY, plaintext) != sealed
+
+
+def test_every_flipped_byte_is_rejected():
+    raw = _decode(SEALED)
+    for i in range(len(raw)):
+        tampered = bytearray(raw)
+        tampered[i] ^= 0x01
+        with pytest.raises(sealing.SealError):
+            sealing.unseal(KEYS, _encode(bytes(tampered)))
+
+
+def test_truncated_and_extended_envelopes_are_rejected():
+    raw = _decode(SEALED)
+    for length in range(len(raw)):
+        with pytest.raises(sealing.SealError):
+            sealing.unseal(KEYS, _encode(raw[:length]))
+    with pytest.raises(sealing.SealError):
+        sealing.unseal(KEYS, _encode(raw + b"\x00"))
+
+
+def test_wrong_or_unknown_key_is_rejected():
+    with pytest.raises(sealing.SealError):
+        sealing.unseal({"k1": bytes(32)}, SEALED)
+    with pytest.raises(sealing.SealError):
+        sealing.unseal({"k2": KEY}, SEALED)
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+
+import pytest
+
+from aws import secrets_provider
+
+moto = pytest.importorskip("moto")
+
+
+@pytest.fixture
+def secretsmanager():
+    import boto3
+
+    with moto.mock_aws():
+        client = boto3.client(
+            "secretsmanager", region_name=secrets_provider.SECRET_REGION
+        )
+        client.create_secret(Name="app", SecretString=json.dumps({"key": "v1"}))
+        yield client
+
+
+def test_secret_is_read_once_within_ttl(secretsmanager):
+    provider = secrets_provider.SecretsProvider()
+    assert provider.get("app") == {"key": "v1"}
+    assert provider.get("app") == {"key": "v1"}
+    stats = provider.stats()
+    assert (stats["misses"], stats["hits"], stats["size"]) == (1, 1, 1)
+
+
+def test_rotation_is_picked_up_by_the_background_refresh(secretsmanager):
+    provider = secrets_provider.SecretsProvider(ttl=0, max_stale=3600)
+    assert provider.get("app") == {"key": "v1"}
+    secretsmanager.put_secret_value(
+        SecretId="app", SecretString=json.dumps({"key": "v2"})
+    )
+    # the stale value is served while it is read again
+    assert provider.get("app") == {"key": "v1"}
+    deadline = time.monotonic() + 5
+    while provider.get("app") != {"key": "v2"}:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    assert provider.stats()["misses"] == 1
+
+
+def test_failed_read_is_backed_off(secretsmanager):
+    provider = secrets_provider.SecretsProvider(backoff=60)
+    for _ in range(3):
+        with pytest.raises(Exception):
+            provider.get("missing")
+    stats = provider.stats()
+    assert (stats["misses"], stats["failures"]) == (3, 1)
+
+    provider.invalidate("missing")
+    secretsmanager.create_secret(Name="missing", SecretString="raw")
+    assert provider.get("missing") == "raw"
+
+
+def test_concurrent_misses_share_one_read(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def load(self, secret_id):
+        calls.append(secret_id)
+        release.wait()
+        return {"key": "v1"}
+
+    monkeypatch.setattr(secrets_provider.SecretsProvider, "_load", load)
+    provider = secrets_provider.SecretsProvider()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(provider.get("app")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    while provider.stats()["misses"] + provider.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == ["app"]
+    assert results == [{"key": "v1"}] * 4
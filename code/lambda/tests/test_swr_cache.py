@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from cachetools.func import swr_cache
+
+
+class Timer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_share_one_call_and_are_counted():
+    calls = []
+    release = threading.Event()
+
+    @swr_cache(ttl=60)
+    def load(key):
+        calls.append(key)
+        release.wait()
+        return key.upper()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(load("a"))) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while load.cache_info().misses + load.cache_info().coalesced < 8:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["a"]
+    assert results == ["A"] * 8
+    info = load.cache_info()
+    assert (info.misses, info.coalesced, info.hits) == (1, 7, 0)
+
+
+def test_failed_miss_is_backed_off():
+    timer = Timer()
+    calls = []
+
+    @swr_cache(ttl=60, backoff=1, max_backoff=4, timer=timer)
+    def load(key):
+        calls.append(timer.now)
+        raise RuntimeError("down")
+
+    for now in (0, 0.5, 1, 1.5, 2.5, 3, 5, 9):
+        timer.now = now
+        with pytest.raises(RuntimeError):
+            load("a")
+    # retried after 1, 2 and 4 seconds
+    assert calls == [0, 1, 3, 9]
+    assert load.cache_info().failures == 4
+
+    load.cache_invalidate("a")
+    with pytest.raises(RuntimeError):
+        load("a")
+    assert len(calls) == 5
+
+
+def test_failed_refresh_keeps_stale_result_and_is_backed_off():
+    timer = Timer()
+    results = iter(["v1"])
+
+    @swr_cache(ttl=10, max_stale=100, backoff=5, timer=timer)
+    def load(key):
+        try:
+            return next(results)
+        except StopIteration:
+            raise RuntimeError("down")
+
+    assert load("a") == "v1"
+    timer.now = 11
+    assert load("a") == "v1"
+    _wait_for_refreshes(load, failures=1)
+    timer.now = 12
+    assert load("a") == "v1"
+    assert load.cache_info().refreshes == 1
+    timer.now = 16
+    assert load("a") == "v1"
+    _wait_for_refreshes(load, failures=2)
+    assert load.cache_info().refreshes == 2
+
+
+def _wait_for_refreshes(load, failures):
+    deadline = time.monotonic() + 5
+    while load.cache_info().failures < failures:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+import rsa
+
+from aws import federate
+from aws.token_cache import TokenCache
+
+GOOGLE_CLIENT_ID = "google-app.apps.googleusercontent.com"
+KID = "test-key"
+
+
+def test_entries_are_scoped_and_expire():
+    cache = TokenCache("Test", maxsize=8)
+    cache.put("token", "claims", time.time() + 60, scope="a")
+    assert cache.get("token", scope="a") == "claims"
+    assert cache.get("token", scope="b") is None
+    assert cache.get("other", scope="a") is None
+
+    cache.put("expired", "claims", time.time() - 1)
+    assert cache.get("expired") is None
+    assert cache.stats()["size"] == 1
+
+
+def test_max_ttl_caps_the_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TokenCache("Test", maxsize=8, max_ttl=60)
+    cache.put("token", "claims", now[0] + 3600)
+    now[0] += 59
+    assert cache.get("token") == "claims"
+    now[0] += 1
+    assert cache.get("token") is None
+
+
+def test_cache_is_bounded_and_never_holds_the_token():
+    cache = TokenCache("Test", maxsize=2)
+    for token in ("a", "b", "c"):
+        cache.put(token, token, time.time() + 60)
+    assert cache.get("a") is None and cache.get("c") == "c"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 2}
+    # keyed by the SHA-256 digest of the token
+    assert all(len(digest) == 32 for _, digest in cache._cache)
+
+
+def test_verified_google_token_is_memoized(monkeypatch):
+    from google.auth import crypt
+    from google.auth import jwt
+
+    public_key, private_key = rsa.newkeys(1024)
+    lookups = []
+
+    def get_certs(request, kid=None):
+        lookups.append(kid)
+        return {KID: public_key.save_pkcs1().decode("utf-8")}
+
+    monkeypatch.setattr(federate.google_cert_cache, "get", get_certs)
+    monkeypatch.setattr(federate, "google_token_cache", TokenCache("Google", 8))
+    now = int(time.time())
+    token = jwt.encode(
+        crypt.RSASigner.from_string(private_key.save_pkcs1().decode(), key_id=KID),
+        {
+            "iss": "accounts.google.com",
+            "aud": GOOGLE_CLIENT_ID,
+            "sub": "1234",
+            "iat": now,
+            "exp": now + 600,
+        },
+    ).decode("utf-8")
+
+    for _ in range(3):
+        claims, msg = federate.verify_google_id_token(GOOGLE_CLIENT_ID, token)
+        assert (claims["sub"], msg) == ("1234", None)
+    assert lookups == [KID]
+    # another audience is checked, and rejected
+    assert federate.verify_google_id_token("other-app", token) == (
+        None,
+        "Invalid ID token.",
+    )
@@ -0,0 +1,61 @@
+import pytest
+
+from aws import helper
+from aws import json_backend as json
+from aws import tracing
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = tracing.SpanRecorder(namespace="Test", enabled=True)
+    monkeypatch.setattr(tracing, "recorder", recorder)
+    return recorder
+
+
+def test_flush_writes_one_emf_line(recorder, capsys):
+    with tracing.span("http", "GET example.com"):
+        pass
+    with tracing.span("http", "GET example.com"):
+        pass
+    with pytest.raises(ValueError):
+        with tracing.span("cognito-idp", "InitiateAuth"):
+            raise ValueError()
+    tracing.count("CacheHits", 2)
+
+    doc = tracing.flush()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1 and json.loads(lines[0]) == doc
+
+    assert len(doc["http.GET example.com"]) == 2
+    assert doc["DownstreamErrors"] == 1
+    assert doc["CacheHits"] == 2
+    metrics = doc["_aws"]["CloudWatchMetrics"][0]
+    assert metrics["Namespace"] == "Test"
+    assert [m["Name"] for m in metrics["Metrics"]] == [
+        "http.GET example.com",
+        "cognito-idp.InitiateAuth",
+        "DownstreamRetries",
+        "DownstreamErrors",
+        "CacheHits",
+    ]
+    assert [s["status"] for s in doc["spans"]] == ["ok", "ok", "ValueError"]
+
+
+def test_empty_invocation_writes_nothing(recorder, capsys):
+    assert tracing.flush() is None
+    assert capsys.readouterr().out == ""
+
+
+def test_client_calls_are_recorded(recorder):
+    moto = pytest.importorskip("moto")
+
+    with moto.mock_aws():
+        client = helper.get_client("dynamodb")
+        client.list_tables()
+        with pytest.raises(client.exceptions.ResourceNotFoundException):
+            client.describe_table(TableName="missing")
+
+    assert [(s.service, s.operation, s.status) for s in recorder.spans()] == [
+        ("dynamodb", "ListTables", "ok"),
+        ("dynamodb", "DescribeTable", "ResourceNotFoundException"),
+    ]
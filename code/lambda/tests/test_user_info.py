@@ -0,0 +1,71 @@
+import gzip
+import io
+import os
+
+import pytest
+
+from aws import verifier
+
+moto = pytest.importorskip("moto")
+
+
+def _moto_jwks(url, timeout=None):
+    import moto.cognitoidp
+
+    path = os.path.join(
+        os.path.dirname(moto.cognitoidp.__file__), "resources", "jwks-public.json.gz"
+    )
+    with gzip.open(path) as f:
+        return io.BytesIO(f.read())
+
+
+@pytest.fixture
+def user_info(load_handler, monkeypatch):
+    import boto3
+
+    with moto.mock_aws():
+        cognito = boto3.client("cognito-idp")
+        user_pool_id = cognito.create_user_pool(PoolName="sso")["UserPool"]["Id"]
+        client_id = cognito.create_user_pool_client(
+            UserPoolId=user_pool_id,
+            ClientName="app",
+            ExplicitAuthFlows=["ALLOW_USER_PASSWORD_AUTH", "ALLOW_REFRESH_TOKEN_AUTH"],
+        )["UserPoolClient"]["ClientId"]
+        cognito.admin_create_user(
+            UserPoolId=user_pool_id,
+            Username="user@example.com",
+            UserAttributes=[{"Name": "email", "Value": "user@example.com"}],
+        )
+        cognito.admin_set_user_password(
+            UserPoolId=user_pool_id,
+            Username="user@example.com",
+            Password="Passw0rd!",
+            Permanent=True,
+        )
+        access_token = cognito.initiate_auth(
+            ClientId=client_id,
+            AuthFlow="USER_PASSWORD_AUTH",
+            AuthParameters={"USERNAME": "user@example.com", "PASSWORD": "Passw0rd!"},
+        )["AuthenticationResult"]["AccessToken"]
+
+        monkeypatch.setattr(verifier.urllib.request, "urlopen", _moto_jwks)
+        app = load_handler("Oauth2/UserInfo", USER_POOL_ID=user_pool_id)
+        yield app, cognito, access_token
+
+
+def _get(app, access_token):
+    event = {"headers": {"authorization": "Bearer " + access_token}}
+    return app.lambda_handler(event, None)["statusCode"]
+
+
+def test_signed_out_token_is_rejected(user_info):
+    app, cognito, access_token = user_info
+    assert _get(app, access_token) == 200
+    cognito.global_sign_out(AccessToken=access_token)
+    assert _get(app, access_token) == 401
+
+
+def test_forged_token_is_rejected(user_info):
+    app, _, access_token = user_info
+    header, payload, signature = access_token.split(".")
+    assert _get(app, ".".join((header, payload, signature[::-1]))) == 401
@@ -0,0 +1,82 @@
+import pytest
+
+from aws import helper
+
+moto = pytest.importorskip("moto")
+
+CALLBACK_URL = "https://app.example.com/callback"
+
+
+@pytest.fixture
+def user_pool():
+    import boto3
+
+    with moto.mock_aws():
+        cognito = boto3.client("cognito-idp")
+        user_pool_id = cognito.create_user_pool(PoolName="sso")["UserPool"]["Id"]
+        client = cognito.create_user_pool_client(
+            UserPoolId=user_pool_id,
+            ClientName="app",
+            GenerateSecret=True,
+            CallbackURLs=[CALLBACK_URL],
+        )["UserPoolClient"]
+        yield cognito, user_pool_id, client
+
+
+def test_client_is_described_once(user_pool):
+    _, user_pool_id, client = user_pool
+    cache = helper.UserPoolClientCache()
+    for _ in range(3):
+        metadata, msg = cache.get(user_pool_id, client["ClientId"])
+        assert msg is None
+        assert metadata.callback_urls == frozenset([CALLBACK_URL])
+        assert metadata.client_secret == client["ClientSecret"]
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["size"]) == (1, 2, 1)
+
+
+def test_unknown_client_is_remembered_for_negative_ttl(user_pool, monkeypatch):
+    _, user_pool_id, _ = user_pool
+    now = [1000.0]
+    monkeypatch.setattr(helper.time, "monotonic", lambda: now[0])
+    cache = helper.UserPoolClientCache(negative_ttl=30)
+
+    assert cache.get(user_pool_id, "unknown")[1] == "Client not found."
+    now[0] += 29
+    assert cache.get(user_pool_id, "unknown")[1] == "Client not found."
+    assert cache.stats()["misses"] == 1
+    now[0] += 1
+    assert cache.get(user_pool_id, "unknown")[1] == "Client not found."
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_is_bounded(user_pool):
+    cognito, user_pool_id, _ = user_pool
+    cache = helper.UserPoolClientCache(maxsize=2)
+    for name in ("a", "b", "c"):
+        client_id = cognito.create_user_pool_client(
+            UserPoolId=user_pool_id, ClientName=name
+        )["UserPoolClient"]["ClientId"]
+        cache.get(user_pool_id, client_id)
+    assert cache.stats()["size"] == 2
+
+
+def test_verify_client_id_and_redirect_uri(user_pool, monkeypatch):
+    _, user_pool_id, client = user_pool
+    monkeypatch.setattr(helper, "user_pool_client_cache", helper.UserPoolClientCache())
+    client_id = client["ClientId"]
+
+    user_pool_client, msg = helper.verify_client_id_and_redirect_uri(
+        user_pool_id, client_id, CALLBACK_URL
+    )
+    assert (user_pool_client["ClientId"], msg) == (client_id, None)
+    assert helper.verify_client_id_and_redirect_uri(
+        user_pool_id, client_id, "https://evil.example.com"
+    ) == (None, "Callback URL not found.")
+    assert helper.verify_client_secret(
+        user_pool_id, client_id, client["ClientSecret"]
+    ) == (True, None)
+    assert helper.verify_client_secret(user_pool_id, client_id, "wrong") == (
+        None,
+        "Client secret is not valid.",
+    )
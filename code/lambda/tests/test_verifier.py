@@ -0,0 +1,78 @@
+import base64
+import json
+import time
+
+import pytest
+import rsa
+
+from aws import verifier
+
+USER_POOL_ID = "us-east-1_test"
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/" + USER_POOL_ID
+KID = "test-key"
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return rsa.newkeys(1024)
+
+
+@pytest.fixture
+def token_verifier(keys):
+    token_verifier = verifier.CognitoTokenVerifier(USER_POOL_ID)
+    token_verifier.jwks._keys = {KID: keys[0]}
+    token_verifier.jwks._fetched_at = time.monotonic()
+    # no JWKS fetch for unknown key IDs
+    token_verifier.jwks._attempted_at = time.monotonic()
+    return token_verifier
+
+
+def _token(keys, kid=KID, **claims):
+    payload = {
+        "iss": ISSUER,
+        "token_use": "access",
+        "client_id": "app",
+        "sub": "user",
+        "exp": int(time.time()) + 600,
+    }
+    payload.update(claims)
+    signing_input = (
+        _b64(json.dumps({"alg": "RS256", "kid": kid}).encode())
+        + "."
+        + _b64(json.dumps(payload).encode())
+    )
+    signature = rsa.sign(signing_input.encode("ascii"), keys[1], "SHA-256")
+    return signing_input + "." + _b64(signature)
+
+
+def test_valid_token(keys, token_verifier):
+    claims, msg = token_verifier.verify(_token(keys), client_id="app")
+    assert (claims["sub"], msg) == ("user", None)
+
+
+@pytest.mark.parametrize(
+    "claims, kid, msg",
+    [
+        ({"exp": int(time.time()) - 60}, KID, "Token expired."),
+        ({"iss": "https://example.com"}, KID, "Invalid token issuer."),
+        ({"token_use": "id"}, KID, "Invalid token use."),
+        ({"client_id": "other"}, KID, "Invalid token client."),
+        ({}, "unknown", "Invalid token."),
+    ],
+)
+def test_invalid_token(keys, token_verifier, claims, kid, msg):
+    token = _token(keys, kid=kid, **claims)
+    assert token_verifier.verify(token, client_id="app") == (None, msg)
+
+
+def test_tampered_token(keys, token_verifier):
+    header, payload, signature = _token(keys).split(".")
+    forged = _b64(json.dumps({"sub": "admin", "exp": 2**31}).encode())
+    assert token_verifier.verify(".".join((header, forged, signature))) == (
+        None,
+        "Invalid token.",
+    )
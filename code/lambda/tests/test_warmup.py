@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from aws import helper
+from aws import tracing
+
+
+def test_warmup_event_runs_the_warmers_instead_of_the_handler(monkeypatch):
+    calls = []
+
+    def ok():
+        calls.append("ok")
+
+    def failing():
+        raise RuntimeError("down")
+
+    monkeypatch.setattr(helper, "_warmers", [failing, ok])
+
+    @helper.DeveloperMode(True)
+    def handler(event, context):
+        calls.append("handler")
+        return "response"
+
+    result = handler({"warmup": True}, None)[helper.WARMUP_EVENT_KEY]
+    assert calls == ["ok"]
+    assert result["failing"]["status"] == "down"
+    assert result["ok"]["status"] == "ok"
+
+    assert handler({"warmup": "true", "headers": {}}, None) == "response"
+    assert calls == ["ok", "handler"]
+
+
+@pytest.fixture
+def user_pool(monkeypatch):
+    import boto3
+
+    moto = pytest.importorskip("moto")
+    recorder = tracing.SpanRecorder(enabled=True)
+    monkeypatch.setattr(tracing, "recorder", recorder)
+    monkeypatch.setattr(helper, "user_pool_client_cache", helper.UserPoolClientCache())
+    with moto.mock_aws():
+        cognito = boto3.client("cognito-idp")
+        user_pool_id = cognito.create_user_pool(PoolName="sso")["UserPool"]["Id"]
+        client_id = cognito.create_user_pool_client(
+            UserPoolId=user_pool_id, ClientName="app"
+        )["UserPoolClient"]["ClientId"]
+        monkeypatch.setenv("USER_POOL_ID", user_pool_id)
+        yield recorder, client_id
+
+
+def test_warm_cognito_makes_no_call_without_client_ids(user_pool, monkeypatch):
+    recorder, _ = user_pool
+    monkeypatch.setattr(helper, "WARMUP_CLIENT_IDS", [])
+    helper.warm_cognito()
+    assert recorder.spans() == []
+
+
+def test_warm_cognito_prefetches_the_configured_clients(user_pool, monkeypatch):
+    recorder, client_id = user_pool
+    monkeypatch.setattr(helper, "WARMUP_CLIENT_IDS", [client_id])
+    helper.warm_cognito()
+    assert [s.operation for s in recorder.spans()] == ["DescribeUserPoolClient"]
+    helper.user_pool_client_cache.get(os.environ["USER_POOL_ID"], client_id)
+    assert helper.user_pool_client_cache.stats()["hits"] == 1
@@ -1,3 +1,5 @@
+import * as events from '@aws-cdk/aws-events';
+import * as eventsTargets from '@aws-cdk/aws-events-targets';
 import * as lambda from '@aws-cdk/aws-lambda';
 import * as core from '@aws-cdk/core';
 import * as aws from 'aws-sdk';
@@ -15,6 +17,30 @@ export const XChangeLambdaFunctionDefaultProps = {
   timeout: core.Duration.seconds(6),
 };
 
+export const WARMUP_INTERVAL = core.Duration.minutes(5);
+
+/**
+ * Invoke the functions with a {"warmup": true} event every WARMUP_INTERVAL.
+ * DeveloperMode in the auth layer runs the registered warmers on that event
+ * (clients, connections, client metadata, provider certs) and skips the
+ * handler. A rule takes at most 5 targets.
+ */
+export const addWarmUpSchedule = (
+  scope: core.Construct,
+  id: string,
+  functions: lambda.IFunction[],
+): events.Rule => {
+  return new events.Rule(scope, id, {
+    schedule: events.Schedule.rate(WARMUP_INTERVAL),
+    targets: functions.map(
+      (handler) =>
+        new eventsTargets.LambdaFunction(handler, {
+          event: events.RuleTargetInput.fromObject({ warmup: true }),
+        }),
+    ),
+  });
+};
+
 export interface XChangeSSOEnvConfigSet {
   deploymentAccount: core.Environment;
   // development: BuildConfig;
@@ -28,6 +54,7 @@ export interface BuildConfig {
   removalPolicy: core.RemovalPolicy;
   externalParameters: {
     linkedInSecretManagerArn: string;
+    googleSecretManagerArn: string;
     wildcardXchangeDomainCertificateArn: string;
   };
 }
@@ -93,6 +120,8 @@ export const getBuildConfigSet = async (): Promise<any> => {
       '/arn/sso/production/backend/wildcardXchangeDomain',
     productionLinkedInSecretManagerArn:
       '/arn/sso/production/backend/linkedInSecretManager',
+    productionGoogleSecretManagerArn:
+      '/arn/sso/production/backend/googleSecretManager',
   };
 
   const ssmValues: { [key: string]: string } = {};
@@ -129,6 +158,7 @@ export const getBuildConfigSet = async (): Promise<any> => {
       },
       externalParameters: {
         linkedInSecretManagerArn: ssmValues.productionLinkedInSecretManagerArn,
+        googleSecretManagerArn: ssmValues.productionGoogleSecretManagerArn,
         wildcardXchangeDomainCertificateArn:
           ssmValues.productionBackendWildcardXchangeDomainCertificateArn,
       },
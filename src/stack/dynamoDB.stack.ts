@@ -8,6 +8,7 @@ interface DynamoDBStackDependencyProps extends core.StackProps {
 export class DynamoDBStack extends core.Stack {
   public readonly cognitoUserTable!: dynamodb.Table;
   public readonly cognitoAuthCodeTable!: dynamodb.Table;
+  public readonly emailMarkerTable!: dynamodb.Table;
   constructor(
     scope: core.Construct,
     id: string,
@@ -44,5 +45,15 @@ export class DynamoDBStack extends core.Stack {
       timeToLiveAttribute: 'ttl',
       removalPolicy: REMOVAL_POLICY,
     });
+    // the emails of recent registrations, for checkEmailNotTaken
+    this.emailMarkerTable = new dynamodb.Table(this, id + 'EmailMarker', {
+      partitionKey: {
+        name: 'email_hash',
+        type: dynamodb.AttributeType.STRING,
+      },
+      tableName: SERVICE_PREFIX + 'Email_Marker',
+      timeToLiveAttribute: 'ttl',
+      removalPolicy: REMOVAL_POLICY,
+    });
   }
 }
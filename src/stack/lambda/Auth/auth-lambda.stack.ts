@@ -5,9 +5,11 @@ import * as cognito from '@aws-cdk/aws-cognito';
 import * as dynamodb from '@aws-cdk/aws-dynamodb';
 import * as iam from '@aws-cdk/aws-iam';
 import * as lambdaPython from '@aws-cdk/aws-lambda-python';
+import * as secretsmanager from '@aws-cdk/aws-secretsmanager';
 import * as ssm from '@aws-cdk/aws-ssm';
 import * as core from '@aws-cdk/core';
 import {
+  addWarmUpSchedule,
   BuildConfig,
   SERVICE_PREFIX,
   XChangeLambdaFunctionDefaultProps,
@@ -19,6 +21,7 @@ interface AuthLambdaStackDependencyProps extends core.StackProps {
   userPool: cognito.IUserPool;
   userTable: dynamodb.ITable;
   cognitoAuthCodeTable: dynamodb.ITable;
+  emailMarkerTable: dynamodb.ITable;
 }
 
 export class AuthLambdaStack extends core.Stack {
@@ -35,6 +38,15 @@ export class AuthLambdaStack extends core.Stack {
     const userPool: cognito.IUserPool = props.userPool;
     const userTable: dynamodb.ITable = props.userTable;
     const cognitoAuthCodeTable: dynamodb.ITable = props.cognitoAuthCodeTable;
+    const emailMarkerTable: dynamodb.ITable = props.emailMarkerTable;
+
+    // Secret Manager
+    // Google ID tokens are verified against the client_id of the Google app
+    const googleSecret = secretsmanager.Secret.fromSecretCompleteArn(
+      this,
+      id + 'GoogleSecretManager',
+      buildConfig.externalParameters.googleSecretManagerArn,
+    );
 
     // Layer
     const authLayer = lambdaPython.PythonLayerVersion.fromLayerVersionArn(
@@ -59,6 +71,7 @@ export class AuthLambdaStack extends core.Stack {
           USER_POOL_ID: userPool.userPoolId,
           USER_TABLE_NAME: userTable.tableName,
           AUTH_CODE_TABLE_NAME: cognitoAuthCodeTable.tableName,
+          GOOGLE_SECRET_ARN: googleSecret.secretArn,
         },
         initialPolicy: [
           new iam.PolicyStatement({
@@ -68,6 +81,7 @@ export class AuthLambdaStack extends core.Stack {
         ],
       },
     );
+    googleSecret.grantRead(loginLambda);
     userTable.grantReadWriteData(loginLambda);
     cognitoAuthCodeTable.grantReadWriteData(loginLambda);
     const loginLambdaIntegration =
@@ -93,15 +107,23 @@ export class AuthLambdaStack extends core.Stack {
         environment: {
           USER_POOL_ID: userPool.userPoolId,
           USER_TABLE_NAME: userTable.tableName,
+          EMAIL_MARKER_TABLE_NAME: emailMarkerTable.tableName,
+          GOOGLE_SECRET_ARN: googleSecret.secretArn,
         },
         initialPolicy: [
           new iam.PolicyStatement({
             actions: ['cognito-idp:DescribeUserPoolClient'],
             resources: [userPool.userPoolArn],
           }),
+          // marks the emails of registrations for checkEmailNotTaken
+          new iam.PolicyStatement({
+            actions: ['dynamodb:PutItem'],
+            resources: [emailMarkerTable.tableArn],
+          }),
         ],
       },
     );
+    googleSecret.grantRead(registerLambda);
     userTable.grantReadWriteData(registerLambda);
     const registerLambdaIntegration =
       new apigatewayv2Integrations.LambdaProxyIntegration({
@@ -305,16 +327,22 @@ export class AuthLambdaStack extends core.Stack {
         layers: [authLayer],
         environment: {
           USER_POOL_ID: userPool.userPoolId,
+          EMAIL_MARKER_TABLE_NAME: emailMarkerTable.tableName,
         },
         initialPolicy: [
           new iam.PolicyStatement({
             effect: iam.Effect.ALLOW,
             actions: [
               'cognito-idp:AdminGetUser',
+              'cognito-idp:ListUsers',
               'cognito-idp:DescribeUserPoolClient',
             ],
             resources: [userPool.userPoolArn],
           }),
+          new iam.PolicyStatement({
+            actions: ['dynamodb:GetItem'],
+            resources: [emailMarkerTable.tableArn],
+          }),
         ],
       },
     );
@@ -323,6 +351,9 @@ export class AuthLambdaStack extends core.Stack {
         handler: checkEmailNotTakenLambda,
       });
 
+    // keep the latency-critical functions warm
+    addWarmUpSchedule(this, id + 'WarmUpRule', [loginLambda, refreshLambda]);
+
     apiGateway.addRoutes({
       path: '/login',
       methods: [apigatewayv2.HttpMethod.POST],
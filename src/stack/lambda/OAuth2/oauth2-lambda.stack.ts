@@ -9,6 +9,7 @@ import * as secretsmanager from '@aws-cdk/aws-secretsmanager';
 import * as ssm from '@aws-cdk/aws-ssm';
 import * as core from '@aws-cdk/core';
 import {
+  addWarmUpSchedule,
   BuildConfig,
   SERVICE_PREFIX,
   XChangeLambdaFunctionDefaultProps,
@@ -41,6 +42,11 @@ export class Oauth2LambdaStack extends core.Stack {
       id + 'SecretManager',
       buildConfig.externalParameters.linkedInSecretManagerArn,
     );
+    const googleSecret = secretsmanager.Secret.fromSecretCompleteArn(
+      this,
+      id + 'GoogleSecretManager',
+      buildConfig.externalParameters.googleSecretManagerArn,
+    );
 
     // Layer
     const authLayer = lambdaPython.PythonLayerVersion.fromLayerVersionArn(
@@ -71,6 +77,7 @@ export class Oauth2LambdaStack extends core.Stack {
           USER_POOL_ID: userPool.userPoolId,
           USER_TABLE_NAME: userTable.tableName,
           LINKEDIN_SECRET_ARN: linkedInSecret.secretName,
+          GOOGLE_SECRET_ARN: googleSecret.secretArn,
           AUTH_CODE_TABLE_NAME: cognitoAuthCodeTable.tableName,
         },
         initialPolicy: [
@@ -82,6 +89,7 @@ export class Oauth2LambdaStack extends core.Stack {
       },
     );
     linkedInSecret.grantRead(federateTokenExchangeLambda);
+    googleSecret.grantRead(federateTokenExchangeLambda);
     userTable.grantReadWriteData(federateTokenExchangeLambda);
     cognitoAuthCodeTable.grantReadWriteData(federateTokenExchangeLambda);
     const federateTokenExchangeLambdaIntegration =
@@ -133,6 +141,15 @@ export class Oauth2LambdaStack extends core.Stack {
           'UserInfo',
         ),
         layers: [authLayer],
+        environment: {
+          USER_POOL_ID: userPool.userPoolId,
+        },
+        initialPolicy: [
+          new iam.PolicyStatement({
+            actions: ['cognito-idp:DescribeUserPoolClient'],
+            resources: [userPool.userPoolArn],
+          }),
+        ],
       },
     );
     const userinfoLambdaIntegration =
@@ -140,6 +157,13 @@ export class Oauth2LambdaStack extends core.Stack {
         handler: userinfoLambda,
       });
 
+    // keep the latency-critical functions warm
+    addWarmUpSchedule(this, id + 'WarmUpRule', [
+      federateTokenExchangeLambda,
+      tokenLambda,
+      userinfoLambda,
+    ]);
+
     apiGateway.addRoutes({
       path: '/oauth2/federateTokenExchange',
       methods: [apigatewayv2.HttpMethod.POST],
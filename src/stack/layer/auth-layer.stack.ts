@@ -1,13 +1,17 @@
 import * as path from 'path';
-import * as lambdaPython from '@aws-cdk/aws-lambda-python';
+import * as lambda from '@aws-cdk/aws-lambda';
 import * as ssm from '@aws-cdk/aws-ssm';
 import * as core from '@aws-cdk/core';
-import { BuildConfig, SERVICE_PREFIX } from '../../helper/helper';
+import {
+  BuildConfig,
+  SERVICE_PREFIX,
+  XChangeLambdaFunctionDefaultProps,
+} from '../../helper/helper';
 interface AuthLayerStackDependencyProps extends core.StackProps {
   buildConfig: BuildConfig;
 }
 export class AuthLayerStack extends core.Stack {
-  public readonly authLayer!: lambdaPython.PythonLayerVersion;
+  public readonly authLayer!: lambda.LayerVersion;
   constructor(
     scope: core.Construct,
     id: string,
@@ -16,14 +20,25 @@ export class AuthLayerStack extends core.Stack {
     super(scope, id, props);
     const buildConfig: BuildConfig = props.buildConfig;
     //  The code that defines your stack goes here;
-    this.authLayer = new lambdaPython.PythonLayerVersion(
-      this,
-      id + 'AuthLayer',
-      {
-        layerVersionName: SERVICE_PREFIX + 'AuthLayer',
-        entry: path.join('./', 'code', 'lambda', 'layer', 'auth'),
-      },
-    );
+    // Runtime-only artifact: build_layer.py strips build tools, tests, CLI
+    // entry points and .pth hooks, and precompiles the bytecode with the
+    // function runtime, since /opt is read-only and can not cache .pyc files.
+    const runtime = XChangeLambdaFunctionDefaultProps.runtime;
+    this.authLayer = new lambda.LayerVersion(this, id + 'AuthLayer', {
+      layerVersionName: SERVICE_PREFIX + 'AuthLayer',
+      compatibleRuntimes: [runtime],
+      code: lambda.Code.fromAsset(path.join('./', 'code', 'lambda', 'layer'), {
+        exclude: ['**/__pycache__', '**/*.pyc', '**/.DS_Store'],
+        bundling: {
+          image: runtime.bundlingImage,
+          command: [
+            'bash',
+            '-c',
+            'python build_layer.py auth /asset-output/python',
+          ],
+        },
+      }),
+    });
 
     // Because of [lambda] deployment failure on updates to cross-stack layers https://github.com/aws/aws-cdk/issues/1972
     new ssm.StringParameter(this, id + 'VersionArn', {
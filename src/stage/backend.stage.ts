@@ -42,6 +42,7 @@ export class BackendStage extends core.Stage {
       userPool: cognitoStack.userPool,
       userTable: dynamoDBStack.cognitoUserTable,
       cognitoAuthCodeTable: dynamoDBStack.cognitoAuthCodeTable,
+      emailMarkerTable: dynamoDBStack.emailMarkerTable,
     });
 
     new Oauth2LambdaStack(this, id + 'Oauth2LambdaStack', {